@@ -0,0 +1,74 @@
+# Allowed packages
+import numpy as np
+from openpyxl import Workbook
+from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+from openpyxl.chart import BarChart, Reference
+
+# Buffer to save excel file, previously defined in the server.py file
+XLSX_BUFFER = xlsx_buffer # Do not modify this line, it is defined in the server.py file
+
+def excel():
+    # Initialize a new Workbook instance
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "예산 집행 현황"
+
+    headers = ["시·군", "사업명", "월", "예산(원)", "집행액(원)", "집행률"]
+    header_fill = PatternFill(start_color="1F4E78", end_color="1F4E78", fill_type="solid")
+    thin = Side(style="thin", color="BFBFBF")
+    border = Border(left=thin, right=thin, top=thin, bottom=thin)
+
+    for col, header in enumerate(headers, start=1):
+        cell = ws.cell(row=1, column=col, value=header)
+        cell.font = Font(bold=True, color="FFFFFF")
+        cell.fill = header_fill
+        cell.alignment = Alignment(horizontal="center")
+
+    cities = ["전주시", "군산시", "익산시", "정읍시", "남원시", "김제시", "완주군"]
+    projects = ["청년 창업 지원", "야간관광 활성화", "농촌 인력중개", "전통시장 현대화"]
+    rng = np.random.default_rng(0)
+
+    row = 2
+    for city in cities:
+        for project in projects:
+            for month in range(1, 13):
+                budget = int(rng.integers(10, 90)) * 1_000_000
+                spent = int(budget * rng.uniform(0.4, 1.0))
+                values = [city, project, f"2024-{month:02d}", budget, spent, spent / budget]
+                for col, value in enumerate(values, start=1):
+                    cell = ws.cell(row=row, column=col, value=value)
+                    cell.border = border
+                ws.cell(row=row, column=4).number_format = "#,##0"
+                ws.cell(row=row, column=5).number_format = "#,##0"
+                ws.cell(row=row, column=6).number_format = "0.0%"
+                row += 1
+
+    for col, width in zip("ABCDEF", [10, 18, 10, 16, 16, 10]):
+        ws.column_dimensions[col].width = width
+    ws.freeze_panes = "A2"
+    ws.auto_filter.ref = f"A1:F{row - 1}"
+
+    # Summary sheet with a chart
+    summary = wb.create_sheet("요약")
+    summary.append(["시·군", "집행액 합계(원)"])
+    for city in cities:
+        total = sum(
+            ws.cell(row=r, column=5).value
+            for r in range(2, row)
+            if ws.cell(row=r, column=1).value == city
+        )
+        summary.append([city, total])
+
+    chart = BarChart()
+    chart.title = "시·군별 집행액"
+    chart.add_data(Reference(summary, min_col=2, min_row=1, max_row=len(cities) + 1), titles_from_data=True)
+    chart.set_categories(Reference(summary, min_col=1, min_row=2, max_row=len(cities) + 1))
+    summary.add_chart(chart, "D2")
+
+    # Save the Excel workbook
+    wb.save(XLSX_BUFFER) # Do not modify this line, it is defined in the server.py file
+
+    return f"Excel file created successfully!"
+
+# Invoke the function to generate the Excel file
+excel()
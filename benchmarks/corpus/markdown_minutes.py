@@ -0,0 +1,54 @@
+# Buffer to save the Markdown file, previously defined in the server.py file
+MD_BUFFER = md_buffer # Do not modify this line, it is defined in the server.py file
+
+def markdown():
+    # Step 1: Build a Markdown document according to the user's request.
+    items = [
+        ("청년 정착 지원사업 추진 현황", "창업 공간 12개소 조성 완료, 입주 기업 모집 공고 예정", "일자리정책과"),
+        ("야간관광 프로그램 운영 결과", "방문객 전년 대비 18.4% 증가, 동절기 프로그램 보완 필요", "관광산업과"),
+        ("농번기 인력중개센터 성과", "연인원 4만 2천명 중개, 외국인 계절근로자 연계 확대 검토", "농업정책과"),
+        ("전통시장 현대화 사업", "주차장 및 아케이드 공사 공정률 65%, 2월 준공 목표", "민생경제과")
+    ]
+
+    lines = [
+        "# 2024년 제4차 지역활성화 추진단 회의록",
+        "",
+        "- **일시**: 2024. 12. 18.(수) 14:00 ~ 16:00",
+        "- **장소**: 도청 4층 중회의실",
+        "- **참석**: 기획조정실장 외 18명",
+        "",
+        "## 1. 안건별 논의 결과",
+        "",
+        "| 번호 | 안건 | 주요 내용 | 담당 부서 |",
+        "|---|---|---|---|"
+    ]
+    for idx, (title, summary, owner) in enumerate(items, start=1):
+        lines.append(f"| {idx} | {title} | {summary} | {owner} |")
+
+    lines += ["", "## 2. 세부 논의 사항", ""]
+    for idx, (title, summary, owner) in enumerate(items, start=1):
+        lines += [
+            f"### 2.{idx} {title}",
+            "",
+            f"- 보고: {owner}",
+            f"- 내용: {summary}",
+            "- 의견: 시·군 간 성과 편차 해소를 위한 컨설팅 지원 필요",
+            ""
+        ]
+
+    lines += [
+        "## 3. 향후 조치 계획",
+        "",
+        "1. 시·군별 집행 실적 점검 회의 개최 (1월 2주)",
+        "2. 2025년 성과지표 개편안 확정 (2월)",
+        "3. 차기 회의: 2025. 3. 중 개최 예정"
+    ]
+    markdown_content = "\n".join(lines)
+
+    # Step 2: Save the content to the buffer (recommended method for simple Markdown)
+    MD_BUFFER.write(markdown_content.encode('utf-8'))
+
+    return "Markdown file created successfully!"
+
+# Invoke the function to generate the markdown document
+markdown()
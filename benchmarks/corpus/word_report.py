@@ -0,0 +1,75 @@
+def word():
+    # Allowed packages
+    import numpy as np
+    from docx import Document
+    from docx.shared import Pt, Cm
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
+
+    # Buffer to save the docx file, previously defined in the server.py file
+    DOCX_BUFFER = docx_buffer # Do not modify this line, it is defined in the server.py file
+
+    # Initialize a new Document instance
+    doc = Document()
+    for section in doc.sections:
+        section.left_margin = Cm(2.5)
+        section.right_margin = Cm(2.5)
+
+    title = doc.add_heading("2024년 하반기 전북특별자치도 지역활성화 사업 추진 결과 보고", level=0)
+    title.alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+    meta = doc.add_paragraph()
+    meta.add_run("작성부서: 기획조정실 정책기획과    작성일: 2024. 12. 20.").font.size = Pt(10)
+    meta.alignment = WD_ALIGN_PARAGRAPH.RIGHT
+
+    sections = [
+        ("Ⅰ. 추진 개요", [
+            "지역 균형발전과 인구 유출 대응을 위하여 14개 시·군과 협력하여 지역활성화 사업을 추진하였음.",
+            "사업기간은 2024. 7. 1. ~ 12. 31.이며, 총 사업비는 도비 120억원, 시군비 80억원임."
+        ]),
+        ("Ⅱ. 주요 추진 실적", [
+            "청년 정착 지원: 창업 공간 12개소 조성, 청년 창업팀 86팀 선정 및 지원.",
+            "관광 활성화: 야간관광 프로그램 24종 운영, 방문객 전년 대비 18.4% 증가.",
+            "농촌 일자리: 농번기 인력중개센터 9개소 운영, 연인원 4만 2천명 중개."
+        ]),
+        ("Ⅲ. 문제점 및 개선방안", [
+            "일부 시·군의 집행률이 70% 미만으로 저조하여 하반기 집중 관리가 필요함.",
+            "사업 성과지표가 투입 중심으로 설정되어 있어 성과 중심 지표로 개편을 추진함."
+        ])
+    ]
+    for heading, paragraphs in sections:
+        doc.add_heading(heading, level=1)
+        for text in paragraphs:
+            doc.add_paragraph(text, style="List Bullet")
+
+    doc.add_heading("Ⅳ. 시·군별 예산 집행 현황", level=1)
+    cities = ["전주시", "군산시", "익산시", "정읍시", "남원시", "김제시", "완주군", "진안군",
+              "무주군", "장수군", "임실군", "순창군", "고창군", "부안군"]
+    rng = np.random.default_rng(0)
+    budget = rng.integers(800, 2500, len(cities))
+    spent = (budget * rng.uniform(0.6, 1.0, len(cities))).astype(int)
+
+    table = doc.add_table(rows=1, cols=4)
+    table.style = "Table Grid"
+    for cell, text in zip(table.rows[0].cells, ["시·군", "예산(백만원)", "집행액(백만원)", "집행률"]):
+        cell.text = text
+        cell.paragraphs[0].runs[0].bold = True
+    for city, b, s in zip(cities, budget, spent):
+        row = table.add_row().cells
+        row[0].text = city
+        row[1].text = f"{b:,}"
+        row[2].text = f"{s:,}"
+        row[3].text = f"{s / b:.1%}"
+
+    doc.add_heading("Ⅴ. 향후 계획", level=1)
+    for step in ["2025년 사업계획 수립 및 시·군 설명회 개최 (1월)",
+                 "성과지표 개편안 확정 및 평가위원회 구성 (2월)",
+                 "우수 시·군 인센티브 지급 (3월)"]:
+        doc.add_paragraph(step, style="List Number")
+
+    # Save the presentation
+    doc.save(DOCX_BUFFER) # Do not modify this line, it is defined in the server.py file
+
+    return f"Word file created successfully!"
+
+# Invoke the function to generate the word document
+word()
@@ -0,0 +1,261 @@
+"""
+Microbenchmarks of the in-process document engines, compared against a stored baseline.
+
+Cases:
+    exec_word / exec_excel / exec_markdown  generate_* tool bodies running the scripts in benchmarks/corpus
+    spec_word                               generate_word rendering a document_spec (no exec)
+    full_context_docx                       structure extraction of a synthetic large .docx
+    review_docx                             comment insertion, save and upload of the same .docx
+    docx_save                               doc.save() serialisation of the same .docx
+
+Backends are replaced by in-memory download/upload functions, so the suite runs offline.
+Ops/sec are timed without tracing; peak memory comes from one extra run under tracemalloc.
+tracemalloc only sees allocations made through Python's allocator: the lxml/libxml2
+trees behind python-docx, python-pptx and openpyxl are allocated in C and are not
+counted, so peak_mb understates the real footprint of the document cases. Use it
+to catch regressions in Python-side allocations, and the RSS figures of
+/memory for the full footprint.
+Baselines are machine and interpreter specific: record one per CI runner with --save,
+on the Python version required by pyproject.toml.
+
+Usage (from the repository root):
+    python -m benchmarks.engines                      # run and compare with benchmarks/baselines/engines.json
+    python -m benchmarks.engines --save benchmarks/baselines/engines.json
+    python -m benchmarks.engines --only review_docx --paragraphs 5000
+"""
+from argparse import ArgumentParser
+from io import BytesIO
+from json import dumps, loads
+from pathlib import Path
+from time import perf_counter
+from types import SimpleNamespace
+import gc
+import os
+import platform
+import sys
+import tracemalloc
+
+# server.py reads its configuration at import time; the backends are never contacted
+for key, value in {
+    "OWUI_URL": "http://127.0.0.1:9",
+    "PRESENTON_ENDPOINT": "http://127.0.0.1:9",
+    "PRESENTON_API_KEY": "benchmark",
+    "PRESENTON_BASE_URL": "http://127.0.0.1:9",
+    "HWP_ENDPOINT": "http://127.0.0.1:9",
+    "ENABLE_CREATE_KNOWLEDGE": "false",
+    "LOG_LEVEL": "WARNING"
+}.items():
+    os.environ.setdefault(key, value)
+
+from docx import Document
+
+import server
+from server import ReviewComment
+from utils.doc_spec import WordSpec
+
+CORPUS = Path(__file__).parent / "corpus"
+DEFAULT_BASELINE = Path(__file__).parent / "baselines" / "engines.json"
+
+# Stored with every baseline next to the peak_mb figures
+PEAK_MEMORY_NOTE = "tracemalloc peak of Python allocations; lxml/libxml2 C allocations are not included"
+
+# Allowed relative change before a case counts as a regression
+DEFAULT_THRESHOLDS = {"ops_per_sec": 0.30, "peak_mb": 0.20}
+
+CONTEXT = SimpleNamespace(request_context=SimpleNamespace(request=SimpleNamespace(headers={"authorization": "Bearer benchmark"})))
+
+def make_docx(paragraphs: int) -> bytes:
+    """
+    Build a synthetic administrative report with headings, body text, lists and tables.
+    """
+    doc = Document()
+    doc.add_heading("전북특별자치도 지역활성화 사업 종합 보고서", level=0)
+    for idx in range(paragraphs):
+        if idx % 50 == 0:
+            doc.add_heading(f"{idx // 50 + 1}. 추진 현황 및 향후 계획", level=1)
+        elif idx % 10 == 0:
+            doc.add_paragraph(f"세부 과제 {idx}: 시·군 협력 체계 구축 및 성과 관리", style="List Bullet")
+        else:
+            doc.add_paragraph(
+                f"({idx}) 지역 균형발전을 위하여 14개 시·군과 협력하여 청년 정착, 관광 활성화, "
+                f"농촌 일자리 사업을 추진하였으며, 집행률은 {60 + idx % 40}% 수준임."
+            )
+        if idx % 200 == 199:
+            table = doc.add_table(rows=8, cols=4)
+            table.style = "Table Grid"
+            for row_idx, row in enumerate(table.rows):
+                for col_idx, cell in enumerate(row.cells):
+                    cell.text = f"R{row_idx}C{col_idx}"
+    buffer = BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+def make_spec(paragraphs: int) -> WordSpec:
+    """
+    Document spec with the same kind of content as make_docx.
+    """
+    blocks = []
+    for idx in range(paragraphs):
+        if idx % 50 == 0:
+            blocks.append({"type": "heading", "text": f"{idx // 50 + 1}. 추진 현황", "level": 1})
+        elif idx % 10 == 0:
+            blocks.append({"type": "bullets", "items": [f"세부 과제 {idx}", "시·군 협력 체계 구축"]})
+        else:
+            blocks.append({"type": "paragraph", "text": f"({idx}) 지역 균형발전을 위한 협력 사업 추진 결과 보고."})
+    blocks.append({"type": "table", "header": ["시·군", "예산", "집행액"], "rows": [[f"시군{i}", i * 100, i * 80] for i in range(50)]})
+    return WordSpec.model_validate({"title": "지역활성화 사업 보고", "blocks": blocks})
+
+def fake_upload(url, token, file_data, filename, file_type):
+    """
+    In-memory replacement for upload_file.
+    """
+    size = file_data.getbuffer().nbytes
+    return {"file_path_download": f"[Download {filename}.{file_type}](/api/v1/files/benchmark/content)", "bytes": size}, {"id": "benchmark"}
+
+def check(result):
+    """
+    Tools report failures as JSON strings; fail the case instead of timing an error path.
+    """
+    if isinstance(result, str) and '"error"' in result:
+        raise RuntimeError(result)
+    return result
+
+def build_cases(paragraphs: int, comments: int) -> dict:
+    """
+    Map case name -> zero-argument callable running one operation.
+    """
+    docx_bytes = make_docx(paragraphs)
+    server.upload_file = fake_upload
+    server.download_file = lambda *args, **kwargs: BytesIO(docx_bytes)
+
+    generate_word = server.generate_word.__wrapped__
+    generate_excel = server.generate_excel.__wrapped__
+    generate_markdown = server.generate_markdown.__wrapped__
+    full_context_docx = server.full_context_docx.__wrapped__
+    review_docx = server.review_docx.__wrapped__
+
+    word_script = (CORPUS / "word_report.py").read_text(encoding="utf-8")
+    excel_script = (CORPUS / "excel_budget.py").read_text(encoding="utf-8")
+    markdown_script = (CORPUS / "markdown_minutes.py").read_text(encoding="utf-8")
+    spec = make_spec(paragraphs)
+
+    # Comments spread over the non-empty paragraphs
+    body = loads(full_context_docx("benchmark", "benchmark.docx", CONTEXT))["body"]
+    step = max(1, len(body) // comments)
+    review_comments = [
+        ReviewComment(index=item["index"], comment=f"검토 의견 {n}: 표현을 명확히 수정 바랍니다.")
+        for n, item in enumerate(body[::step][:comments])
+    ]
+
+    loaded = Document(BytesIO(docx_bytes))
+
+    def docx_save():
+        buffer = BytesIO()
+        loaded.save(buffer)
+
+    return {
+        "exec_word": lambda: check(generate_word("benchmark", "benchmark", CONTEXT, python_script=word_script)),
+        "exec_excel": lambda: check(generate_excel("benchmark", "benchmark", CONTEXT, python_script=excel_script)),
+        "exec_markdown": lambda: check(generate_markdown(markdown_script, "benchmark", "benchmark", CONTEXT)),
+        "spec_word": lambda: check(generate_word("benchmark", "benchmark", CONTEXT, document_spec=spec)),
+        "full_context_docx": lambda: check(full_context_docx("benchmark", "benchmark.docx", CONTEXT)),
+        "review_docx": lambda: check(review_docx("benchmark", "benchmark.docx", review_comments, "benchmark", CONTEXT)),
+        "docx_save": docx_save
+    }
+
+def measure(func, min_time: float, min_runs: int) -> dict:
+    """
+    Time func until both min_time seconds and min_runs runs are reached,
+    then run it once more under tracemalloc for the peak memory.
+    """
+    func()  # warm-up: imports, style caches, first-call allocations
+    times = []
+    start = perf_counter()
+    while len(times) < min_runs or perf_counter() - start < min_time:
+        run_start = perf_counter()
+        func()
+        times.append(perf_counter() - run_start)
+
+    gc.collect()
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    times.sort()
+    return {
+        "runs": len(times),
+        "ops_per_sec": round(len(times) / sum(times), 3),
+        "median_ms": round(times[len(times) // 2] * 1000, 2),
+        "p95_ms": round(times[min(len(times) - 1, int(len(times) * 0.95))] * 1000, 2),
+        "peak_mb": round(peak / 1024 / 1024, 2)
+    }
+
+def compare(results: dict, baseline: dict) -> list[str]:
+    """
+    Return one message per metric that regressed beyond the baseline thresholds.
+    """
+    thresholds = {**DEFAULT_THRESHOLDS, **baseline.get("thresholds", {})}
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get("results", {}).get(name)
+        if not reference:
+            continue
+        floor = reference["ops_per_sec"] * (1 - thresholds["ops_per_sec"])
+        if result["ops_per_sec"] < floor:
+            regressions.append(f"{name}: ops/sec {result['ops_per_sec']} < {floor:.3f} (baseline {reference['ops_per_sec']})")
+        ceiling = reference["peak_mb"] * (1 + thresholds["peak_mb"])
+        if result["peak_mb"] > ceiling:
+            regressions.append(f"{name}: peak {result['peak_mb']} MB > {ceiling:.2f} MB (baseline {reference['peak_mb']} MB)")
+    return regressions
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--paragraphs", type=int, default=2000, help="Size of the synthetic .docx input")
+    parser.add_argument("--comments", type=int, default=200, help="Number of review comments inserted")
+    parser.add_argument("--min-time", type=float, default=2.0, help="Minimum timed seconds per case")
+    parser.add_argument("--min-runs", type=int, default=5, help="Minimum timed runs per case")
+    parser.add_argument("--only", nargs="+", help="Run only these cases")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="Baseline to compare against")
+    parser.add_argument("--save", type=Path, help="Write the results as a new baseline to this path")
+    args = parser.parse_args()
+
+    cases = build_cases(args.paragraphs, args.comments)
+    selected = args.only or list(cases)
+    unknown = set(selected) - set(cases)
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(sorted(unknown))}")
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "paragraphs": args.paragraphs,
+            "comments": args.comments,
+            "peak_memory": PEAK_MEMORY_NOTE
+        },
+        "thresholds": DEFAULT_THRESHOLDS,
+        "results": {name: measure(cases[name], args.min_time, args.min_runs) for name in selected}
+    }
+
+    if args.save:
+        args.save.parent.mkdir(parents=True, exist_ok=True)
+        args.save.write_text(dumps(report, indent=4, ensure_ascii=False) + "\n", encoding="utf-8")
+
+    regressions = []
+    if not args.save and args.baseline.exists():
+        baseline = loads(args.baseline.read_text(encoding="utf-8"))
+        if baseline["meta"].get("paragraphs") != args.paragraphs or baseline["meta"].get("comments") != args.comments:
+            print("Baseline was recorded with different input sizes; skipping comparison", file=sys.stderr)
+        else:
+            if baseline["meta"].get("python", "").rsplit(".", 1)[0] != platform.python_version().rsplit(".", 1)[0]:
+                print(f"Baseline was recorded on Python {baseline['meta'].get('python')}; timings may not be comparable", file=sys.stderr)
+            regressions = compare(report["results"], baseline)
+        report["regressions"] = regressions
+
+    print(dumps(report, indent=4, ensure_ascii=False))
+    if regressions:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
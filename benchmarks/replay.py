@@ -0,0 +1,358 @@
+"""
+Replay recorded production traffic against a local server with stubbed backends.
+
+A recording is made by starting the server with RECORD_TRAFFIC_DIR set. The
+replayer starts one stub HTTP server per recorded backend (OWUI, Presenton, HWP)
+that answers with the recorded responses and response times, launches server.py
+pointed at the stubs, and re-issues the recorded tool calls over MCP with their
+original arrival offsets. --speed divides both the arrival offsets and the
+backend response times (1 = real time).
+
+Absolute URLs of recorded origins inside tool arguments and text response
+bodies (e.g. the file_url of a Presenton export) are rewritten to the stubs.
+Calls whose arguments reference any other host are not replayed, so a replay
+never reaches a real backend; --allow-external replays them anyway.
+
+Usage (from the repository root):
+    python -m benchmarks.replay recordings/traffic-20241218-140000.jsonl --speed 10
+    python -m benchmarks.replay recordings/traffic-20241218-140000.jsonl --stubs-only
+"""
+from argparse import ArgumentParser
+from collections import defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from json import dumps, loads
+from pathlib import Path
+from threading import Lock, Thread
+from time import monotonic, sleep
+from urllib.parse import urlsplit
+from urllib.request import urlopen
+import asyncio
+import os
+import re
+import socket
+import subprocess
+import sys
+
+from mcp import ClientSession
+from mcp.client.streamable_http import streamablehttp_client
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Path segments that look like identifiers (UUIDs, hashes, numbers) are wildcards when no exact match exists
+ID_SEGMENT = re.compile(r"^(?=.*\d)[\w.-]{6,}$")
+# Origin (scheme://host[:port]) of an absolute URL
+URL_ORIGIN = re.compile(r"https?://[\w.-]+(?::\d+)?", re.IGNORECASE)
+
+def load_recording(path: Path) -> tuple[dict, list[dict], list[dict]]:
+    """
+    Return the meta event, the tool events sorted by arrival and the HTTP events.
+    """
+    meta, tools, exchanges = {}, [], []
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            event = loads(line)
+            if event["type"] == "meta":
+                meta = event
+            elif event["type"] == "tool":
+                tools.append(event)
+            elif event["type"] == "http":
+                exchanges.append(event)
+    tools.sort(key=lambda event: event["t"])
+    return meta, tools, exchanges
+
+class OriginRewriter:
+    """
+    Rewrites the recorded backend origins to their stub URLs in strings and bodies.
+    """
+    def __init__(self, stubs: dict[str, str]):
+        self.stubs = stubs
+        # Longest origins first; an origin must not match the prefix of a longer host or port
+        alternatives = "|".join(re.escape(origin) for origin in sorted(stubs, key=len, reverse=True)) or "(?!)"
+        self._text = re.compile(f"(?:{alternatives})(?![\\w.:-])", re.IGNORECASE)
+        self._bytes = re.compile(self._text.pattern.encode(), re.IGNORECASE)
+
+    def text(self, value: str) -> str:
+        return self._text.sub(lambda match: self.stubs[match.group(0).lower()], value)
+
+    def body(self, value: bytes) -> bytes:
+        return self._bytes.sub(lambda match: self.stubs[match.group(0).decode().lower()].encode(), value)
+
+    def arguments(self, value):
+        """
+        Rewrite every string inside tool arguments (nested dicts and lists included).
+        """
+        if isinstance(value, str):
+            return self.text(value)
+        if isinstance(value, dict):
+            return {key: self.arguments(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self.arguments(item) for item in value]
+        return value
+
+    def foreign(self, value) -> set[str]:
+        """
+        Origins referenced in tool arguments that have no stub.
+        """
+        if isinstance(value, str):
+            return {origin.lower() for origin in URL_ORIGIN.findall(value)} - set(self.stubs)
+        if isinstance(value, dict):
+            value = list(value.values())
+        if isinstance(value, list):
+            return set().union(*(self.foreign(item) for item in value))
+        return set()
+
+def _shape(path: str) -> str:
+    path = path.split("?", 1)[0]
+    return "/".join("*" if ID_SEGMENT.match(segment) else segment for segment in path.split("/"))
+
+class BackendStub:
+    """
+    HTTP server answering one recorded backend origin.
+
+    Responses to the same method and path are played back in recorded order;
+    the last one is repeated once the queue is exhausted. Requests without an
+    exact match fall back to a recorded path of the same shape (identifiers
+    replaced by wildcards), then to a 404.
+    """
+    def __init__(self, origin: str, exchanges: list[dict], bodies: Path, speed: float):
+        self.origin = origin
+        self.rewriter = None
+        self.bodies = bodies
+        self.speed = speed
+        self.exact = defaultdict(deque)
+        self.shaped = defaultdict(deque)
+        for exchange in exchanges:
+            self.exact[(exchange["method"], exchange["path"])].append(exchange)
+            self.shaped[(exchange["method"], _shape(exchange["path"]))].append(exchange)
+        self.served = 0
+        self.missed = 0
+        self._lock = Lock()
+        self._cache = {}
+
+        stub = self
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+            def _answer(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                if length:
+                    self.rfile.read(length)
+                stub.answer(self)
+            do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _answer
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def start(self) -> None:
+        Thread(target=self.server.serve_forever, name=f"stub:{self.origin}", daemon=True).start()
+
+    def stop(self) -> None:
+        self.server.shutdown()
+
+    def _next(self, method: str, path: str) -> dict | None:
+        with self._lock:
+            for queues, key in ((self.exact, (method, path)), (self.shaped, (method, _shape(path)))):
+                queue = queues.get(key)
+                if queue:
+                    self.served += 1
+                    return queue.popleft() if len(queue) > 1 else queue[0]
+            self.missed += 1
+            return None
+
+    def _body(self, exchange: dict) -> bytes:
+        digest = exchange["body"]
+        if digest not in self._cache:
+            body = (self.bodies / digest).read_bytes()
+            if self.rewriter and (exchange["content_type"] or "").startswith(("application/json", "text/")):
+                body = self.rewriter.body(body)
+            self._cache[digest] = body
+        return self._cache[digest]
+
+    def answer(self, handler: BaseHTTPRequestHandler) -> None:
+        exchange = self._next(handler.command, handler.path)
+        if exchange is None:
+            status, content_type, body = 404, "application/json", b'{"detail": "not recorded"}'
+        else:
+            sleep(exchange["elapsed_s"] / self.speed)
+            status, content_type, body = exchange["status"], exchange["content_type"], self._body(exchange)
+        handler.send_response(status)
+        if content_type:
+            handler.send_header("Content-Type", content_type)
+        handler.send_header("Content-Length", str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+def start_stubs(meta: dict, exchanges: list[dict], bodies: Path, speed: float) -> dict[str, BackendStub]:
+    """
+    Start one stub per backend origin seen in the recording.
+    Text bodies served by the stubs have the recorded origins rewritten to the stubs.
+    """
+    origins = {exchange["origin"].lower() for exchange in exchanges}
+    for value in meta.get("backends", {}).values():
+        for url in (value or "").split(","):
+            if url.strip():
+                parts = urlsplit(url.strip())
+                origins.add(f"{parts.scheme}://{parts.netloc}".lower())
+
+    stubs = {}
+    for origin in sorted(origins):
+        stubs[origin] = BackendStub(origin, [e for e in exchanges if e["origin"].lower() == origin], bodies, speed)
+    rewriter = OriginRewriter({origin: stub.url for origin, stub in stubs.items()})
+    for stub in stubs.values():
+        stub.rewriter = rewriter
+        stub.start()
+    return stubs
+
+def stub_environment(meta: dict, stubs: dict[str, BackendStub]) -> dict[str, str]:
+    """
+    Backend variables of the recording rewritten to point at the stubs.
+    """
+    rewriter = OriginRewriter({origin: stub.url for origin, stub in stubs.items()})
+    return {name: rewriter.text(value or "") for name, value in meta.get("backends", {}).items()}
+
+def prepare_calls(tools: list[dict], stubs: dict[str, BackendStub], allow_external: bool) -> tuple[list[dict], list[dict]]:
+    """
+    Rewrite the recorded origins in the tool arguments to the stubs.
+    Returns:
+        tuple: (calls to replay, calls refused because their arguments reference hosts outside the recording)
+    """
+    rewriter = OriginRewriter({origin: stub.url for origin, stub in stubs.items()})
+    calls, refused = [], []
+    for event in tools:
+        hosts = rewriter.foreign(event["arguments"])
+        if hosts and not allow_external:
+            refused.append({"tool": event["tool"], "t": event["t"], "hosts": sorted(hosts)})
+            continue
+        calls.append({**event, "arguments": rewriter.arguments(event["arguments"])})
+    return calls, refused
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_server(env: dict[str, str], log) -> tuple[subprocess.Popen, str]:
+    """
+    Launch server.py against the stubs and wait for /healthz.
+    """
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, "server.py"],
+        cwd=ROOT,
+        env={**os.environ, "PRESENTON_API_KEY": "replay", **env, "PORT": str(port), "RECORD_TRAFFIC_DIR": ""},
+        stdout=log,
+        stderr=subprocess.STDOUT
+    )
+    base = f"http://127.0.0.1:{port}"
+    deadline = monotonic() + 60
+    while monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"server.py exited with code {process.returncode}")
+        try:
+            with urlopen(f"{base}/healthz", timeout=1):
+                return process, base
+        except OSError:
+            sleep(0.2)
+    process.terminate()
+    raise RuntimeError("server.py did not become healthy within 60s")
+
+async def drive(url: str, tools: list[dict], speed: float) -> list[dict]:
+    """
+    Issue the recorded tool calls at their recorded offsets divided by speed.
+    """
+    async with streamablehttp_client(url, headers={"Authorization": "Bearer replay"}) as (read, write, _):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            start = monotonic()
+
+            async def replay(event: dict) -> dict:
+                await asyncio.sleep(max(0.0, event["t"] / speed - (monotonic() - start)))
+                call_start = monotonic()
+                try:
+                    result = await session.call_tool(event["tool"], event["arguments"])
+                    text = "".join(getattr(item, "text", "") for item in result.content)
+                    ok = not result.isError and '"error"' not in text[:200]
+                except Exception:
+                    ok = False
+                return {"tool": event["tool"], "ok": ok, "seconds": monotonic() - call_start, "recorded": event}
+
+            return await asyncio.gather(*(replay(event) for event in tools))
+
+def _percentile(values: list[float], percentile: float) -> float:
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(len(values) * percentile / 100))], 3) if values else 0.0
+
+def summarize(results: list[dict], refused: list[dict], speed: float, wall: float, stubs: dict[str, BackendStub]) -> dict:
+    by_tool = defaultdict(list)
+    for result in results:
+        by_tool[result["tool"]].append(result)
+    return {
+        "speed": speed,
+        "calls": len(results),
+        "errors": sum(not result["ok"] for result in results),
+        "refused": refused,
+        "wall_s": round(wall, 3),
+        "stubs": {origin: {"served": stub.served, "missed": stub.missed} for origin, stub in stubs.items()},
+        "tools": {
+            tool: {
+                "calls": len(items),
+                "errors": sum(not item["ok"] for item in items),
+                "recorded_errors": sum(not item["recorded"]["ok"] for item in items),
+                # Recorded durations are scaled by speed so they compare with the replayed ones
+                "recorded_p50_s": _percentile([item["recorded"]["duration_s"] / speed for item in items], 50),
+                "recorded_p95_s": _percentile([item["recorded"]["duration_s"] / speed for item in items], 95),
+                "replay_p50_s": _percentile([item["seconds"] for item in items], 50),
+                "replay_p95_s": _percentile([item["seconds"] for item in items], 95)
+            }
+            for tool, items in sorted(by_tool.items())
+        }
+    }
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("recording", type=Path, help="traffic-*.jsonl file written by the recorder")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay speed factor (1 = real time)")
+    parser.add_argument("--only", nargs="+", help="Replay only these tools")
+    parser.add_argument("--stubs-only", action="store_true", help="Start the stubs, print their environment and wait")
+    parser.add_argument("--allow-external", action="store_true", help="Also replay calls whose arguments reference hosts outside the recording")
+    parser.add_argument("--server-log", type=Path, help="File receiving the output of server.py")
+    parser.add_argument("--output", type=Path, help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    meta, tools, exchanges = load_recording(args.recording)
+    if args.only:
+        tools = [event for event in tools if event["tool"] in args.only]
+    stubs = start_stubs(meta, exchanges, args.recording.parent / "bodies", args.speed)
+    env = stub_environment(meta, stubs)
+    tools, refused = prepare_calls(tools, stubs, args.allow_external)
+    for call in refused:
+        print(f"Not replaying {call['tool']} at {call['t']}s: references {', '.join(call['hosts'])}", file=sys.stderr)
+
+    if args.stubs_only:
+        for name, value in env.items():
+            print(f"{name}={value}")
+        try:
+            while True:
+                sleep(3600)
+        except KeyboardInterrupt:
+            return
+
+    log = open(args.server_log, "w") if args.server_log else subprocess.DEVNULL
+    process, base = start_server(env, log)
+    try:
+        start = monotonic()
+        results = asyncio.run(drive(f"{base}/mcp", tools, args.speed))
+        report = summarize(results, refused, args.speed, monotonic() - start, stubs)
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+        for stub in stubs.values():
+            stub.stop()
+
+    output = dumps(report, indent=4, ensure_ascii=False)
+    if args.output:
+        args.output.write_text(output + "\n", encoding="utf-8")
+    print(output)
+
+if __name__ == "__main__":
+    main()
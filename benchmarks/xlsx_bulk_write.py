@@ -0,0 +1,95 @@
+"""
+Benchmark: cell-by-cell openpyxl writes vs the xlsx_bulk write-only helpers.
+
+Usage (from the repository root):
+    python -m benchmarks.xlsx_bulk_write --rows 50000
+"""
+from argparse import ArgumentParser
+from io import BytesIO
+from json import dumps
+from time import perf_counter
+import tracemalloc
+import numpy as np
+from openpyxl import Workbook
+
+from utils import xlsx_bulk
+
+HEADERS = ["ID", "Region", "Amount", "Ratio", "Count"]
+NUMBER_FORMATS = {"Amount": "#,##0", "Ratio": "0.0%"}
+
+def make_columns(rows: int) -> dict:
+    """
+    Build a synthetic table with mixed dtypes.
+    """
+    rng = np.random.default_rng(0)
+    regions = np.array(["전주시", "군산시", "익산시", "정읍시", "남원시", "김제시"])
+    return {
+        "ID": np.arange(rows),
+        "Region": regions[rng.integers(0, len(regions), rows)],
+        "Amount": rng.normal(1_000_000, 250_000, rows).round(0),
+        "Ratio": rng.random(rows),
+        "Count": rng.integers(0, 1000, rows)
+    }
+
+def cell_by_cell(columns: dict) -> BytesIO:
+    """
+    The pattern LLM-written scripts use today: default workbook, one ws.cell() call per value.
+    """
+    wb = Workbook()
+    ws = wb.active
+    for col_idx, name in enumerate(HEADERS, start=1):
+        ws.cell(row=1, column=col_idx, value=name)
+    rows = len(columns["ID"])
+    for row_idx in range(rows):
+        for col_idx, name in enumerate(HEADERS, start=1):
+            cell = ws.cell(row=row_idx + 2, column=col_idx, value=columns[name][row_idx].item())
+            if name in NUMBER_FORMATS:
+                cell.number_format = NUMBER_FORMATS[name]
+    buffer = BytesIO()
+    wb.save(buffer)
+    return buffer
+
+def bulk(columns: dict) -> BytesIO:
+    """
+    The same table written through xlsx_bulk in write-only mode.
+    """
+    wb = xlsx_bulk.bulk_workbook()
+    ws = wb.create_sheet("Data")
+    xlsx_bulk.write_columns(ws, columns, number_formats=NUMBER_FORMATS)
+    buffer = BytesIO()
+    wb.save(buffer)
+    return buffer
+
+def measure(func, columns: dict) -> dict:
+    """
+    Run func once and return wall time, rows per second and Python peak memory.
+    """
+    rows = len(columns["ID"])
+    tracemalloc.start()
+    start = perf_counter()
+    buffer = func(columns)
+    elapsed = perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "seconds": round(elapsed, 3),
+        "rows_per_sec": round(rows / elapsed),
+        "peak_mb": round(peak / 1024 / 1024, 1),
+        "file_bytes": buffer.getbuffer().nbytes
+    }
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50_000)
+    args = parser.parse_args()
+
+    columns = make_columns(args.rows)
+    results = {
+        "rows": args.rows,
+        "cell_by_cell": measure(cell_by_cell, columns),
+        "xlsx_bulk": measure(bulk, columns)
+    }
+    print(dumps(results, indent=4, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
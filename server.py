@@ -1,26 +1,58 @@
 # Native libraries
-from json import dumps
+from json import dumps, loads
 from os import getenv
 from typing import Annotated, Literal, List, Tuple
 from enum import Enum
 from pathlib import Path
 from io import BytesIO
+from math import ceil
+from tempfile import SpooledTemporaryFile
+from hmac import compare_digest
+import anyio
 import logging
-logging.basicConfig(level=logging.INFO, force=True)
+from utils.logging_setup import setup_logging, parse_levels, Payload
+
+# Queue-based logging: records are formatted on a background thread.
+# LOG_LEVELS sets per-module levels, e.g. 'GenFilesMCP.knowledge=WARNING,httpx=WARNING'
+setup_logging(
+    level=getenv('LOG_LEVEL', 'INFO'),
+    levels=parse_levels(getenv('LOG_LEVELS', '')),
+    json_output=getenv('LOG_FORMAT', 'text').lower() == 'json',
+    payload_max_chars=int(getenv('LOG_PAYLOAD_MAX_CHARS', '1000')),
+    payload_sample_rate=float(getenv('LOG_PAYLOAD_SAMPLE_RATE', '1.0'))
+)
 logger = logging.getLogger("GenFilesMCP")
 
 # Third-party libraries
 from pydantic import Field, BaseModel
-from requests import post, get
+from utils.http_session import post, get
 from mcp.server.fastmcp import FastMCP, Context
 from mcp.server.session import ServerSession
 from docx import Document
+from starlette.requests import Request
+from starlette.responses import JSONResponse
 
 # Utilities
 from utils.load_md_templates import load_md_templates
 from utils.upload_file import upload_file
 from utils.download_file import download_file
 from utils.knowledge import create_knowledge
+from utils.optimize_ooxml import optimize_ooxml
+from utils import xlsx_bulk
+from utils.xlsx_context import summarize_workbook
+from utils.pptx_context import extract_pptx
+from utils.hwpx_context import extract_hwpx
+from utils.hwpx_patch import check_ranges, replace_paragraphs
+from utils.scheduler import FairQueue, Scheduler, granted_slots_var, parallel_map
+from utils.replicas import ReplicaPool, parse_replicas
+from utils.warmup import Readiness
+from utils.pptx_merge import split_content, allocate_slides, merge_presentations, check_slide_numbers, replace_slides
+from utils.doc_spec import WordSpec, ExcelSpec, render_docx, render_xlsx
+from utils.loop_watchdog import LoopWatchdog
+from utils.memory_profiler import MemoryTracker
+from utils.traffic_recorder import TrafficRecorder
+from utils.docx_edit import DocxFileEdits, apply_edits
+from utils.tabular_excel import csv_to_workbook, CHUNK_SIZE, SPOOL_SIZE
 
 # Parameters
 URL = getenv('OWUI_URL')
@@ -31,12 +63,60 @@ HWP_TEMPLATE, POWERPOINT_TEMPLATE, EXCEL_TEMPLATE, WORD_TEMPLATE,MARKDOWN_TEMPLA
 # Enable or disable automatic creation of knowledge collections after upload
 # Defaults to true to preserve existing behavior. Set to 'false' to disable.
 ENABLE_CREATE_KNOWLEDGE = getenv('ENABLE_CREATE_KNOWLEDGE', 'true').lower() == 'true'
+# Optional optimisation pass for .pptx/.docx/.xlsx files before upload (disabled by default)
+ENABLE_OOXML_OPTIMIZATION = getenv('ENABLE_OOXML_OPTIMIZATION', 'false').lower() == 'true'
+OOXML_MAX_IMAGE_PX = int(getenv('OOXML_MAX_IMAGE_PX', '1920'))
+OOXML_JPEG_QUALITY = int(getenv('OOXML_JPEG_QUALITY', '85'))
+OOXML_COMPRESS_LEVEL = int(getenv('OOXML_COMPRESS_LEVEL', '9'))
+
+def optimize_before_upload(buffer: BytesIO) -> tuple[BytesIO, dict]:
+    """
+    Run the OOXML optimisation pass on a generated buffer when it is enabled.
+    Returns the buffer to upload and the 'bytes_before'/'bytes_after' sizes,
+    which are merged into the tool result (empty when the pass is disabled or failed).
+    """
+    if not ENABLE_OOXML_OPTIMIZATION:
+        return buffer, {}
+    buffer, report = optimize_ooxml(
+        buffer,
+        max_image_px=OOXML_MAX_IMAGE_PX,
+        jpeg_quality=OOXML_JPEG_QUALITY,
+        compress_level=OOXML_COMPRESS_LEVEL
+    )
+    if "error" in report:
+        return buffer, {}
+    return buffer, {"bytes_before": report["bytes_before"], "bytes_after": report["bytes_after"]}
+
+# Per-user fair scheduling of heavy work (Presenton, HWP, exec) and a separate lane for cheap interactive tools
+# SCHEDULER_USER_WEIGHTS is an optional JSON object mapping user_id to a weight (default 1.0)
+# SCHEDULER_PER_USER_LIMIT counts running jobs per user; one job may still span several slots (width)
+SCHEDULER_PER_USER_LIMIT = int(getenv('SCHEDULER_PER_USER_LIMIT', '1'))
+SCHEDULER_USER_WEIGHTS = loads(getenv('SCHEDULER_USER_WEIGHTS', '{}'))
+SCHEDULER_INTERACTIVE_SLOTS = int(getenv('SCHEDULER_INTERACTIVE_SLOTS', '8'))
+SCHEDULER = Scheduler({
+    "presenton": FairQueue("presenton", int(getenv('SCHEDULER_PRESENTON_SLOTS', '2')), SCHEDULER_PER_USER_LIMIT, SCHEDULER_USER_WEIGHTS),
+    "hwp": FairQueue("hwp", int(getenv('SCHEDULER_HWP_SLOTS', '2')), SCHEDULER_PER_USER_LIMIT, SCHEDULER_USER_WEIGHTS),
+    "exec": FairQueue("exec", int(getenv('SCHEDULER_EXEC_SLOTS', '4')), SCHEDULER_PER_USER_LIMIT, SCHEDULER_USER_WEIGHTS),
+    # Interactive tools are not capped per user, they only bypass the heavy queues
+    "interactive": FairQueue("interactive", SCHEDULER_INTERACTIVE_SLOTS, SCHEDULER_INTERACTIVE_SLOTS)
+})
 
 # Pydantic model for review comments
 class ReviewComment(BaseModel):
     index: int
     comment: str
 
+# Pydantic models for incremental revisions of previously generated files
+class SlideRevision(BaseModel):
+    slide: int = Field(ge=1, description="1-based number of the slide to replace, as returned by full_context_pptx.")
+    content: str = Field(description="New content of the slide.")
+    n_slides: int = Field(default=1, ge=1, le=10, description="Number of slides generated in its place.")
+
+class HwpRevision(BaseModel):
+    start: int = Field(ge=0, description="Index of the first paragraph to replace, as returned by full_context_hwpx.")
+    end: int = Field(ge=0, description="Index of the last paragraph to replace (inclusive).")
+    content: str = Field(description="New text of the section, in the same administrative style as generate_hwp.")
+
 # Initialize FastMCP server
 mcp = FastMCP(
     name = "GenFilesMCP",
@@ -54,12 +134,159 @@ if not PRESENTON_API_KEY:
 PRESENTON_BASE_URL = getenv('PRESENTON_BASE_URL')
 if not PRESENTON_BASE_URL:
     raise ValueError("PRESENTON_BASE_URL environment variable is required")
+
+# Renderer replicas: PRESENTON_ENDPOINT, PRESENTON_BASE_URL and HWP_ENDPOINT accept comma separated lists.
+# Presenton endpoints and base URLs are paired by position (a single base URL is shared by all endpoints).
+# Slow generations can be hedged to a second replica after the observed latency percentile.
+ENABLE_HEDGING = getenv('ENABLE_HEDGING', 'false').lower() == 'true'
+HEDGE_PERCENTILE = float(getenv('HEDGE_PERCENTILE', '95'))
+HEDGE_MIN_SAMPLES = int(getenv('HEDGE_MIN_SAMPLES', '20'))
+PRESENTON_ENDPOINTS = parse_replicas(PRESENTON_ENDPOINT)
+PRESENTON_BASE_URLS = parse_replicas(PRESENTON_BASE_URL)
+if len(PRESENTON_BASE_URLS) == 1:
+    PRESENTON_BASE_URLS = PRESENTON_BASE_URLS * len(PRESENTON_ENDPOINTS)
+if len(PRESENTON_BASE_URLS) != len(PRESENTON_ENDPOINTS):
+    raise ValueError("PRESENTON_BASE_URL must list one URL per PRESENTON_ENDPOINT replica")
+PRESENTON_POOL = ReplicaPool(
+    "presenton",
+    [{"endpoint": endpoint, "base_url": base_url} for endpoint, base_url in zip(PRESENTON_ENDPOINTS, PRESENTON_BASE_URLS)],
+    hedge=ENABLE_HEDGING,
+    hedge_percentile=HEDGE_PERCENTILE,
+    hedge_min_samples=HEDGE_MIN_SAMPLES
+)
+# Large decks are split into sections rendered concurrently on Presenton and merged into one .pptx
+PRESENTON_DEFAULT_SLIDES = int(getenv('PRESENTON_DEFAULT_SLIDES', '8'))
+PRESENTON_CHUNK_THRESHOLD = int(getenv('PRESENTON_CHUNK_THRESHOLD', '12'))
+PRESENTON_CHUNK_SLIDES = int(getenv('PRESENTON_CHUNK_SLIDES', '8'))
+
+def render_presenton_deck(content: str, n_slides: int, template_type: str) -> bytes:
+    """
+    Generate, export and download one deck on the least loaded Presenton replica.
+    Returns:
+        bytes: The .pptx file.
+    """
+    # Presenton API 호출 (기본 템플릿 기반 PPT 생성)
+    headers = {
+        "Authorization": f"Bearer {PRESENTON_API_KEY}",
+        "Content-Type": "application/json"
+    }
+
+    # python_script 대신 LLM이 제공할 수 있는 텍스트 기반 prompt 생성
+    payload = {
+        "content": content,   # backward compatibility 유지
+        "n_slides": n_slides,
+        "language": "ko",
+        "template": template_type,  # 사용자가 선택한 템플릿 타입 사용
+        "export_as": None
+    }
+
+    logger.info("Presenton API 호출: template=%s, slides=%s", template_type, payload['n_slides'])
+
+    def presenton_generate(replica):
+        api_resp = post(replica["endpoint"], json=payload, headers=headers, timeout=600)
+
+        # Log response for debugging
+        if api_resp.status_code != 200:
+            logger.error("API Error Response: %s", Payload(api_resp.text))
+
+        api_resp.raise_for_status()
+        return api_resp.json()
+
+    # 가장 여유 있는 replica에서 생성 (옵션: 지연 시 다른 replica로 hedge)
+    replica, data = PRESENTON_POOL.call(presenton_generate)
+    logger.info("Presenton API 생성 응답 (replica %d): %s", replica.index, Payload(data))
+
+    # Two-step process: generate then export
+    presentation_id = data.get("presentation_id")
+    if not presentation_id:
+        error_msg = "Presentation ID not found in response"
+        logger.error("[Presenton Error] %s", error_msg)
+        raise Exception(f"[Presenton Error] {error_msg}")
+
+    logger.info("Presentation ID: %s, calling export API...", presentation_id)
+
+    # Call export API (bypasses Puppeteer) on the replica that generated the presentation
+    export_endpoint = replica["endpoint"].replace("/generate", "/export")
+    export_payload = {
+        "id": presentation_id,
+        "export_as": None
+    }
+
+    # Export counts as load on the replica but is kept out of the generation latency samples
+    with PRESENTON_POOL.track(replica, record_latency=False):
+        export_resp = post(export_endpoint, json=export_payload, headers=headers, timeout=800)
+    export_resp.raise_for_status()
+
+    export_data = export_resp.json()
+    logger.info("Export API 응답: %s", Payload(export_data))
+
+    file_path = export_data.get("path")
+    file_url = export_data.get("file_url")
+
+    if not file_path and not file_url:
+        error_msg = export_data.get("error", "path 또는 file_url이 export 응답에 없습니다")
+        logger.error("[Presenton Export Error] %s", error_msg)
+        raise Exception(f"[Presenton Export Error] {error_msg}")
+
+    # 생성된 PPT 파일 다운로드 또는 읽기
+    if file_path and file_path.startswith("/app_data/"):
+        # Local file path - read directly via Docker volume
+        # presenton container's /app_data is mounted to host, accessible from gen_files_mcp
+        # Convert to presenton container's file endpoint
+        file_download_url = f"{replica['base_url']}{file_path}"
+        logger.info("PPT 파일 다운로드 시작 (via HTTP): %s", file_download_url)
+        file_resp = get(file_download_url, timeout=300)
+    elif file_url:
+        # Remote URL - download via HTTP
+        logger.info("PPT 파일 다운로드 시작 (via URL): %s", file_url)
+        file_resp = get(file_url, timeout=300)
+    else:
+        raise Exception(f"Cannot download file from path: {file_path}")
+    file_resp.raise_for_status()
+    logger.info("PPT 파일 다운로드 완료: %d bytes", len(file_resp.content))
+    return file_resp.content
+
+def presenton_sections(n_slides: int) -> int:
+    """
+    Number of sections a deck of n_slides is split into (1 below PRESENTON_CHUNK_THRESHOLD).
+    """
+    return ceil(n_slides / PRESENTON_CHUNK_SLIDES) if n_slides > PRESENTON_CHUNK_THRESHOLD else 1
+
+def render_presenton_sections(content: str, n_slides: int, template_type: str) -> bytes:
+    """
+    Split the content into sections, render them concurrently and merge the decks
+    in section order. Every section after the first is asked not to add a cover slide.
+    At most as many sections render at once as the scheduler granted slots to the call.
+    """
+    sections = split_content(content, ceil(n_slides / PRESENTON_CHUNK_SLIDES))
+    if len(sections) == 1:
+        return render_presenton_deck(content, n_slides, template_type)
+
+    slide_counts = allocate_slides(sections, n_slides)
+    logger.info("Presenton 분할 생성: %d개 섹션, 슬라이드 %s", len(sections), slide_counts)
+
+    prompts = [sections[0]] + [
+        f"[전체 발표의 {idx + 1}/{len(sections)} 파트입니다. 표지와 목차 슬라이드 없이 본문 슬라이드만 생성하세요.]\n\n{section}"
+        for idx, section in enumerate(sections[1:], start=1)
+    ]
+    decks = parallel_map(
+        render_presenton_deck, prompts, slide_counts, [template_type] * len(sections),
+        max_workers=min(len(sections), granted_slots_var.get()), name="presenton-section"
+    )
+
+    return merge_presentations(decks)
+
 ## PPT 템플릿 우리껄로 수정
 @mcp.tool(
     name = "generate_powerpoint",
     title = "Generate PowerPoint presentation",
     description = POWERPOINT_TEMPLATE
 )
+@SCHEDULER.wrap(
+    "presenton",
+    cost=lambda kwargs: max(1, ceil((kwargs.get("n_slides") or PRESENTON_DEFAULT_SLIDES) / PRESENTON_CHUNK_SLIDES)),
+    width=lambda kwargs: presenton_sections(kwargs.get("n_slides") or PRESENTON_DEFAULT_SLIDES)
+)
 def generate_powerpoint(
     content: Annotated[
         str,
@@ -74,101 +301,32 @@ def generate_powerpoint(
         Field(description="Knowledge Base 등록용 유저 ID")
     ],
     template_type: Annotated[str, Field(description="PPT 템플릿 종류: general / modern / standard / swift", default="general")],
-    ctx: Context[ServerSession, None]
+    ctx: Context[ServerSession, None],
+    n_slides: Annotated[int, Field(description="생성할 슬라이드 수. 큰 덱은 섹션별로 병렬 생성 후 하나로 병합됩니다.", ge=1, le=100)] = PRESENTON_DEFAULT_SLIDES
 ) -> dict:
 
     """
     고도화 버전:
     - python_script는 더 이상 사용하지 않음
     - Presenton API로 PPT 생성
+    - n_slides가 PRESENTON_CHUNK_THRESHOLD를 넘으면 섹션별 병렬 생성 후 병합
     - 기존 upload_file(), create_knowledge() 흐름은 그대로 유지
     """
 
     try:
-        # [1] Presenton API 호출 (기본 템플릿 기반 PPT 생성)
-        headers = {
-            "Authorization": f"Bearer {PRESENTON_API_KEY}",
-            "Content-Type": "application/json"
-        }
-
-        # python_script 대신 LLM이 제공할 수 있는 텍스트 기반 prompt 생성
-        payload = {
-            "content": content,   # backward compatibility 유지
-            "n_slides": 8,
-            "language": "ko",
-            "template": template_type,  # 사용자가 선택한 템플릿 타입 사용
-            "export_as": None
-        }
-
-        logger.info(f"Presenton API 호출: template={template_type}, slides={payload['n_slides']}")
-
-        api_resp = post(PRESENTON_ENDPOINT, json=payload, headers=headers, timeout=600)
-        
-        # Log response for debugging
-        if api_resp.status_code != 200:
-            logger.error(f"API Error Response: {api_resp.text}")
-        
-        api_resp.raise_for_status()
-
-        data = api_resp.json()
-        logger.info(f"Presenton API 생성 응답: {data}")
-
-        # Two-step process: generate then export
-        presentation_id = data.get("presentation_id")
-        if not presentation_id:
-            error_msg = "Presentation ID not found in response"
-            logger.error(f"[Presenton Error] {error_msg}")
-            raise Exception(f"[Presenton Error] {error_msg}")
-
-        logger.info(f"Presentation ID: {presentation_id}, calling export API...")
-
-        # Call export API (bypasses Puppeteer)
-        export_endpoint = PRESENTON_ENDPOINT.replace("/generate", "/export")
-        export_payload = {
-            "id": presentation_id,
-            "export_as": None
-        }
-
-        export_resp = post(export_endpoint, json=export_payload, headers=headers, timeout=800)
-        export_resp.raise_for_status()
-
-        export_data = export_resp.json()
-        logger.info(f"Export API 응답: {export_data}")
-
-        file_path = export_data.get("path")
-        file_url = export_data.get("file_url")
-
-        if not file_path and not file_url:
-            error_msg = export_data.get("error", "path 또는 file_url이 export 응답에 없습니다")
-            logger.error(f"[Presenton Export Error] {error_msg}")
-            raise Exception(f"[Presenton Export Error] {error_msg}")
-
-        # [2] 생성된 PPT 파일 다운로드 또는 읽기
-        buffer = BytesIO()
-        
-        if file_path and file_path.startswith("/app_data/"):
-            # Local file path - read directly via Docker volume
-            # presenton container's /app_data is mounted to host, accessible from gen_files_mcp
-            import requests
-            # Convert to presenton container's file endpoint
-            file_download_url = f"{PRESENTON_BASE_URL}{file_path}"
-            logger.info(f"PPT 파일 다운로드 시작 (via HTTP): {file_download_url}")
-            file_resp = get(file_download_url, timeout=300)
-            file_resp.raise_for_status()
-            logger.info(f"PPT 파일 다운로드 완료: {len(file_resp.content)} bytes")
-            buffer.write(file_resp.content)
-        elif file_url:
-            # Remote URL - download via HTTP
-            logger.info(f"PPT 파일 다운로드 시작 (via URL): {file_url}")
-            file_resp = get(file_url, timeout=300)
-            file_resp.raise_for_status()
-            logger.info(f"PPT 파일 다운로드 완료: {len(file_resp.content)} bytes")
-            buffer.write(file_resp.content)
+        # [1] Presenton API 호출 및 [2] 생성된 PPT 파일 다운로드
+        if presenton_sections(n_slides) > 1:
+            pptx_bytes = render_presenton_sections(content, n_slides, template_type)
         else:
-            raise Exception(f"Cannot download file from path: {file_path}")
+            pptx_bytes = render_presenton_deck(content, n_slides, template_type)
+
+        buffer = BytesIO(pptx_bytes)
         buffer.name = f"{file_name}.pptx"
         buffer.seek(0)
 
+        # [3] 업로드 전 OOXML 최적화 (옵션)
+        buffer, sizes = optimize_before_upload(buffer)
+
         # [4] 인증 헤더 가져오기 (기존 그대로)
         bearer_token = None
         try:
@@ -177,7 +335,7 @@ def generate_powerpoint(
             logger.error("Error retrieving authorization header")
 
         # [5] Open-WebUI 업로드 (기존 그대로)
-        logger.info(f"Open-WebUI에 파일 업로드 시작: {file_name}.pptx")
+        logger.info("Open-WebUI에 파일 업로드 시작: %s.pptx", file_name)
         upload_result, request_data = upload_file(
             url=URL,
             token=bearer_token,
@@ -187,14 +345,15 @@ def generate_powerpoint(
         )
 
         if "error" in upload_result:
-            logger.error(f"파일 업로드 실패: {upload_result['error']}")
+            logger.error("파일 업로드 실패: %s", Payload(upload_result['error']))
             return upload_result
 
-        logger.info(f"파일 업로드 성공: {upload_result.get('file_path_download', 'N/A')}")
+        logger.info("파일 업로드 성공: %s", upload_result.get('file_path_download', 'N/A'))
+        upload_result.update(sizes)
 
         # [6] Knowledge Base 등록 (기존 그대로)
         if "file_path_download" in upload_result and ENABLE_CREATE_KNOWLEDGE:
-            logger.info(f"Knowledge Base 등록 시작: user_id={user_id}")
+            logger.info("Knowledge Base 등록 시작: user_id=%s", user_id)
             create_knowledge(
                 url=URL,
                 token=bearer_token,
@@ -206,22 +365,170 @@ def generate_powerpoint(
         return upload_result
 
     except Exception as e:
-        logger.error(f"PPT 생성 중 오류 발생: {str(e)}", exc_info=True)
+        logger.error("PPT 생성 중 오류 발생: %s", e, exc_info=True)
         return dumps({
             "error": {
                 "message": f"PPT 생성 실패: {str(e)}"
             }
         }, indent=4, ensure_ascii=False)
 
+@mcp.tool(
+    name="revise_powerpoint",
+    title="Revise slides of an existing PowerPoint presentation",
+    description="""Regenerate only the changed slides of a presentation made by generate_powerpoint and patch them into the existing file, instead of generating the whole deck again. Use full_context_pptx first to find the slide numbers. The other slides are kept unchanged. Use the same template_type as the original deck. Returns a markdown download link for the revised presentation."""
+)
+@SCHEDULER.wrap(
+    "presenton",
+    cost=lambda kwargs: max(1, len(kwargs.get("slides") or [])),
+    width=lambda kwargs: len(kwargs.get("slides") or [])
+)
+def revise_powerpoint(
+    file_id: Annotated[
+        str,
+        Field(description="ID of the existing pptx file to revise.")
+    ],
+    file_name: Annotated[
+        str,
+        Field(description="저장할 파일 이름 (확장자 제외).")
+    ],
+    slides: Annotated[
+        List[SlideRevision],
+        Field(description="Slides to replace with their new content. Example: [{'slide': 3, 'content': '관광객 유치 실적: 2024년 1,200만 명 (전년 대비 8% 증가)'}].")
+    ],
+    user_id: Annotated[
+        str,
+        Field(description="Knowledge Base 등록용 유저 ID")
+    ],
+    template_type: Annotated[str, Field(description="PPT 템플릿 종류: general / modern / standard / swift", default="general")],
+    ctx: Context[ServerSession, None]
+) -> dict:
+    """
+    Download the original deck and validate the slide numbers, render the revised
+    slides concurrently, then replace them in the original package and upload the result.
+    """
+    bearer_token = None
+    try:
+        bearer_token = ctx.request_context.request.headers.get("authorization")
+    except:
+        logger.error("Error retrieving authorization header")
+
+    try:
+        # Renders are slow and billed: check the request against the deck before starting any
+        pptx_file = download_file(URL, bearer_token, file_id)
+        if isinstance(pptx_file, dict) and "error" in pptx_file:
+            return dumps(pptx_file, indent=4, ensure_ascii=False)
+
+        deck = pptx_file.getvalue()
+        numbers = [revision.slide for revision in slides]
+        check_slide_numbers(deck, numbers)
+
+        prompts = [
+            f"[기존 발표의 {revision.slide}번 슬라이드를 대체합니다. 표지와 목차 슬라이드 없이 본문 슬라이드만 생성하세요.]\n\n{revision.content}"
+            for revision in slides
+        ]
+        logger.info("PPT 부분 수정: 슬라이드 %s", numbers)
+        decks = parallel_map(
+            render_presenton_deck, prompts, [revision.n_slides for revision in slides], [template_type] * len(slides),
+            max_workers=min(len(slides), granted_slots_var.get()), name="presenton-revision"
+        )
+
+        buffer = BytesIO(replace_slides(deck, dict(zip(numbers, decks))))
+        buffer.name = f"{file_name}.pptx"
+        buffer.seek(0)
+
+        buffer, sizes = optimize_before_upload(buffer)
+
+        upload_result, request_data = upload_file(
+            url=URL,
+            token=bearer_token,
+            file_data=buffer,
+            filename=file_name,
+            file_type="pptx"
+        )
+
+        if "error" in upload_result:
+            logger.error("파일 업로드 실패: %s", Payload(upload_result['error']))
+            return upload_result
+        upload_result.update(sizes)
+
+        if "file_path_download" in upload_result and ENABLE_CREATE_KNOWLEDGE:
+            create_knowledge(
+                url=URL,
+                token=bearer_token,
+                file_id=request_data["id"],
+                user_id=user_id
+            )
+
+        return upload_result
+
+    except Exception as e:
+        logger.error("PPT 수정 중 오류 발생: %s", e, exc_info=True)
+        return dumps({
+            "error": {
+                "message": f"PPT 수정 실패: {str(e)}"
+            }
+        }, indent=4, ensure_ascii=False)
+
 HWP_ENDPOINT = getenv('HWP_ENDPOINT')
 if not HWP_ENDPOINT:
     raise ValueError("HWP_ENDPOINT environment variable is required")
+HWP_POOL = ReplicaPool(
+    "hwp",
+    [{"endpoint": endpoint} for endpoint in parse_replicas(HWP_ENDPOINT)],
+    hedge=ENABLE_HEDGING,
+    hedge_percentile=HEDGE_PERCENTILE,
+    hedge_min_samples=HEDGE_MIN_SAMPLES
+)
+
+def render_hwp(content: str, file_name: str, template_type: str) -> bytes:
+    """
+    Generate and download one document on the least loaded HWP replica.
+    Returns:
+        bytes: The generated file.
+    """
+    # Request Payload
+    payload = {
+        "text": content,
+        "file_name": f"{file_name}.hwp",
+        "template_type": template_type
+    }
+
+    logger.info("HWP API 호출: template_type=%s", template_type)
+
+    def hwp_generate(replica):
+        api_resp = post(replica["endpoint"], json=payload, timeout=600)
+        api_resp.raise_for_status()
+        return api_resp
+
+    # 가장 여유 있는 replica에서 생성 (옵션: 지연 시 다른 replica로 hedge)
+    replica, api_resp = HWP_POOL.call(hwp_generate)
+
+    # JSON인지 Binary인지 판단
+    try:
+        data = api_resp.json()
+        logger.info("HWPX API JSON 응답 (replica %d): %s", replica.index, Payload(data))
+
+        file_id = data.get("file_id")
+        if not file_id:
+            raise Exception("file_id missing in HWP API JSON response")
+
+        # Download must reach the replica that generated the file
+        download_url = f"{replica['endpoint'].replace('/generate', '').rstrip('/')}/download/{file_id}"
+        file_resp = get(download_url, timeout=600)
+        file_resp.raise_for_status()
+        file_bytes = file_resp.content
+
+    except ValueError:
+        logger.info("HWPX API returned binary file directly")
+        file_bytes = api_resp.content
+    return file_bytes
 
 @mcp.tool(
     name="generate_hwp",
     title="Generate HWP document",
     description=HWP_TEMPLATE
 )
+@SCHEDULER.wrap("hwp")
 def generate_hwp(
     content: Annotated[str, Field(description="행정 문서 스타일의 HWP 문서 본문 텍스트 (제목/본문 포함)")],
     file_name: Annotated[str, Field(description="생성할 파일 이름 (확장자 제외)")],
@@ -238,42 +545,108 @@ def generate_hwp(
         except:
             logger.error("Error retrieving authorization header")
 
-        # Request Payload
-        payload = {
-            "text": content,
-            "file_name": f"{file_name}.hwp",
-            "template_type": template_type
-        }
+        file_bytes = render_hwp(content, file_name, template_type)
 
-        logger.info(f"HWP API 호출: template_type={template_type}")
+        # Buffer 생성
+        buffer = BytesIO(file_bytes)
+        buffer.name = f"{file_name}.hwp"
+        buffer.seek(0)
 
-        api_resp = post(HWP_ENDPOINT, json=payload, timeout=600)
-        api_resp.raise_for_status()
+        # Upload to Open-WebUI
+        upload_result, request_data = upload_file(
+            url=URL,
+            token=bearer_token,
+            file_data=buffer,
+            filename=file_name,
+            file_type="hwp"
+        )
 
-        # JSON인지 Binary인지 판단
-        try:
-            data = api_resp.json()
-            logger.info(f"HWPX API JSON 응답: {data}")
+        if "error" in upload_result:
+            logger.error("파일 업로드 실패: %s", Payload(upload_result['error']))
+            return upload_result
+
+        logger.info("HWP 업로드 성공: %s", upload_result.get('file_path_download'))
+
+        # Knowledge 등록
+        if "file_path_download" in upload_result and ENABLE_CREATE_KNOWLEDGE:
+            create_knowledge(
+                url=URL,
+                token=bearer_token,
+                file_id=request_data["id"],
+                user_id=user_id
+            )
 
-            file_id = data.get("file_id")
-            if not file_id:
-                raise Exception("file_id missing in HWP API JSON response")
+        return upload_result
 
-            download_url = f"{HWP_ENDPOINT.replace('/generate', '').rstrip('/')}/download/{file_id}"
-            file_resp = get(download_url, timeout=600)
-            file_resp.raise_for_status()
-            file_bytes = file_resp.content
+    except Exception as e:
+        logger.error("HWP 생성 오류: %s", e, exc_info=True)
+        return dumps({
+            "error": {
+                "message": f"HWP 생성 실패: {str(e)}"
+            }
+        }, indent=4, ensure_ascii=False)
+
+@mcp.tool(
+    name="revise_hwp",
+    title="Revise sections of an existing HWP document",
+    description="""Regenerate only the changed sections of an HWPX document made by generate_hwp and patch them into the existing file, instead of generating the whole document again. Use full_context_hwpx first to find the paragraph indexes of each section. A range that touches a table cell replaces the whole table. The other paragraphs are kept unchanged. Use the same template_type as the original document. Returns a markdown download link for the revised document."""
+)
+@SCHEDULER.wrap(
+    "hwp",
+    cost=lambda kwargs: max(1, len(kwargs.get("sections") or [])),
+    width=lambda kwargs: len(kwargs.get("sections") or [])
+)
+def revise_hwp(
+    file_id: Annotated[str, Field(description="ID of the existing HWP (HWPX) file to revise.")],
+    file_name: Annotated[str, Field(description="저장할 파일 이름 (확장자 제외)")],
+    sections: Annotated[
+        List[HwpRevision],
+        Field(description="Paragraph ranges to replace with their new text. Example: [{'start': 12, 'end': 18, 'content': '2. 추진 실적\\n- 청년 정착 지원 320명 ...'}].")
+    ],
+    user_id: Annotated[str, Field(description="Knowledge Base 등록용 유저 ID")],
+    template_type: Annotated[str, Field(description="HWP 템플릿 종류: default / v2", default="default")],
+    ctx: Context[ServerSession, None]
+) -> dict:
+    """
+    Download the original document and validate the paragraph ranges, render the revised
+    sections concurrently, then replace the ranges in the original package and upload the result.
+    """
+    bearer_token = None
+    try:
+        bearer_token = ctx.request_context.request.headers.get("authorization")
+    except:
+        logger.error("Error retrieving authorization header")
 
-        except ValueError:
-            logger.info("HWPX API returned binary file directly")
-            file_bytes = api_resp.content
+    try:
+        for revision in sections:
+            if revision.end < revision.start:
+                raise ValueError(f"Paragraph range {revision.start}-{revision.end} is empty")
+
+        # Renders are slow: check the ranges against the document before starting any
+        hwp_file = download_file(URL, bearer_token, file_id)
+        if isinstance(hwp_file, dict) and "error" in hwp_file:
+            return dumps(hwp_file, indent=4, ensure_ascii=False)
+
+        document = hwp_file.getvalue()
+        ranges = [(revision.start, revision.end) for revision in sections]
+        check_ranges(document, ranges)
+
+        logger.info("HWP 부분 수정: 문단 범위 %s", ranges)
+        fragments = parallel_map(
+            render_hwp,
+            [revision.content for revision in sections],
+            [f"{file_name}_{revision.start}" for revision in sections],
+            [template_type] * len(sections),
+            max_workers=min(len(sections), granted_slots_var.get()), name="hwp-revision"
+        )
 
-        # Buffer 생성
-        buffer = BytesIO(file_bytes)
+        buffer = BytesIO(replace_paragraphs(
+            document,
+            [(revision.start, revision.end, fragment) for revision, fragment in zip(sections, fragments)]
+        ))
         buffer.name = f"{file_name}.hwp"
         buffer.seek(0)
 
-        # Upload to Open-WebUI
         upload_result, request_data = upload_file(
             url=URL,
             token=bearer_token,
@@ -283,12 +656,11 @@ def generate_hwp(
         )
 
         if "error" in upload_result:
-            logger.error(f"파일 업로드 실패: {upload_result['error']}")
+            logger.error("파일 업로드 실패: %s", Payload(upload_result['error']))
             return upload_result
 
-        logger.info(f"HWP 업로드 성공: {upload_result.get('file_path_download')}")
+        logger.info("HWP 업로드 성공: %s", upload_result.get('file_path_download'))
 
-        # Knowledge 등록
         if "file_path_download" in upload_result and ENABLE_CREATE_KNOWLEDGE:
             create_knowledge(
                 url=URL,
@@ -300,10 +672,10 @@ def generate_hwp(
         return upload_result
 
     except Exception as e:
-        logger.error(f"HWP 생성 오류: {str(e)}", exc_info=True)
+        logger.error("HWP 수정 오류: %s", e, exc_info=True)
         return dumps({
             "error": {
-                "message": f"HWP 생성 실패: {str(e)}"
+                "message": f"HWP 수정 실패: {str(e)}"
             }
         }, indent=4, ensure_ascii=False)
 
@@ -313,11 +685,8 @@ def generate_hwp(
     title = "Generate Excel workbook",
     description = EXCEL_TEMPLATE
 )
-async def generate_excel(
-    python_script: Annotated[
-        str, 
-        Field(description="Complete Python script that generates the Excel workbook using the provided template.")
-    ],
+@SCHEDULER.wrap("exec")
+def generate_excel(
     file_name: Annotated[
         str, 
         Field(description="Desired name for the generated Excel file without the extension.")
@@ -326,10 +695,18 @@ async def generate_excel(
         str,
         Field(description="User ID to associate the knowledge base with the correct user.")
     ],
-    ctx: Context[ServerSession, None]
+    ctx: Context[ServerSession, None],
+    python_script: Annotated[
+        str | None, 
+        Field(description="Complete Python script that generates the Excel workbook using the provided template. Leave empty when document_spec is given.")
+    ] = None,
+    document_spec: Annotated[
+        ExcelSpec | None,
+        Field(description="Declarative Excel workbook rendered directly by the server without running a script. Preferred for simple workbooks.")
+    ] = None
 ) -> dict:
     """
-    Generate an Excel file using a Python script.
+    Generate an Excel file from a document spec or a Python script.
 
     Returns:
         dict: Contains 'file_path_download' with a markdown hyperlink for downloading the generated Excel file.
@@ -339,12 +716,23 @@ async def generate_excel(
         # Create a buffer for the Excel file
         buffer = BytesIO()
         buffer.name = f'{file_name}.xlsx'
-        context = {"xlsx_buffer": buffer}
-        exec(python_script, context)
+        if (python_script is None) == (document_spec is None):
+            raise ValueError("Provide exactly one of python_script or document_spec")
+        if document_spec is not None:
+            # Common case: render the spec directly, no script to compile and exec
+            render_xlsx(document_spec, buffer)
+        else:
+            context = {"xlsx_buffer": buffer, "xlsx_bulk": xlsx_bulk}
+            exec(compile(python_script, f"<generate_excel:{file_name}>", "exec"), context)
+            # Script functions reference the globals dict (a cycle): clear it so they are freed now, not at the next GC
+            context.clear()
 
         # Reset buffer position to start
         buffer.seek(0)
 
+        # Shrink the package before upload when optimisation is enabled
+        buffer, sizes = optimize_before_upload(buffer)
+
         # Retrieve authorization header from the request context
         try:
             bearer_token = ctx.request_context.request.headers.get("authorization")
@@ -360,6 +748,8 @@ async def generate_excel(
             filename=file_name,
             file_type="xlsx"
         )
+        if "file_path_download" in response:
+            response.update(sizes)
 
         # If upload is successful, add to knowledge base
         if "file_path_download" in response and ENABLE_CREATE_KNOWLEDGE:
@@ -392,16 +782,105 @@ async def generate_excel(
             ensure_ascii=False
         )
 
+@mcp.tool(
+    name="tabular_to_excel",
+    title="Convert a CSV file to a formatted Excel workbook",
+    description="""Convert an uploaded CSV or TSV file into a formatted Excel workbook without writing a script. The file is streamed, so it works for files with millions of rows. Column types (integer, number, date, datetime, text) are inferred and formatted. The header row is styled, frozen and filterable. Rows beyond Excel's limit of 1,048,575 continue on additional sheets. Use this instead of generate_excel whenever the data comes from an uploaded file. Returns a markdown download link plus the row count and the column types."""
+)
+@SCHEDULER.wrap("exec")
+def tabular_to_excel(
+    file_id: Annotated[
+        str,
+        Field(description="ID of the uploaded CSV or TSV file to convert.")
+    ],
+    file_name: Annotated[
+        str,
+        Field(description="The name of the original CSV or TSV file")
+    ],
+    user_id: Annotated[
+        str,
+        Field(description="User ID to associate the knowledge base with the correct user.")
+    ],
+    ctx: Context[ServerSession, None],
+    sheet_name: Annotated[str, Field(description="Name of the worksheet.", min_length=1, max_length=31)] = "Data",
+    delimiter: Annotated[str | None, Field(description="Field delimiter. Detected automatically when empty.", max_length=1)] = None,
+    encoding: Annotated[str | None, Field(description="Text encoding such as 'utf-8' or 'cp949'. Detected automatically when empty.")] = None,
+    has_header: Annotated[bool, Field(description="Whether the first row holds the column names.")] = True
+) -> dict:
+    """
+    Stream a CSV file from Open WebUI into a write-only workbook and upload it.
+    Returns:
+        dict: 'file_path_download' plus 'rows', 'sheets' and 'columns' of the conversion.
+    """
+    # Retrieve authorization header from the request context
+    try:
+        bearer_token = ctx.request_context.request.headers.get("authorization")
+        logger.info(f"Recieved authorization header!")
+    except:
+        logger.error(f"Error retrieving authorization header")
+        bearer_token = None
+
+    try:
+        chunks = download_file(URL, bearer_token, file_id, chunk_size=CHUNK_SIZE)
+        if isinstance(chunks, dict) and "error" in chunks:
+            return dumps(chunks, indent=4, ensure_ascii=False)
+
+        output_name = Path(file_name).stem
+        # Small workbooks stay in memory, large ones are spooled to disk
+        with SpooledTemporaryFile(max_size=SPOOL_SIZE) as buffer:
+            summary = csv_to_workbook(
+                chunks,
+                buffer,
+                file_name=file_name,
+                sheet_name=sheet_name,
+                delimiter=delimiter,
+                encoding=encoding,
+                has_header=has_header
+            )
+            buffer.seek(0)
+
+            # The workbook has no media, so the OOXML optimisation pass is skipped
+            response, request_data = upload_file(
+                url=URL,
+                token=bearer_token,
+                file_data=buffer,
+                filename=output_name,
+                file_type="xlsx"
+            )
+
+        if "file_path_download" in response and ENABLE_CREATE_KNOWLEDGE:
+            create_knowledge_status = create_knowledge(
+                url=URL,
+                token=bearer_token,
+                file_id=request_data['id'],
+                user_id=user_id
+            )
+            if not create_knowledge_status:
+                logger.error("Error creating or updating knowledge base")
+        elif "error" in response:
+            logger.error("Error uploading the file.")
+            return response
+
+        return {**response, **summary}
+
+    except Exception as e:
+        return dumps(
+            {
+                "error": {
+                    "message": str(e)
+                }
+            },
+            indent=4,
+            ensure_ascii=False
+        )
+
 @mcp.tool(
     name = "generate_word",
     title = "Generate Word document",
     description = WORD_TEMPLATE
 )
-async def generate_word(
-    python_script: Annotated[
-        str, 
-        Field(description="Complete Python script that generates the Word document using the provided template.")
-    ],
+@SCHEDULER.wrap("exec")
+def generate_word(
     file_name: Annotated[
         str, 
         Field(description="Desired name for the generated Word file without the extension.")
@@ -410,10 +889,18 @@ async def generate_word(
         str,
         Field(description="User ID to associate the knowledge base with the correct user.")
     ],
-    ctx: Context[ServerSession, None]
+    ctx: Context[ServerSession, None],
+    python_script: Annotated[
+        str | None, 
+        Field(description="Complete Python script that generates the Word document using the provided template. Leave empty when document_spec is given.")
+    ] = None,
+    document_spec: Annotated[
+        WordSpec | None,
+        Field(description="Declarative Word document rendered directly by the server without running a script. Preferred for simple documents.")
+    ] = None
 ) -> dict:
     """
-    Generate a Word file using a Python script.
+    Generate a Word file from a document spec or a Python script.
 
     Returns:
         dict: Contains 'file_path_download' with a markdown hyperlink for downloading the generated Word file.
@@ -423,12 +910,23 @@ async def generate_word(
         # Create a buffer for the Word file
         buffer = BytesIO()
         buffer.name = f'{file_name}.docx'
-        context = {"docx_buffer": buffer}
-        exec(python_script, context)
+        if (python_script is None) == (document_spec is None):
+            raise ValueError("Provide exactly one of python_script or document_spec")
+        if document_spec is not None:
+            # Common case: render the spec directly, no script to compile and exec
+            render_docx(document_spec, buffer)
+        else:
+            context = {"docx_buffer": buffer}
+            exec(compile(python_script, f"<generate_word:{file_name}>", "exec"), context)
+            # Script functions reference the globals dict (a cycle): clear it so they are freed now, not at the next GC
+            context.clear()
 
         # Reset buffer position to start
         buffer.seek(0)
 
+        # Shrink the package before upload when optimisation is enabled
+        buffer, sizes = optimize_before_upload(buffer)
+
         # Retrieve authorization header from the request context
         try:
             bearer_token = ctx.request_context.request.headers.get("authorization")
@@ -444,6 +942,8 @@ async def generate_word(
             filename=file_name,
             file_type="docx"
         )
+        if "file_path_download" in response:
+            response.update(sizes)
 
         # If upload is successful, add to knowledge base
         if "file_path_download" in response and ENABLE_CREATE_KNOWLEDGE:
@@ -481,7 +981,8 @@ async def generate_word(
     title = "Generate Markdown document",
     description = MARKDOWN_TEMPLATE
 ) 
-async def generate_markdown(
+@SCHEDULER.wrap("exec")
+def generate_markdown(
     python_script: Annotated[
         str, 
         Field(description="Complete Python script that generates the Markdown document using the provided template.")
@@ -508,7 +1009,9 @@ async def generate_markdown(
         buffer = BytesIO()
         buffer.name = f'{file_name}.md'
         context = {"md_buffer": buffer}
-        exec(python_script, context)
+        exec(compile(python_script, f"<generate_markdown:{file_name}>", "exec"), context)
+        # Script functions reference the globals dict (a cycle): clear it so they are freed now, not at the next GC
+        context.clear()
 
         # Reset buffer position to start
         buffer.seek(0)
@@ -566,7 +1069,8 @@ async def generate_markdown(
     description="""Return the index, style and text of each element in a docx document. This includes paragraphs, headings, tables, images, and other components. The output is a JSON object that provides a detailed representation of the document's structure and content.
     The Agent will use this tool to understand the content and structure of the document before perform corrections (spelling, grammar, style suggestions, idea enhancements). Agent have to identify the index of each element to be able to add comments in the review_docx tool."""
 )
-async def full_context_docx(
+@SCHEDULER.wrap("interactive")
+def full_context_docx(
     file_id: Annotated[
         str, 
         Field(description="ID of the existing docx file to analyze (from a previous chat upload).")
@@ -649,12 +1153,230 @@ async def full_context_docx(
             ensure_ascii=False
         )
 
+@mcp.tool(
+    name="full_context_xlsx",
+    title="Return the structure of an xlsx workbook",
+    description="""Return the sheets, header row, a sample of rows and per-column statistics (dtype, count, null count, min, max, mean) of an xlsx workbook. The workbook is streamed, so large files are summarised quickly without returning every cell.
+    The Agent will use this tool to understand the content and structure of an Excel file before editing it, reporting on it or generating a new workbook from it."""
+)
+@SCHEDULER.wrap("interactive")
+def full_context_xlsx(
+    file_id: Annotated[
+        str,
+        Field(description="ID of the existing xlsx file to analyze (from a previous chat upload).")
+    ],
+    file_name: Annotated[
+        str,
+        Field(description="The name of the original xlsx file")
+    ],
+    ctx: Context[ServerSession, None],
+    header_row: Annotated[
+        int,
+        Field(description="1-based row number that holds the column headers.", ge=1)
+    ] = 1,
+    sample_rows: Annotated[
+        int,
+        Field(description="Number of data rows to return as a sample for each sheet.", ge=0, le=100)
+    ] = 10
+) -> dict:
+    """
+    Return the structure of an xlsx workbook including sheets, headers, sample rows and column statistics.
+    Returns:
+        dict: A JSON object with the structure of the workbook.
+    """
+    # Retrieve authorization header from the request context
+    try:
+        bearer_token = ctx.request_context.request.headers.get("authorization")
+        logger.info(f"Recieved authorization header!")
+    except:
+        logger.error(f"Error retrieving authorization header")
+
+    try:
+        # Download in memory the xlsx file using the download_file helper
+        xlsx_file = download_file(
+            url=URL,
+            token=bearer_token,
+            file_id=file_id
+        )
+
+        if isinstance(xlsx_file, dict) and "error" in xlsx_file:
+            return dumps(
+                xlsx_file,
+                indent=4,
+                ensure_ascii=False
+            )
+
+        # Stream the workbook in read-only mode and summarise every sheet
+        summary = summarize_workbook(
+            xlsx_file,
+            header_row=header_row,
+            sample_rows=sample_rows
+        )
+
+        return dumps(
+            {
+                "file_name": file_name,
+                "file_id": file_id,
+                **summary
+            },
+            indent=4,
+            ensure_ascii=False,
+            default=str
+        )
+    except Exception as e:
+        return dumps(
+            {
+                "error": {
+                    "message": str(e)
+                }
+            },
+            indent=4,
+            ensure_ascii=False
+        )
+
+@mcp.tool(
+    name="full_context_pptx",
+    title="Return the structure of a pptx presentation",
+    description="""Return the index, slide, shape, style and text of each text element in a pptx presentation. This includes titles, body placeholders, text boxes, grouped shapes, table cells and speaker notes. The output is a JSON object that provides a detailed representation of the presentation's structure and content.
+    The Agent will use this tool to understand the content and structure of the presentation before revising it or generating an updated version."""
+)
+@SCHEDULER.wrap("interactive")
+def full_context_pptx(
+    file_id: Annotated[
+        str,
+        Field(description="ID of the existing pptx file to analyze (from a previous chat upload).")
+    ],
+    file_name: Annotated[
+        str,
+        Field(description="The name of the original pptx file")
+    ],
+    ctx: Context[ServerSession, None]
+) -> dict:
+    """
+    Return the structure of a pptx presentation including index, slide, shape, style, and text of each element.
+    Returns:
+        dict: A JSON object with the structure of the presentation.
+    """
+    # Retrieve authorization header from the request context
+    try:
+        bearer_token = ctx.request_context.request.headers.get("authorization")
+        logger.info(f"Recieved authorization header!")
+    except:
+        logger.error(f"Error retrieving authorization header")
+
+    try:
+        # Download in memory the pptx file using the download_file helper
+        pptx_file = download_file(
+            url=URL,
+            token=bearer_token,
+            file_id=file_id
+        )
+
+        if isinstance(pptx_file, dict) and "error" in pptx_file:
+            return dumps(
+                pptx_file,
+                indent=4,
+                ensure_ascii=False
+            )
+
+        # Structure to return
+        text_body = {
+            "file_name": file_name,
+            "file_id": file_id,
+            "body": extract_pptx(pptx_file)
+        }
+
+        return dumps(
+            text_body,
+            indent=4,
+            ensure_ascii=False
+        )
+    except Exception as e:
+        return dumps(
+            {
+                "error": {
+                    "message": str(e)
+                }
+            },
+            indent=4,
+            ensure_ascii=False
+        )
+
+@mcp.tool(
+    name="full_context_hwpx",
+    title="Return the structure of an hwpx document",
+    description="""Return the index, section, style and text of each paragraph in an HWPX (OWPML) document, including paragraphs inside table cells. Binary .hwp files are not supported. The output is a JSON object that provides a detailed representation of the document's structure and content.
+    The Agent will use this tool to understand the content and structure of the document before revising it or generating an updated version."""
+)
+@SCHEDULER.wrap("interactive")
+def full_context_hwpx(
+    file_id: Annotated[
+        str,
+        Field(description="ID of the existing hwpx file to analyze (from a previous chat upload).")
+    ],
+    file_name: Annotated[
+        str,
+        Field(description="The name of the original hwpx file")
+    ],
+    ctx: Context[ServerSession, None]
+) -> dict:
+    """
+    Return the structure of an HWPX document including index, section, style, and text of each paragraph.
+    Returns:
+        dict: A JSON object with the structure of the document.
+    """
+    # Retrieve authorization header from the request context
+    try:
+        bearer_token = ctx.request_context.request.headers.get("authorization")
+        logger.info(f"Recieved authorization header!")
+    except:
+        logger.error(f"Error retrieving authorization header")
+
+    try:
+        # Download in memory the hwpx file using the download_file helper
+        hwpx_file = download_file(
+            url=URL,
+            token=bearer_token,
+            file_id=file_id
+        )
+
+        if isinstance(hwpx_file, dict) and "error" in hwpx_file:
+            return dumps(
+                hwpx_file,
+                indent=4,
+                ensure_ascii=False
+            )
+
+        # Structure to return
+        text_body = {
+            "file_name": file_name,
+            "file_id": file_id,
+            "body": extract_hwpx(hwpx_file)
+        }
+
+        return dumps(
+            text_body,
+            indent=4,
+            ensure_ascii=False
+        )
+    except Exception as e:
+        return dumps(
+            {
+                "error": {
+                    "message": str(e)
+                }
+            },
+            indent=4,
+            ensure_ascii=False
+        )
+
 @mcp.tool(
     name="review_docx",
     title="Review and comment on docx document",
     description="""Review an existing docx document, perform corrections (spelling, grammar, style suggestions, idea enhancements), and add comments to cells. Returns a markdown hyperlink for downloading the reviewed file."""
 )
-async def review_docx(
+@SCHEDULER.wrap("exec")
+def review_docx(
     file_id: Annotated[
         str, 
         Field(description="ID of the existing docx file to review (from a previous chat upload).")
@@ -726,6 +1448,9 @@ async def review_docx(
         doc.save(buffer)
         buffer.seek(0)
 
+        # Shrink the package before upload when optimisation is enabled
+        buffer, sizes = optimize_before_upload(buffer)
+
         # Upload the reviewed docx file
         response, request_data = upload_file(
             url=URL, 
@@ -734,6 +1459,8 @@ async def review_docx(
             filename=f"{Path(file_name).stem}_reviewed",
             file_type="docx"
         )
+        if "file_path_download" in response:
+            response.update(sizes)
 
         # If upload is successful, add to knowledge base
         if "file_path_download" in response and ENABLE_CREATE_KNOWLEDGE:
@@ -767,10 +1494,253 @@ async def review_docx(
             ensure_ascii=False
         )
     
+def edit_docx_file(item: DocxFileEdits, bearer_token: str, user_id: str) -> dict:
+    """
+    Download one docx file, apply its edits in a single pass and upload the result.
+    """
+    result = {"file_id": item.file_id, "file_name": item.file_name}
+    try:
+        docx_file = download_file(URL, bearer_token, item.file_id)
+        if isinstance(docx_file, dict) and "error" in docx_file:
+            return {**result, **docx_file}
+
+        doc = Document(docx_file)
+        result.update(apply_edits(doc, item.edits, track_changes=item.track_changes))
+
+        # Create a buffer for the edited file
+        buffer = BytesIO()
+        buffer.name = f'{Path(item.file_name).stem}_edited.docx'
+        doc.save(buffer)
+        buffer.seek(0)
+
+        # Shrink the package before upload when optimisation is enabled
+        buffer, sizes = optimize_before_upload(buffer)
+
+        response, request_data = upload_file(
+            url=URL,
+            token=bearer_token,
+            file_data=buffer,
+            filename=f"{Path(item.file_name).stem}_edited",
+            file_type="docx"
+        )
+        result.update(response)
+        if "file_path_download" in response:
+            result.update(sizes)
+
+        if "file_path_download" in response and ENABLE_CREATE_KNOWLEDGE:
+            create_knowledge_status = create_knowledge(
+                url=URL,
+                token=bearer_token,
+                file_id=request_data['id'],
+                user_id=user_id,
+                knowledge_name="Documents Reviewed by AI"
+            )
+            if not create_knowledge_status:
+                logger.error("Error creating or updating knowledge base")
+        elif "error" in response:
+            logger.error("Error uploading the file.")
+        return result
+
+    except Exception as e:
+        logger.error("edit_docx failed for %s: %s", item.file_id, e)
+        return {**result, "error": {"message": str(e)}}
+
+@mcp.tool(
+    name="edit_docx",
+    title="Edit, track changes and comment on docx documents",
+    description="""Apply a batch of edits to one or more existing docx documents in a single pass: text replacements, insertions and deletions (as tracked changes by default) and comments on any text, paragraph or table cell. Use full_context_docx first to get paragraph indexes. An edit without a paragraph or table cell target applies to every occurrence in the document. Several files are processed concurrently. Returns a markdown download link per file plus the edits that could not be applied."""
+)
+@SCHEDULER.wrap(
+    "exec",
+    cost=lambda kwargs: max(1, len(kwargs.get("files") or [])),
+    width=lambda kwargs: len(kwargs.get("files") or [])
+)
+def edit_docx(
+    files: Annotated[
+        List[DocxFileEdits],
+        Field(description="Files to edit, each with its file_id, file_name and list of edits. Example: [{'file_id': '...', 'file_name': 'report.docx', 'edits': [{'action': 'replace', 'find': '전북', 'text': '전라북도'}, {'action': 'comment', 'paragraph': 3, 'text': '근거 자료 보완 필요'}, {'action': 'comment', 'table': 0, 'row': 2, 'cell': 1, 'text': '금액 확인'}]}].")
+    ],
+    user_id: Annotated[
+        str,
+        Field(description="User ID to associate the knowledge base with the correct user.")
+    ],
+    ctx: Context[ServerSession, None]
+) -> dict:
+    """
+    Edit several docx documents concurrently.
+    Returns:
+        dict: 'files' with, per file, 'file_path_download' (or 'error'), 'applied' and 'skipped' edits.
+    """
+    # Retrieve authorization header from the request context
+    try:
+        bearer_token = ctx.request_context.request.headers.get("authorization")
+        logger.info(f"Recieved authorization header!")
+    except:
+        logger.error(f"Error retrieving authorization header")
+        bearer_token = None
+
+    # Files are processed on as many exec slots as the scheduler granted this call
+    results = parallel_map(
+        edit_docx_file, files, [bearer_token] * len(files), [user_id] * len(files),
+        max_workers=min(len(files), granted_slots_var.get()), name="edit-docx"
+    )
+
+    return dumps({"files": results}, indent=4, ensure_ascii=False)
+
+# Startup warm-up and readiness probes for the load balancer
+READINESS = Readiness(
+    backends={
+        "owui": URL,
+        **{f"presenton_{replica.index}": replica["base_url"] for replica in PRESENTON_POOL.replicas},
+        **{f"hwp_{replica.index}": replica["endpoint"] for replica in HWP_POOL.replicas}
+    },
+    require_backends=getenv('READINESS_REQUIRE_BACKENDS', 'true').lower() == 'true',
+    probe_interval=float(getenv('READINESS_PROBE_INTERVAL', '30'))
+)
+
+# Event-loop lag watchdog: stalls longer than the threshold are logged with the blocking stack
+ENABLE_LOOP_WATCHDOG = getenv('ENABLE_LOOP_WATCHDOG', 'true').lower() == 'true'
+LOOP_WATCHDOG = LoopWatchdog(
+    threshold=float(getenv('LOOP_WATCHDOG_THRESHOLD_MS', '250')) / 1000,
+    interval=float(getenv('LOOP_WATCHDOG_INTERVAL_MS', '100')) / 1000
+)
+
+# Diagnostic routes (/loop, /memory*) expose stacks and allocation sites and can toggle tracing.
+# With ADMIN_TOKEN set they require 'Authorization: Bearer <ADMIN_TOKEN>'; without it they only answer localhost.
+ADMIN_TOKEN = getenv('ADMIN_TOKEN', '')
+
+# tracemalloc memory-growth tracking (off by default, can be started at runtime via POST /memory/start)
+ENABLE_MEMORY_PROFILING = getenv('ENABLE_MEMORY_PROFILING', 'false').lower() == 'true'
+MEMORY = MemoryTracker(
+    interval=float(getenv('MEMORY_SNAPSHOT_INTERVAL', '300')),
+    frames=int(getenv('MEMORY_TRACE_FRAMES', '1')),
+    top_n=int(getenv('MEMORY_TOP_N', '20'))
+)
+
+# Opt-in traffic recording for offline replay (benchmarks/replay.py); off unless RECORD_TRAFFIC_DIR is set
+# RECORD_REDACT_PATTERNS is an optional JSON list of extra regular expressions to mask
+RECORD_TRAFFIC_DIR = getenv('RECORD_TRAFFIC_DIR', '')
+RECORDER = TrafficRecorder(
+    RECORD_TRAFFIC_DIR,
+    backends={
+        "OWUI_URL": URL,
+        "PRESENTON_ENDPOINT": PRESENTON_ENDPOINT,
+        "PRESENTON_BASE_URL": PRESENTON_BASE_URL,
+        "HWP_ENDPOINT": HWP_ENDPOINT
+    },
+    redact_patterns=loads(getenv('RECORD_REDACT_PATTERNS', '[]')),
+    pseudonym_fields=tuple(field.strip() for field in getenv('RECORD_PSEUDONYM_FIELDS', 'user_id').split(',') if field.strip())
+)
+
+def admin_denied(request: Request) -> JSONResponse | None:
+    """
+    Check access to a diagnostic route.
+    Returns:
+        JSONResponse | None: The error response to send, or None when access is allowed.
+    """
+    if ADMIN_TOKEN:
+        if compare_digest(request.headers.get("authorization", ""), f"Bearer {ADMIN_TOKEN}"):
+            return None
+        return JSONResponse({"error": {"message": "Admin token required"}}, status_code=401)
+    if request.client and request.client.host in ("127.0.0.1", "::1", "localhost"):
+        return None
+    return JSONResponse({"error": {"message": "Only available from localhost unless ADMIN_TOKEN is set"}}, status_code=403)
+
+@mcp.custom_route("/healthz", methods=["GET"])
+async def healthz(request: Request) -> JSONResponse:
+    """
+    Liveness probe: the process is up and serving HTTP.
+    """
+    return JSONResponse({"status": "ok"})
+
+@mcp.custom_route("/readyz", methods=["GET"])
+async def readyz(request: Request) -> JSONResponse:
+    """
+    Readiness probe: 200 once warm-up has finished and every required check passes, 503 otherwise.
+    """
+    report = READINESS.report()
+    return JSONResponse(report, status_code=200 if report["ready"] else 503)
+
+@mcp.custom_route("/scheduler", methods=["GET"])
+async def scheduler_stats(request: Request) -> JSONResponse:
+    """
+    Report slot occupancy and per-user queue times of every scheduler lane.
+    """
+    return JSONResponse(SCHEDULER.stats())
+
+@mcp.custom_route("/replicas", methods=["GET"])
+async def replica_stats(request: Request) -> JSONResponse:
+    """
+    Report outstanding requests and latency of every Presenton and HWP replica.
+    """
+    return JSONResponse({
+        "presenton": PRESENTON_POOL.stats(),
+        "hwp": HWP_POOL.stats()
+    })
+
+@mcp.custom_route("/loop", methods=["GET"])
+async def loop_stats(request: Request) -> JSONResponse:
+    """
+    Report event-loop lag percentiles and the most recent stalls with their stacks.
+    """
+    if denied := admin_denied(request):
+        return denied
+    return JSONResponse(LOOP_WATCHDOG.stats())
+
+@mcp.custom_route("/memory", methods=["GET"])
+async def memory_report(request: Request) -> JSONResponse:
+    """
+    Report RSS, per-tool peak/retained memory and the top growth sites.
+    Query parameters: 'limit' (number of sites) and 'snapshot=true' to diff against a fresh snapshot.
+    """
+    if denied := admin_denied(request):
+        return denied
+    try:
+        limit = int(request.query_params.get("limit", MEMORY.top_n))
+        if limit < 1:
+            raise ValueError
+    except ValueError:
+        return JSONResponse({"error": {"message": "'limit' must be a positive integer"}}, status_code=400)
+    fresh = request.query_params.get("snapshot", "false").lower() == "true"
+    # Snapshots walk every traced block, keep them off the event loop
+    report = await anyio.to_thread.run_sync(lambda: MEMORY.report(limit=limit, fresh=fresh))
+    return JSONResponse(report)
+
+@mcp.custom_route("/memory/start", methods=["POST"])
+async def memory_start(request: Request) -> JSONResponse:
+    """
+    Start tracemalloc tracing and record the baseline snapshot.
+    """
+    if denied := admin_denied(request):
+        return denied
+    await anyio.to_thread.run_sync(MEMORY.start)
+    return JSONResponse({"tracing": True})
+
+@mcp.custom_route("/memory/stop", methods=["POST"])
+async def memory_stop(request: Request) -> JSONResponse:
+    """
+    Stop tracemalloc tracing and drop the snapshots.
+    """
+    if denied := admin_denied(request):
+        return denied
+    MEMORY.stop()
+    return JSONResponse({"tracing": False})
+
+async def serve() -> None:
+    """
+    Run the streamable HTTP server, with the loop watchdog attached to its event loop.
+    """
+    if ENABLE_LOOP_WATCHDOG:
+        LOOP_WATCHDOG.start()
+    await mcp.run_streamable_http_async()
+
 # Initialize and run the server
 if __name__ == "__main__":
-    mcp.run(
-        transport="streamable-http"
-    )
+    READINESS.start()
+    if ENABLE_MEMORY_PROFILING:
+        MEMORY.start()
+    if RECORD_TRAFFIC_DIR:
+        RECORDER.start()
+    anyio.run(serve)
 
 
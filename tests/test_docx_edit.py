@@ -0,0 +1,64 @@
+from io import BytesIO
+
+from docx import Document
+
+from utils.docx_edit import DocxEdit, apply_edits
+
+def _document(*paragraphs: str):
+    doc = Document()
+    for text in paragraphs:
+        doc.add_paragraph(text)
+    return doc
+
+def _reload(doc):
+    buffer = BytesIO()
+    doc.save(buffer)
+    buffer.seek(0)
+    return Document(buffer)
+
+def _edits(*edits: dict) -> list[DocxEdit]:
+    return [DocxEdit.model_validate(edit) for edit in edits]
+
+def test_document_wide_edits_with_the_same_find_are_all_applied():
+    doc = _document("전북 관광 활성화", "전북 예산")
+    result = apply_edits(doc, _edits(
+        {"action": "comment", "find": "전북", "text": "명칭 확인"},
+        {"action": "replace", "find": "전북", "text": "전북특별자치도"}
+    ), track_changes=False)
+
+    assert result == {"applied": 4, "skipped": []}
+    doc = _reload(doc)
+    assert [p.text for p in doc.paragraphs] == ["전북특별자치도 관광 활성화", "전북특별자치도 예산"]
+    assert len(list(doc.comments)) == 2
+
+def test_comment_after_a_tracked_replace_covers_the_replacement():
+    doc = _document("전북 관광")
+    result = apply_edits(doc, _edits(
+        {"action": "replace", "find": "전북", "text": "전라북도"},
+        {"action": "comment", "find": "전북", "text": "명칭 변경"}
+    ))
+
+    assert result == {"applied": 2, "skipped": []}
+    xml = doc.paragraphs[0]._p.xml
+    assert xml.index("w:delText") < xml.index("commentRangeStart") < xml.index("전라북도") < xml.index("commentRangeEnd")
+
+def test_second_text_change_of_the_same_range_is_skipped():
+    doc = _document("전북 관광")
+    result = apply_edits(doc, _edits(
+        {"action": "replace", "find": "전북", "text": "전라북도"},
+        {"action": "delete", "find": "전북"}
+    ), track_changes=False)
+
+    assert result == {"applied": 1, "skipped": [{"edit": 1, "reason": "overlaps another edit"}]}
+    assert doc.paragraphs[0].text == "전라북도 관광"
+
+def test_inserts_at_the_same_position_keep_their_order():
+    for track_changes in (True, False):
+        doc = _document("예산")
+        apply_edits(doc, _edits(
+            {"action": "insert", "paragraph": 0, "text": " 120억원"},
+            {"action": "insert", "paragraph": 0, "text": " (잠정)"}
+        ), track_changes=track_changes)
+
+        text = "".join(t.text for t in doc.paragraphs[0]._p.iter("{http://schemas.openxmlformats.org/wordprocessingml/2006/main}t"))
+        assert text == "예산 120억원 (잠정)"
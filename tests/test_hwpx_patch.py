@@ -0,0 +1,83 @@
+from io import BytesIO
+from zipfile import ZipFile, ZIP_DEFLATED, ZIP_STORED
+
+import pytest
+from lxml import etree
+
+from utils.hwpx_context import extract_hwpx
+from utils.hwpx_patch import check_ranges, replace_paragraphs
+
+NAMESPACES = {
+    "hs": "http://www.hancom.co.kr/hwpml/2011/section",
+    "hp": "http://www.hancom.co.kr/hwpml/2011/paragraph"
+}
+
+def _paragraph(text: str, first: bool = False) -> str:
+    layout = '<hp:run charPrIDRef="0"><hp:secPr id=""/><hp:ctrl><hp:colPr/></hp:ctrl></hp:run>' if first else ""
+    return f'<hp:p id="0" paraPrIDRef="0" styleIDRef="0">{layout}<hp:run charPrIDRef="0"><hp:t>{text}</hp:t></hp:run></hp:p>'
+
+def _table(*cells: str) -> str:
+    row = "".join(f"<hp:tc><hp:subList>{_paragraph(text)}</hp:subList></hp:tc>" for text in cells)
+    return f'<hp:p id="0"><hp:run><hp:tbl><hp:tr>{row}</hp:tr></hp:tbl></hp:run></hp:p>'
+
+def _hwpx(*paragraphs: str) -> bytes:
+    namespaces = " ".join(f'xmlns:{prefix}="{uri}"' for prefix, uri in NAMESPACES.items())
+    buffer = BytesIO()
+    with ZipFile(buffer, "w") as package:
+        package.writestr("mimetype", "application/hwp+zip", compress_type=ZIP_STORED)
+        package.writestr("Contents/header.xml", '<hh:head xmlns:hh="urn:header"/>', compress_type=ZIP_DEFLATED)
+        package.writestr(
+            "Contents/section0.xml",
+            f'<?xml version="1.0" encoding="UTF-8"?><hs:sec {namespaces}>{"".join(paragraphs)}</hs:sec>',
+            compress_type=ZIP_DEFLATED
+        )
+    return buffer.getvalue()
+
+def _texts(document: bytes) -> list[str]:
+    return [record["text"] for record in extract_hwpx(BytesIO(document))]
+
+def _section(document: bytes):
+    with ZipFile(BytesIO(document)) as package:
+        return etree.fromstring(package.read("Contents/section0.xml"))
+
+# Paragraph indexes: 0 제목, 1 개요, 2 금액 (cell), 3 table, 4 추진
+DOCUMENT = _hwpx(
+    _paragraph("제목", first=True),
+    _paragraph("개요"),
+    _table("금액"),
+    _paragraph("추진")
+)
+
+def test_cell_paragraph_range_replaces_the_whole_table():
+    patched = replace_paragraphs(DOCUMENT, [(2, 2, _hwpx(_paragraph("표 대체", first=True)))])
+
+    assert _texts(patched) == ["제목", "개요", "표 대체", "추진"]
+    assert not _section(patched).xpath("//hp:tbl", namespaces=NAMESPACES)
+
+def test_ranges_overlapping_after_widening_are_rejected():
+    with pytest.raises(ValueError, match="overlaps"):
+        check_ranges(DOCUMENT, [(2, 2), (3, 3)])
+    with pytest.raises(ValueError, match="overlaps"):
+        replace_paragraphs(DOCUMENT, [(0, 1, _hwpx(_paragraph("a"))), (1, 2, _hwpx(_paragraph("b")))])
+    with pytest.raises(ValueError, match="outside the document"):
+        check_ranges(DOCUMENT, [(4, 5)])
+
+def test_section_properties_stay_when_the_first_paragraph_is_replaced():
+    fragment = _hwpx(_paragraph("새 제목", first=True), _paragraph("부제"))
+    patched = replace_paragraphs(DOCUMENT, [(0, 0, fragment)])
+
+    assert _texts(patched)[:3] == ["새 제목", "부제", "개요"]
+    root = _section(patched)
+    assert len(root.xpath("//hp:secPr", namespaces=NAMESPACES)) == 1
+    assert root[0].xpath(".//hp:secPr", namespaces=NAMESPACES)
+    assert root[0].xpath("string(.//hp:t)", namespaces=NAMESPACES) == "새 제목"
+
+def test_other_parts_keep_their_order_and_compression():
+    patched = replace_paragraphs(DOCUMENT, [(4, 4, _hwpx(_paragraph("추진 수정")))])
+
+    with ZipFile(BytesIO(patched)) as package:
+        assert [(info.filename, info.compress_type) for info in package.infolist()] == [
+            ("mimetype", ZIP_STORED),
+            ("Contents/header.xml", ZIP_DEFLATED),
+            ("Contents/section0.xml", ZIP_DEFLATED)
+        ]
@@ -0,0 +1,83 @@
+import asyncio
+from threading import Event
+
+from utils.scheduler import FairQueue, granted_slots_var
+
+def _record(order: list, user_id: str):
+    order.append(user_id)
+
+async def _run_blocked(lane: FairQueue, jobs: list[str], **kwargs) -> list[str]:
+    """
+    Queue jobs behind a running blocker job and return the users in the order they ran.
+    """
+    release = Event()
+    blocker = asyncio.create_task(lane.run("blocker", release.wait, 5))
+    await asyncio.sleep(0)
+    order = []
+    tasks = [asyncio.create_task(lane.run(user_id, _record, order, user_id, **kwargs)) for user_id in jobs]
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(blocker, *tasks)
+    return order
+
+def test_users_are_interleaved_by_start_tag():
+    lane = FairQueue("test", slots=1, per_user_limit=1)
+    order = asyncio.run(_run_blocked(lane, ["a", "a", "a", "b"]))
+    assert order == ["a", "b", "a", "a"]
+
+def test_heavier_weight_gets_a_larger_share():
+    lane = FairQueue("test", slots=1, per_user_limit=1, weights={"a": 2})
+    order = asyncio.run(_run_blocked(lane, ["a", "a", "a", "a", "b", "b"]))
+    assert order == ["a", "b", "a", "a", "b", "a"]
+
+def test_width_is_granted_and_capped_at_the_lane_slots_only():
+    async def main():
+        lane = FairQueue("test", slots=4, per_user_limit=1)
+        return (
+            await lane.run("a", granted_slots_var.get, width=3),
+            await lane.run("a", granted_slots_var.get, width=10),
+            await lane.run("a", granted_slots_var.get)
+        )
+
+    assert asyncio.run(main()) == (3, 4, 1)
+
+def test_cancelled_caller_keeps_the_slot_until_its_job_finishes():
+    async def main():
+        lane = FairQueue("test", slots=1, per_user_limit=1)
+        started, release = Event(), Event()
+
+        def job():
+            started.set()
+            release.wait(5)
+
+        first = asyncio.create_task(lane.run("a", job))
+        while not started.is_set():
+            await asyncio.sleep(0.01)
+        first.cancel()
+        await asyncio.sleep(0.05)
+        assert lane.stats()["running"] == 1
+
+        second = asyncio.create_task(lane.run("b", lambda: "done"))
+        await asyncio.sleep(0.05)
+        assert not second.done()
+
+        release.set()
+        assert await second == "done"
+        assert lane.stats()["running"] == 0
+
+    asyncio.run(main())
+
+def test_per_user_limit_counts_jobs_not_slots():
+    async def main():
+        lane = FairQueue("test", slots=4, per_user_limit=1)
+        release = Event()
+        wide = asyncio.create_task(lane.run("a", release.wait, 5, width=2))
+        second = asyncio.create_task(lane.run("a", lambda: "a"))
+        other = asyncio.create_task(lane.run("b", lambda: "b"))
+        assert await other == "b"
+        assert not second.done()
+        release.set()
+        await wide
+        assert await second == "a"
+
+    asyncio.run(main())
@@ -0,0 +1,60 @@
+from datetime import datetime
+from io import BytesIO
+
+import numpy as np
+from openpyxl import load_workbook
+
+from utils.tabular_excel import convert_column, csv_to_workbook, infer_type, widen_type
+
+def _convert(text: str, **kwargs):
+    output = BytesIO()
+    result = csv_to_workbook([text.encode("utf-8")], output, **kwargs)
+    output.seek(0)
+    return result, load_workbook(output)
+
+def test_infer_type():
+    assert infer_type(["1", "-2", "1,234"]) == "integer"
+    assert infer_type(["1", "2.5", "1e3"]) == "number"
+    assert infer_type(["007", "12"]) == "text"
+    assert infer_type(["1234567890123456"]) == "text"
+    assert infer_type(["0.5", "12"]) == "number"
+    assert infer_type(["2024-01-31", "2024/02/01"]) == "date"
+    assert infer_type(["2024-01-31", "2024-02-01 09:30"]) == "datetime"
+    assert infer_type(["2024-02-30"]) == "text"
+    assert infer_type(["1", "n/a"]) == "text"
+    assert infer_type([]) == "text"
+
+def test_convert_column():
+    integers = convert_column(["1", "1,234"], "integer")
+    assert integers.dtype == np.int64 and integers.tolist() == [1, 1234]
+    assert convert_column(["1", "", "3"], "integer").tolist() == [1, None, 3]
+    assert convert_column(["1.5", ""], "number")[0] == 1.5
+    assert np.isnan(convert_column(["1.5", ""], "number")[1])
+    assert convert_column(["1", "n/a", ""], "integer").tolist() == [1.0, "n/a", None]
+    assert convert_column(["2024/01/31", ""], "date").astype(str).tolist() == ["2024-01-31T00:00:00", "NaT"]
+    assert convert_column(["a", ""], "text").tolist() == ["a", None]
+
+def test_widen_type():
+    assert widen_type("integer", ["3", "4.5"]) == "number"
+    assert widen_type("integer", ["3", "007"]) == "text"
+    assert widen_type("number", ["1.5", "1234567890123456"]) == "text"
+    assert widen_type("integer", ["3", "n/a"]) == "integer"
+    assert widen_type("date", ["2024-01-31 09:30"]) == "datetime"
+    assert widen_type("text", ["007"]) == "text"
+
+def test_later_codes_widen_an_integer_column_to_text():
+    result, wb = _convert("code,amount\n1,10\n2,20\n007,30.5\n", batch_rows=2)
+
+    assert result["columns"] == [{"name": "code", "type": "text"}, {"name": "amount", "type": "number"}]
+    ws = wb["Data"]
+    assert [row for row in ws.iter_rows(min_row=2, values_only=True)] == [(1, 10), (2, 20), ("007", 30.5)]
+    assert ws["A4"].number_format == "General"
+
+def test_dates_and_headerless_files():
+    result, wb = _convert("2024-01-31\t5\n2024-02-01\t6\n", file_name="data.tsv", has_header=False)
+
+    assert result["delimiter"] == "\t"
+    assert [column["type"] for column in result["columns"]] == ["date", "integer"]
+    ws = wb["Data"]
+    assert ws["A1"].value == "Column 1"
+    assert ws["A2"].value == datetime(2024, 1, 31)
@@ -0,0 +1,42 @@
+from io import BytesIO
+
+import pytest
+from openpyxl import load_workbook
+
+from utils import xlsx_bulk
+
+def _reload(wb):
+    buffer = BytesIO()
+    wb.save(buffer)
+    buffer.seek(0)
+    return load_workbook(buffer)
+
+def test_settings_keyed_by_name_and_index_are_applied():
+    wb = xlsx_bulk.bulk_workbook()
+    ws = wb.create_sheet("data")
+    xlsx_bulk.write_columns(
+        ws,
+        {"name": ["a", "b"], "amount": [1200, 3400]},
+        number_formats={"amount": "#,##0"},
+        column_widths={0: 20}
+    )
+
+    ws = _reload(wb)["data"]
+    assert ws["B2"].number_format == "#,##0"
+    assert ws.column_dimensions["A"].width == 20
+
+def test_write_rows_rejects_an_unknown_column_name():
+    wb = xlsx_bulk.bulk_workbook()
+    ws = wb.create_sheet("data")
+    with pytest.raises(ValueError, match="Unknown column name"):
+        xlsx_bulk.write_rows(ws, [["a", 1]], headers=["name", "amount"], column_widths={"total": 12})
+    wb.save(BytesIO())
+
+def test_write_columns_rejects_an_index_outside_the_columns():
+    wb = xlsx_bulk.bulk_workbook()
+    ws = wb.create_sheet("data")
+    with pytest.raises(ValueError, match="out of range"):
+        xlsx_bulk.write_columns(ws, {"name": ["a"], "amount": [1]}, number_formats={2: "0.0%"})
+    with pytest.raises(ValueError, match="out of range"):
+        xlsx_bulk.write_columns(ws, {"name": ["a"], "amount": [1]}, column_widths={-1: 10})
+    wb.save(BytesIO())
@@ -0,0 +1,173 @@
+from io import BytesIO
+from typing import Annotated, Literal, Union
+from pydantic import BaseModel, Field, model_validator
+from docx import Document
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from openpyxl.utils import get_column_letter
+
+from utils import xlsx_bulk
+
+# Cell values accepted in tables and sheets
+CellValue = Union[str, int, float, bool, None]
+
+# Paragraph alignment names used in the spec
+ALIGNMENTS = {
+    "left": WD_ALIGN_PARAGRAPH.LEFT,
+    "center": WD_ALIGN_PARAGRAPH.CENTER,
+    "right": WD_ALIGN_PARAGRAPH.RIGHT,
+    "justify": WD_ALIGN_PARAGRAPH.JUSTIFY
+}
+
+class HeadingBlock(BaseModel):
+    type: Literal["heading"]
+    text: str
+    level: int = Field(default=1, ge=0, le=9, description="0 is the document title style, 1-9 are heading levels.")
+
+class ParagraphBlock(BaseModel):
+    type: Literal["paragraph"]
+    text: str
+    bold: bool = False
+    italic: bool = False
+    align: Literal["left", "center", "right", "justify"] | None = None
+
+class BulletsBlock(BaseModel):
+    type: Literal["bullets"]
+    items: list[str]
+    numbered: bool = False
+
+class TableBlock(BaseModel):
+    type: Literal["table"]
+    header: list[str] | None = None
+    rows: list[list[CellValue]] = Field(default_factory=list)
+    style: str = "Table Grid"
+
+class PageBreakBlock(BaseModel):
+    type: Literal["page_break"]
+
+WordBlock = Annotated[
+    Union[HeadingBlock, ParagraphBlock, BulletsBlock, TableBlock, PageBreakBlock],
+    Field(discriminator="type")
+]
+
+class WordSpec(BaseModel):
+    """
+    Declarative description of a Word document rendered without running a script.
+    """
+    title: str | None = Field(default=None, description="Optional document title written with the Title style.")
+    blocks: list[WordBlock] = Field(description="Document content in reading order.")
+
+class ExcelSheet(BaseModel):
+    name: str = Field(description="Sheet name (max 31 characters).")
+    columns: list[str] = Field(default_factory=list, description="Header row.")
+    rows: list[list[CellValue]] = Field(default_factory=list, description="Data rows, one list of values per row.")
+    number_formats: dict[str, str] = Field(default_factory=dict, description="Excel number format per column name, e.g. {'Amount': '#,##0'}.")
+    column_widths: dict[str, float] = Field(default_factory=dict, description="Column width per column name.")
+    freeze_header: bool = True
+    autofilter: bool = True
+
+    @model_validator(mode="after")
+    def check(self):
+        for setting in ("number_formats", "column_widths"):
+            unknown = [key for key in getattr(self, setting) if key not in self.columns]
+            if unknown:
+                raise ValueError(f"{setting} of sheet '{self.name}' refers to unknown columns {unknown}; use names from 'columns'")
+        return self
+
+class ExcelSpec(BaseModel):
+    """
+    Declarative description of an Excel workbook rendered without running a script.
+    """
+    sheets: list[ExcelSheet] = Field(min_length=1)
+
+def _add_table(doc, block: TableBlock) -> None:
+    """
+    Add a table in one allocation and fill it row by row.
+    Rows are walked with zip() instead of table.cell(r, c), which rebuilds the cell grid on every call.
+    """
+    data = ([block.header] if block.header else []) + block.rows
+    if not data:
+        return
+    width = max(len(row) for row in data)
+    table = doc.add_table(rows=len(data), cols=width)
+    table.style = block.style
+
+    for position, (row, values) in enumerate(zip(table.rows, data)):
+        for cell, value in zip(row.cells, values):
+            if value is None:
+                continue
+            if position == 0 and block.header:
+                cell.paragraphs[0].add_run(str(value)).bold = True
+            else:
+                cell.text = str(value)
+
+def render_docx(spec: WordSpec, buffer: BytesIO) -> None:
+    """
+    Render a WordSpec into buffer.
+
+    Args:
+        spec (WordSpec): Document description.
+        buffer (BytesIO): Output buffer, saved as .docx.
+    """
+    doc = Document()
+    # Resolve each style once and pass the style object, so python-docx does not look it up per paragraph
+    styles = doc.styles
+    bullet_style = styles["List Bullet"]
+    number_style = styles["List Number"]
+    heading_styles = {}
+
+    if spec.title:
+        doc.add_heading(spec.title, level=0)
+
+    for block in spec.blocks:
+        if block.type == "heading":
+            if block.level not in heading_styles:
+                heading_styles[block.level] = styles["Title" if block.level == 0 else f"Heading {block.level}"]
+            doc.add_paragraph(block.text, style=heading_styles[block.level])
+        elif block.type == "paragraph":
+            paragraph = doc.add_paragraph()
+            run = paragraph.add_run(block.text)
+            run.bold = block.bold or None
+            run.italic = block.italic or None
+            if block.align:
+                paragraph.alignment = ALIGNMENTS[block.align]
+        elif block.type == "bullets":
+            style = number_style if block.numbered else bullet_style
+            for item in block.items:
+                doc.add_paragraph(item, style=style)
+        elif block.type == "table":
+            _add_table(doc, block)
+        elif block.type == "page_break":
+            doc.add_page_break()
+
+    doc.save(buffer)
+
+def render_xlsx(spec: ExcelSpec, buffer: BytesIO) -> None:
+    """
+    Render an ExcelSpec into buffer with the streaming xlsx_bulk writer.
+
+    Args:
+        spec (ExcelSpec): Workbook description.
+        buffer (BytesIO): Output buffer, saved as .xlsx.
+    """
+    wb = xlsx_bulk.bulk_workbook()
+
+    for sheet in spec.sheets:
+        ws = wb.create_sheet(sheet.name[:31])
+        width = max([len(sheet.columns)] + [len(row) for row in sheet.rows])
+        height = len(sheet.rows) + (1 if sheet.columns else 0)
+
+        # Sheet view and filter must be set before the first row is streamed
+        if sheet.columns and sheet.freeze_header:
+            ws.freeze_panes = "A2"
+        if sheet.columns and sheet.autofilter and width:
+            ws.auto_filter.ref = f"A1:{get_column_letter(width)}{height}"
+
+        xlsx_bulk.write_rows(
+            ws,
+            sheet.rows,
+            headers=sheet.columns or None,
+            number_formats=sheet.number_formats,
+            column_widths=sheet.column_widths
+        )
+
+    wb.save(buffer)
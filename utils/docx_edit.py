@@ -0,0 +1,435 @@
+from collections import defaultdict
+from copy import deepcopy
+from datetime import datetime, timezone
+from typing import Literal
+import re
+from lxml import etree
+from pydantic import BaseModel, Field, model_validator
+from docx.comments import Comment
+from docx.oxml import OxmlElement, parse_xml
+from docx.oxml.ns import nsdecls, nsmap, qn
+
+W_P = qn("w:p")
+W_R = qn("w:r")
+W_T = qn("w:t")
+W_TBL = qn("w:tbl")
+W_TR = qn("w:tr")
+W_TC = qn("w:tc")
+W_RPR = qn("w:rPr")
+W_TAB = qn("w:tab")
+W_BR = qn("w:br")
+W_CR = qn("w:cr")
+W_DELTEXT = qn("w:delText")
+XML_SPACE = qn("xml:space")
+
+# Compiled once: python-docx's element.xpath() recompiles the expression on every call
+PARAGRAPH_RUNS = etree.XPath("./w:r | ./w:hyperlink/w:r", namespaces=nsmap)
+PARAGRAPH_CONTENT = etree.XPath("./w:r | ./w:hyperlink | ./w:ins | ./w:del", namespaces=nsmap)
+ALL_RUNS = etree.XPath(".//w:r", namespaces=nsmap)
+
+# Same minimal comment as python-docx creates, with the id supplied by the caller
+COMMENT_XML = (
+    '<w:comment {nsdecls} w:id="{comment_id}" w:author="">'
+    '<w:p><w:pPr><w:pStyle w:val="CommentText"/></w:pPr>'
+    '<w:r><w:rPr><w:rStyle w:val="CommentReference"/></w:rPr><w:annotationRef/></w:r></w:p>'
+    '</w:comment>'
+)
+
+class DocxEdit(BaseModel):
+    """
+    One edit of a .docx document.
+
+    Targets: 'paragraph' (index from full_context_docx), or 'table' + 'row' + 'cell'
+    (0-based), or no target to apply a replace/delete/comment to the whole document.
+    Every occurrence of 'find' inside the target is edited. Several edits of the same
+    text are applied in the order given; after a replace or delete of that text only
+    comments (attached to the replacement) and no further text changes are applied.
+    """
+    action: Literal["replace", "insert", "delete", "comment"]
+    paragraph: int | None = Field(default=None, description="Paragraph index as returned by full_context_docx.")
+    table: int | None = Field(default=None, description="0-based table index in the document body.")
+    row: int | None = Field(default=None, description="0-based row index in the table.")
+    cell: int | None = Field(default=None, description="0-based cell index in the row.")
+    find: str | None = Field(default=None, description="Text to edit. For insert: anchor the new text after it (default: end of the target). For comment: the commented text (default: the whole target).")
+    text: str | None = Field(default=None, description="Replacement, inserted or comment text.")
+
+    @model_validator(mode="after")
+    def check(self):
+        cell_target = (self.table, self.row, self.cell)
+        if any(value is not None for value in cell_target) and None in cell_target:
+            raise ValueError("table, row and cell must be given together")
+        if self.paragraph is not None and self.table is not None:
+            raise ValueError("Target either a paragraph or a table cell, not both")
+        if self.action in ("replace", "delete") and not self.find:
+            raise ValueError(f"'{self.action}' requires 'find'")
+        if self.action in ("replace", "insert", "comment") and self.text is None:
+            raise ValueError(f"'{self.action}' requires 'text'")
+        if self.action == "insert" and self.paragraph is None and self.table is None:
+            raise ValueError("'insert' requires a paragraph or table cell target")
+        if self.action == "comment" and not self.find and self.paragraph is None and self.table is None:
+            raise ValueError("'comment' without 'find' requires a paragraph or table cell target")
+        return self
+
+class DocxFileEdits(BaseModel):
+    file_id: str = Field(description="ID of the existing docx file to edit.")
+    file_name: str = Field(description="The name of the original docx file.")
+    edits: list[DocxEdit] = Field(description="Edits applied in one pass over the document.")
+    track_changes: bool = Field(default=True, description="Record replacements, insertions and deletions as tracked changes.")
+
+class _Revisions:
+    """
+    Factory of w:ins / w:del elements with unique ids.
+    """
+    def __init__(self, body, author: str):
+        ids = [int(value) for value in body.xpath(".//w:ins/@w:id | .//w:del/@w:id") if value.isdigit()]
+        self.next_id = max(ids, default=0) + 1
+        self.author = author
+        self.date = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    def mark(self, tag: str):
+        element = OxmlElement(tag, attrs={qn("w:id"): str(self.next_id), qn("w:author"): self.author, qn("w:date"): self.date})
+        self.next_id += 1
+        return element
+
+def _child_length(child) -> int:
+    if child.tag == W_T:
+        return len(child.text or "")
+    return 1 if child.tag in (W_TAB, W_BR, W_CR) else 0
+
+def _child_text(child) -> str:
+    if child.tag == W_T:
+        return child.text or ""
+    if child.tag == W_TAB:
+        return "\t"
+    return "\n" if child.tag in (W_BR, W_CR) else ""
+
+def _runs(p) -> list[tuple]:
+    """
+    Visible runs of a paragraph (including hyperlink runs) with their character offsets.
+    """
+    runs, offset = [], 0
+    for r in PARAGRAPH_RUNS(p):
+        length = sum(_child_length(child) for child in r)
+        runs.append((r, offset, offset + length))
+        offset += length
+    return runs
+
+def _text_element(text: str):
+    t = OxmlElement("w:t")
+    t.text = text
+    t.set(XML_SPACE, "preserve")
+    return t
+
+def _split_run(r, k: int):
+    """
+    Split run r at character k; the part from k onwards moves to a new run inserted after r.
+    """
+    rpr = r.find(W_RPR)
+    tail = OxmlElement("w:r")
+    if rpr is not None:
+        tail.append(deepcopy(rpr))
+    position = 0
+    for child in list(r):
+        if child is rpr:
+            continue
+        length = _child_length(child)
+        if position >= k:
+            tail.append(child)
+        elif position + length > k:
+            text = child.text
+            child.text = text[:k - position]
+            child.set(XML_SPACE, "preserve")
+            tail.append(_text_element(text[k - position:]))
+        position += length
+    r.addnext(tail)
+    return tail
+
+def _split_at(p, offset: int) -> None:
+    for r, start, end in _runs(p):
+        if start < offset < end:
+            _split_run(r, offset - start)
+            return
+
+def _isolate(p, start: int, end: int) -> list:
+    """
+    Split runs so that [start, end) is covered by whole runs and return those runs.
+    """
+    _split_at(p, end)
+    _split_at(p, start)
+    return [r for r, a, b in _runs(p) if a >= start and b <= end and b > a]
+
+def _groups(runs: list) -> list[list]:
+    """
+    Group runs into sequences of adjacent siblings.
+    """
+    groups = []
+    for r in runs:
+        if groups and groups[-1][-1].getnext() is r:
+            groups[-1].append(r)
+        else:
+            groups.append([r])
+    return groups
+
+def _new_run(text: str, style_source=None):
+    r = OxmlElement("w:r")
+    rpr = style_source.find(W_RPR) if style_source is not None else None
+    if rpr is not None:
+        r.append(deepcopy(rpr))
+    r.append(_text_element(text))
+    return r
+
+def _delete(runs: list, revisions: _Revisions | None):
+    """
+    Delete runs, as a tracked deletion when revisions is given. Returns the last element left in place.
+    """
+    last = None
+    for group in _groups(runs):
+        if revisions is None:
+            last = group[0].getprevious()
+            for r in group:
+                r.getparent().remove(r)
+            continue
+        deletion = revisions.mark("w:del")
+        group[0].addprevious(deletion)
+        for r in group:
+            deletion.append(r)
+            for t in r.iter(W_T):
+                t.tag = W_DELTEXT
+        last = deletion
+    return last
+
+def _insert_after(p, anchor, new_run, revisions: _Revisions | None):
+    """
+    Insert new_run after anchor (at the start of the paragraph when None). Returns the inserted element.
+    """
+    element = new_run
+    if revisions is not None:
+        element = revisions.mark("w:ins")
+        element.append(new_run)
+    if anchor is not None:
+        anchor.addnext(element)
+        return element
+    content = PARAGRAPH_CONTENT(p)
+    if content:
+        content[0].addprevious(element)
+    else:
+        p.append(element)
+    return element
+
+class _Comments:
+    """
+    Adds comments with a running id. Document.add_comment() looks up the highest
+    existing id on every call, which makes large batches quadratic.
+    """
+    def __init__(self, doc, author: str, initials: str):
+        comments = doc.comments
+        self.part = comments._comments_part
+        self.element = comments._comments_elm
+        self.author = author
+        self.initials = initials
+        self.next_id = max((int(value) for value in self.element.xpath("./w:comment/@w:id")), default=-1) + 1
+
+    def add(self, runs: list, text: str) -> bool:
+        if not runs:
+            return False
+        comment_id = self.next_id
+        self.next_id += 1
+
+        comment_elm = parse_xml(COMMENT_XML.format(nsdecls=nsdecls("w"), comment_id=comment_id))
+        self.element.append(comment_elm)
+        comment_elm.author = self.author
+        comment_elm.initials = self.initials
+        comment_elm.date = datetime.now(timezone.utc)
+        comment = Comment(comment_elm, self.part)
+        lines = text.split("\n")
+        comment.paragraphs[0].add_run(lines[0])
+        for line in lines[1:]:
+            comment.add_paragraph(text=line)
+
+        runs[0].insert_comment_range_start_above(comment_id)
+        runs[-1].insert_comment_range_end_and_reference_below(comment_id)
+        return True
+
+class _Editor:
+    """
+    State of one edit pass: edits indexed by target, revision ids and match counters.
+    """
+    def __init__(self, doc, edits: list[DocxEdit], author: str, initials: str, track_changes: bool):
+        self.doc = doc
+        self.comments = _Comments(doc, author, initials)
+        self.revisions = _Revisions(doc.element.body, author) if track_changes else None
+        self.edits = edits
+        self.matches = [0] * len(edits)
+        self.skipped = {}
+        self.by_paragraph = defaultdict(list)
+        self.by_cell = defaultdict(list)
+        self.global_edits = defaultdict(list)
+        for idx, edit in enumerate(edits):
+            if edit.paragraph is not None:
+                self.by_paragraph[edit.paragraph].append((idx, edit))
+            elif edit.table is not None:
+                self.by_cell[(edit.table, edit.row, edit.cell)].append((idx, edit))
+            else:
+                self.global_edits[edit.find].append((idx, edit))
+        # One alternation scans each paragraph once for all document-wide edits (longest match first)
+        finds = sorted(self.global_edits, key=len, reverse=True)
+        self.global_pattern = re.compile("|".join(map(re.escape, finds))) if finds else None
+
+    def paragraph(self, p, edits: list[tuple]) -> None:
+        runs = _runs(p)
+        if not runs and not edits:
+            return
+        text = "".join(_child_text(child) for r, _, _ in runs for child in r)
+
+        matches, whole = [], []
+        for idx, edit in edits:
+            if not edit.find:
+                if edit.action == "insert":
+                    matches.append((len(text), len(text), idx, edit))
+                else:
+                    whole.append((idx, edit))
+                continue
+            start = text.find(edit.find)
+            while start != -1:
+                matches.append((start, start + len(edit.find), idx, edit))
+                start = text.find(edit.find, start + len(edit.find))
+        if self.global_pattern is not None:
+            for match in self.global_pattern.finditer(text):
+                for idx, edit in self.global_edits[match.group()]:
+                    matches.append((match.start(), match.end(), idx, edit))
+
+        # Group matches of the same range in edit order and drop partial overlaps,
+        # then apply right to left so earlier offsets stay valid
+        matches.sort(key=lambda match: match[:3])
+        kept, last_end = [], -1
+        for start, end, idx, edit in matches:
+            if kept and (start, end) == kept[-1][:2]:
+                kept[-1][2].append((idx, edit))
+                continue
+            if start < last_end:
+                self.skipped.setdefault(idx, "overlaps another edit")
+                continue
+            kept.append((start, end, [(idx, edit)]))
+            last_end = max(last_end, end)
+
+        for start, end, group in reversed(kept):
+            span = {}
+            for idx, edit in group:
+                if self.apply(p, start, end, edit, span):
+                    self.matches[idx] += 1
+                else:
+                    self.skipped.setdefault(idx, "overlaps another edit")
+
+        for idx, edit in whole:
+            if self.comments.add(ALL_RUNS(p), edit.text):
+                self.matches[idx] += 1
+
+    def apply(self, p, start: int, end: int, edit: DocxEdit, span: dict) -> bool:
+        """
+        Apply one edit to the range [start, end) of a paragraph.
+
+        span holds the state left by the previous edits of the same range: 'runs'
+        (the runs now covering it), 'anchor' (the element the next insert goes after)
+        and 'changed' (the text was replaced or deleted).
+        Returns:
+            bool: False when the edit conflicts with an earlier edit of the range.
+        """
+        if edit.action == "insert":
+            if span.get("changed"):
+                return False
+            if "anchor" not in span:
+                _split_at(p, end)
+                span["anchor"] = span["style"] = next((r for r, a, b in reversed(_runs(p)) if b == end and b > a), None)
+            # Later inserts of the same range follow the earlier ones
+            span["anchor"] = _insert_after(p, span["anchor"], _new_run(edit.text, span["style"]), self.revisions)
+            return True
+
+        if span.get("changed") and edit.action != "comment":
+            return False
+        if "runs" not in span:
+            span["runs"] = _isolate(p, start, end)
+        runs = span["runs"]
+        if edit.action == "comment":
+            return self.comments.add(runs, edit.text)
+
+        style_source = runs[0]
+        span["changed"] = True
+        if edit.action == "replace" and self.revisions is None:
+            # Untracked replacement: keep the first run and its formatting, drop the rest
+            for child in list(style_source):
+                if child.tag != W_RPR:
+                    style_source.remove(child)
+            style_source.append(_text_element(edit.text))
+            _delete(runs[1:], None)
+            span["runs"] = [style_source]
+            return True
+
+        anchor = _delete(runs, self.revisions)
+        span["runs"] = []
+        if edit.action == "replace":
+            new_run = _new_run(edit.text, style_source)
+            _insert_after(p, anchor, new_run, self.revisions)
+            span["runs"] = [new_run]
+        return True
+
+    def run(self) -> dict:
+        no_edits = []
+        paragraph_index = table_index = 0
+        for child in self.doc.element.body.iterchildren():
+            if child.tag == W_P:
+                self.paragraph(child, self.by_paragraph.pop(paragraph_index, no_edits))
+                paragraph_index += 1
+            elif child.tag == W_TBL:
+                for row_index, tr in enumerate(child.iterchildren(W_TR)):
+                    for cell_index, tc in enumerate(tr.iterchildren(W_TC)):
+                        self.cell(tc, self.by_cell.pop((table_index, row_index, cell_index), no_edits))
+                table_index += 1
+            else:
+                for p in child.iter(W_P):
+                    self.paragraph(p, no_edits)
+
+        for targets in (self.by_paragraph, self.by_cell):
+            for edits in targets.values():
+                for idx, _ in edits:
+                    self.skipped[idx] = "target not found"
+        for idx, count in enumerate(self.matches):
+            if not count:
+                self.skipped.setdefault(idx, "text not found")
+
+        return {
+            "applied": sum(self.matches),
+            "skipped": [{"edit": idx, "reason": reason} for idx, reason in sorted(self.skipped.items())]
+        }
+
+    def cell(self, tc, edits: list[tuple]) -> None:
+        whole = [(idx, edit) for idx, edit in edits if edit.action == "comment" and not edit.find]
+        text_edits = [(idx, edit) for idx, edit in edits if not (edit.action == "comment" and not edit.find)]
+        paragraphs = list(tc.iter(W_P))
+        for position, p in enumerate(paragraphs):
+            # Inserts without an anchor go to the end of the cell, not of every paragraph
+            self.paragraph(p, [
+                (idx, edit) for idx, edit in text_edits
+                if edit.find or position == len(paragraphs) - 1
+            ])
+        for idx, edit in whole:
+            if self.comments.add(ALL_RUNS(tc), edit.text):
+                self.matches[idx] += 1
+
+def apply_edits(doc, edits: list[DocxEdit], author: str = "AI Reviewer", initials: str = "AI", track_changes: bool = True) -> dict:
+    """
+    Apply a batch of edits to a python-docx Document in a single pass over the body.
+
+    Paragraphs are visited once; each one is matched against the edits that target it
+    and against one combined pattern of the document-wide edits, so the cost grows
+    linearly with the document size.
+
+    Args:
+        doc: python-docx Document.
+        edits (list[DocxEdit]): Edits to apply.
+        author (str): Author of the comments and tracked changes.
+        initials (str): Initials of the comment author.
+        track_changes (bool): Record replace/insert/delete as tracked changes.
+    Returns:
+        dict: 'applied' (number of edited occurrences) and 'skipped' (edit index and reason).
+    """
+    return _Editor(doc, edits, author, initials, track_changes).run()
@@ -1,13 +1,23 @@
-from requests import get
+from utils.http_session import get
 from io import BytesIO
+from typing import Iterator
 
-def download_file(url: str, token: str, file_id: str) -> BytesIO:
+def _iter_chunks(response, chunk_size: int) -> Iterator[bytes]:
+    """
+    Yield the response body in chunks and release the connection at the end.
+    """
+    with response:
+        yield from response.iter_content(chunk_size)
+
+def download_file(url: str, token: str, file_id: str, chunk_size: int | None = None) -> BytesIO | Iterator[bytes]:
     """
     Download a file from the specified URL with the provided token and file ID.
     Args:
         url (str): The base URL from which the file will be downloaded.
         token (str): The authorization token for the request.
         file_id (str): The ID of the file to be downloaded.
+        chunk_size (int | None): When set, stream the body and return an iterator of
+            chunks of this size instead of loading the whole file in memory.
     """
     # Ensure the URL ends with '/api/v1/files/'
     url = f'{url}/api/v1/files/{file_id}/content'
@@ -18,9 +28,12 @@ def download_file(url: str, token: str, file_id: str) -> BytesIO:
         'Accept': 'application/json'
     }
     # Send the GET request
-    response = get(url, headers=headers)
+    response = get(url, headers=headers, stream=chunk_size is not None)
 
     if response.status_code != 200:
+       response.close()
        return {"error":{"message": f'Error downloading the file: {response.status_code}'}}
+    elif chunk_size is not None:
+        return _iter_chunks(response, chunk_size)
     else:
         return BytesIO(response._content)
\ No newline at end of file
@@ -0,0 +1,19 @@
+from http.cookiejar import DefaultCookiePolicy
+from requests import Session
+from requests.adapters import HTTPAdapter
+
+# Shared HTTP session so connections to OWUI, Presenton and HWP are kept alive
+# and reused across tool calls instead of opening a new connection per request.
+# Size the pool above the scheduler slots so worker threads never wait for a connection.
+POOL_SIZE = 32
+
+SESSION = Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE))
+SESSION.mount("https://", HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE))
+# The session serves every user: never store cookies, so one user's session cookie
+# (e.g. set by OWUI) cannot be sent along with another user's request
+SESSION.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+
+# Drop-in replacements for requests.get / requests.post
+get = SESSION.get
+post = SESSION.post
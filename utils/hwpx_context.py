@@ -0,0 +1,93 @@
+from io import BytesIO
+import re
+from zipfile import ZipFile, is_zipfile
+from lxml import etree
+
+# Section parts of an OWPML (HWPX) package, e.g. Contents/section0.xml
+SECTION_PART = re.compile(r"^Contents/section(\d+)\.xml$")
+
+def _local(tag) -> str:
+    """
+    Return the tag name without its namespace, so 2011 and 2016 OWPML schemas both match.
+    """
+    return etree.QName(tag).localname if isinstance(tag, str) else ""
+
+def _style_names(package: ZipFile) -> dict:
+    """
+    Map style ids to style names using Contents/header.xml.
+    """
+    if "Contents/header.xml" not in package.namelist():
+        return {}
+
+    styles = {}
+    with package.open("Contents/header.xml") as header:
+        for _, elem in etree.iterparse(header, events=("end",)):
+            if _local(elem.tag) == "style":
+                styles[elem.get("id")] = elem.get("name") or elem.get("engName")
+                elem.clear()
+    return styles
+
+def _paragraph_text(paragraph) -> str:
+    """
+    Join the text of the runs that belong directly to a paragraph.
+    Paragraphs nested in table cells are returned as their own records.
+    """
+    parts = []
+    for run in paragraph:
+        if _local(run.tag) != "run":
+            continue
+        for child in run:
+            if _local(child.tag) == "t":
+                parts.append("".join(child.itertext()))
+    return "".join(parts)
+
+def extract_hwpx(hwpx_file: BytesIO) -> list[dict]:
+    """
+    Return the index, section, style and text of each paragraph of an HWPX document.
+    Section parts are parsed incrementally and released paragraph by paragraph,
+    so memory stays flat for large documents.
+
+    Args:
+        hwpx_file (BytesIO): The HWPX (OWPML zip) document to inspect.
+    Returns:
+        list[dict]: Records with 'index', 'section', 'style' and 'text' keys.
+    """
+    if not is_zipfile(hwpx_file):
+        raise ValueError("The file is not an HWPX (OWPML) package. Binary .hwp files are not supported.")
+    hwpx_file.seek(0)
+
+    body = []
+    index = 0
+
+    with ZipFile(hwpx_file) as package:
+        styles = _style_names(package)
+        sections = sorted(
+            (int(match.group(1)), name)
+            for name in package.namelist()
+            if (match := SECTION_PART.match(name))
+        )
+
+        for section_number, part_name in sections:
+            with package.open(part_name) as section:
+                for _, elem in etree.iterparse(section, events=("end",)):
+                    if _local(elem.tag) != "p":
+                        continue
+
+                    text = _paragraph_text(elem).strip()
+                    if text:
+                        body.append({
+                            "index": index,
+                            "section": section_number,
+                            "style": styles.get(elem.get("styleIDRef"), elem.get("styleIDRef")),
+                            "text": text
+                        })
+                    index += 1
+
+                    # Release top level paragraphs once they have been read
+                    parent = elem.getparent()
+                    if parent is not None and parent.getparent() is None:
+                        elem.clear()
+                        while elem.getprevious() is not None:
+                            del parent[0]
+
+    return body
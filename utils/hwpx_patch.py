@@ -0,0 +1,143 @@
+from copy import deepcopy
+from io import BytesIO
+from zipfile import ZipFile, ZIP_DEFLATED, is_zipfile
+from lxml import etree
+
+from utils.hwpx_context import SECTION_PART, _local
+
+def _sections(package: ZipFile) -> list[str]:
+    """
+    Section part names in document order.
+    """
+    sections = sorted(
+        (int(match.group(1)), name)
+        for name in package.namelist()
+        if (match := SECTION_PART.match(name))
+    )
+    return [name for _, name in sections]
+
+def _layout_runs(paragraph) -> list:
+    """
+    Runs carrying the section and column properties (hp:secPr, hp:ctrl) of a section's first paragraph.
+    """
+    return [
+        run for run in paragraph
+        if _local(run.tag) == "run" and any(_local(child.tag) in ("secPr", "ctrl") for child in run)
+    ]
+
+def _top_level(root, paragraph):
+    while paragraph.getparent() is not root:
+        paragraph = paragraph.getparent()
+    return paragraph
+
+def _fragment_paragraphs(fragment: bytes) -> list:
+    """
+    Top-level paragraphs of a generated HWPX document, without its section properties.
+    """
+    if not is_zipfile(BytesIO(fragment)):
+        raise ValueError("The HWP API did not return an HWPX (OWPML) package")
+
+    paragraphs = []
+    with ZipFile(BytesIO(fragment)) as package:
+        for name in _sections(package):
+            root = etree.fromstring(package.read(name))
+            paragraphs.extend(child for child in root if _local(child.tag) == "p")
+    if paragraphs:
+        for run in _layout_runs(paragraphs[0]):
+            paragraphs[0].remove(run)
+    return paragraphs
+
+def _open(document: bytes) -> ZipFile:
+    if not is_zipfile(BytesIO(document)):
+        raise ValueError("The file is not an HWPX (OWPML) package. Binary .hwp files are not supported.")
+    return ZipFile(BytesIO(document))
+
+def _paragraphs(package: ZipFile) -> tuple[dict, list]:
+    """
+    Parse every section and number its paragraphs like extract_hwpx (end events, document order).
+    Returns:
+        tuple: (section name -> root element, list of (section name, paragraph))
+    """
+    roots, paragraphs = {}, []
+    for name in _sections(package):
+        roots[name] = etree.fromstring(package.read(name))
+        for _, elem in etree.iterwalk(roots[name], events=("end",)):
+            if _local(elem.tag) == "p":
+                paragraphs.append((name, elem))
+    return roots, paragraphs
+
+def _spans(roots: dict, paragraphs: list, ranges: list[tuple[int, int]]) -> list[tuple]:
+    """
+    Widen each paragraph range to top-level paragraphs, rejecting invalid and overlapping ranges.
+    Returns:
+        list: (section root, top-level paragraphs) per range.
+    """
+    spans, taken = [], set()
+    for start, end in ranges:
+        if not 0 <= start <= end < len(paragraphs):
+            raise ValueError(f"Paragraph range {start}-{end} is outside the document (0-{len(paragraphs) - 1})")
+        name = paragraphs[start][0]
+        if paragraphs[end][0] != name:
+            raise ValueError(f"Paragraph range {start}-{end} spans several sections")
+        root = roots[name]
+        first = root.index(_top_level(root, paragraphs[start][1]))
+        last = root.index(_top_level(root, paragraphs[end][1]))
+        span = root[first:last + 1]
+        if any(id(elem) in taken for elem in span):
+            raise ValueError(f"Paragraph range {start}-{end} overlaps another revision")
+        taken.update(id(elem) for elem in span)
+        spans.append((root, span))
+    return spans
+
+def check_ranges(document: bytes, ranges: list[tuple[int, int]]) -> None:
+    """
+    Validate paragraph ranges against a document before their replacements are generated.
+    Raises ValueError for the same ranges replace_paragraphs would reject.
+    """
+    with _open(document) as package:
+        _spans(*_paragraphs(package), ranges)
+
+def replace_paragraphs(document: bytes, replacements: list[tuple[int, int, bytes]]) -> bytes:
+    """
+    Patch an HWPX document in place of a full regeneration: each paragraph range is
+    replaced by the body of a newly generated HWPX fragment, the other parts of the
+    package are copied unchanged.
+
+    Paragraph indexes are those of extract_hwpx (every paragraph, including table
+    cells, in document order). A range is widened to the top-level paragraphs that
+    contain it, so a cell paragraph selects its whole table. The fragment must come
+    from the same template as the document: its style ids refer to the same header.
+
+    Args:
+        document (bytes): The original HWPX package.
+        replacements (list[tuple[int, int, bytes]]): (first index, last index, fragment) per range.
+    Returns:
+        bytes: The patched HWPX package.
+    """
+    with _open(document) as package:
+        roots, paragraphs = _paragraphs(package)
+        spans = _spans(roots, paragraphs, [(start, end) for start, end, _ in replacements])
+
+        for (root, span), (_, _, fragment) in zip(spans, replacements):
+            new_paragraphs = [deepcopy(paragraph) for paragraph in _fragment_paragraphs(fragment)]
+            if not new_paragraphs:
+                raise ValueError("The generated revision has no paragraphs")
+            # The section properties stay with the section
+            layout = [run for elem in span for run in _layout_runs(elem)]
+            for position, run in enumerate(layout):
+                new_paragraphs[0].insert(position, run)
+            for paragraph in new_paragraphs:
+                span[0].addprevious(paragraph)
+            for elem in span:
+                root.remove(elem)
+
+        patched = {
+            name: etree.tostring(root, xml_declaration=True, encoding="UTF-8", standalone=True)
+            for name, root in roots.items()
+        }
+        buffer = BytesIO()
+        with ZipFile(buffer, "w", ZIP_DEFLATED) as output:
+            # Entries keep their order and compression, so 'mimetype' stays first and stored
+            for info in package.infolist():
+                output.writestr(info, patched.get(info.filename) or package.read(info.filename))
+    return buffer.getvalue()
@@ -1,8 +1,8 @@
-from requests import post, get
+from utils.http_session import post, get
 from json import dumps
 import logging
-logging.basicConfig(level=logging.INFO, force=True)
-logger = logging.getLogger("GenFilesMCP")
+from utils.logging_setup import Payload
+logger = logging.getLogger("GenFilesMCP.knowledge")
 
 def check_knowledge_exists(url: str, token: str) -> dict:
     """
@@ -33,7 +33,8 @@ def check_knowledge_exists(url: str, token: str) -> dict:
         # Parse the JSON response to get the list of knowledge items
         knowledge_list = response.json()
         knowledge_dict = {f"{k['name']}_{k['user_id']}":{'knowledge_id': k['id'], 'user_id': k['user_id']} for k in knowledge_list}
-        logger.info(f"Knowledge items fetched successfully:  {knowledge_dict}")
+        logger.info("Knowledge items fetched successfully: %d items", len(knowledge_dict))
+        logger.debug("Knowledge items: %s", Payload(knowledge_dict))
         return knowledge_dict
     
 def add_file_to_knowledge(url: str, token: str, knowledge_id: str, file_id: str) -> bool:
@@ -0,0 +1,168 @@
+from atexit import register
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from json import dumps
+from logging.handlers import QueueHandler, QueueListener
+from queue import Full, Queue
+from random import random
+from uuid import uuid4
+import logging
+import sys
+
+# Request ID of the tool call being handled, attached to every log record
+request_id_var = ContextVar("request_id", default="-")
+
+# Payload settings, configured by setup_logging()
+PAYLOAD_MAX_CHARS = 1000
+PAYLOAD_SAMPLE_RATE = 1.0
+
+TEXT_FORMAT = "%(asctime)s %(levelname)s [%(name)s] [%(request_id)s] %(message)s"
+
+# Log arguments of these types are immutable and safe to format on the logging thread
+PRIMITIVE_TYPES = (str, int, float, bool, bytes, type(None))
+
+def bind_request_id(request_id: str | None = None):
+    """
+    Set the request ID used by log records of the current task or thread.
+    A short random ID is generated when none is given.
+    Returns the token to pass to request_id_var.reset().
+    """
+    return request_id_var.set(request_id or uuid4().hex[:12])
+
+class Payload:
+    """
+    Log argument for large payloads (API responses, knowledge lists).
+
+    The payload is serialised only when the record passes the logger level,
+    truncated to PAYLOAD_MAX_CHARS and kept for a PAYLOAD_SAMPLE_RATE fraction
+    of records. Use it as a %-style argument:
+        logger.info("Presenton response: %s", Payload(data))
+    """
+    __slots__ = ("value", "sampled")
+
+    def __init__(self, value):
+        self.value = value
+        self.sampled = PAYLOAD_SAMPLE_RATE >= 1.0 or random() < PAYLOAD_SAMPLE_RATE
+
+    def __str__(self) -> str:
+        if not self.sampled:
+            return f"<{type(self.value).__name__} omitted by sampling>"
+        if isinstance(self.value, (dict, list)):
+            text = dumps(self.value, ensure_ascii=False, default=str)
+        else:
+            text = str(self.value)
+        if len(text) > PAYLOAD_MAX_CHARS:
+            return f"{text[:PAYLOAD_MAX_CHARS]}... <{len(text) - PAYLOAD_MAX_CHARS} more chars>"
+        return text
+
+class _RequestIdFilter(logging.Filter):
+    """
+    Copy the request ID from the caller's context onto the record.
+    """
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    QueueHandler that leaves message formatting to the listener thread when all
+    arguments are primitives. Records with other arguments (dicts, payloads,
+    objects) are formatted in the caller's thread, because the caller may mutate
+    them before the listener gets to the record.
+    Records are dropped (and counted) instead of blocking when the queue is full.
+    """
+    dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        args = record.args
+        values = args.values() if isinstance(args, dict) else args or ()
+        if all(isinstance(value, PRIMITIVE_TYPES) for value in values):
+            return record
+        # Snapshot the message now; exc_info is left for the formatter
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except Full:
+            _DeferredQueueHandler.dropped += 1
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per line, with the request ID of the tool call.
+    """
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "message": record.getMessage()
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return dumps(entry, ensure_ascii=False)
+
+def parse_levels(value: str) -> dict:
+    """
+    Parse per-module levels such as 'GenFilesMCP.knowledge=WARNING,httpx=ERROR'.
+    """
+    levels = {}
+    for item in (value or "").split(","):
+        if "=" in item:
+            name, level = item.split("=", 1)
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+def setup_logging(
+    level: str = "INFO",
+    levels: dict | None = None,
+    json_output: bool = False,
+    payload_max_chars: int = 1000,
+    payload_sample_rate: float = 1.0,
+    queue_size: int = 10000
+) -> QueueListener:
+    """
+    Route all logging through a queue drained by a background thread.
+
+    Args:
+        level (str): Root log level.
+        levels (dict | None): Per-logger levels, e.g. {"GenFilesMCP.knowledge": "WARNING"}.
+        json_output (bool): Emit one JSON object per line instead of text.
+        payload_max_chars (int): Maximum characters rendered for a Payload argument.
+        payload_sample_rate (float): Fraction of Payload arguments that are rendered.
+        queue_size (int): Records buffered before new records are dropped.
+    Returns:
+        QueueListener: The running listener (stopped automatically at exit).
+    """
+    global PAYLOAD_MAX_CHARS, PAYLOAD_SAMPLE_RATE
+    PAYLOAD_MAX_CHARS = payload_max_chars
+    PAYLOAD_SAMPLE_RATE = payload_sample_rate
+
+    output = logging.StreamHandler(sys.stderr)
+    output.setFormatter(JsonFormatter() if json_output else logging.Formatter(TEXT_FORMAT))
+
+    handler = _DeferredQueueHandler(Queue(maxsize=queue_size))
+    handler.addFilter(_RequestIdFilter())
+
+    root = logging.getLogger()
+    for existing in root.handlers[:]:
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level.upper())
+
+    for name, module_level in (levels or {}).items():
+        logging.getLogger(name).setLevel(module_level)
+
+    listener = QueueListener(handler.queue, output, respect_handler_level=True)
+    listener.start()
+    register(listener.stop)
+    return listener
+
+def dropped_records() -> int:
+    """
+    Number of log records dropped because the queue was full.
+    """
+    return _DeferredQueueHandler.dropped
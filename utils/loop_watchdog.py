@@ -0,0 +1,195 @@
+import asyncio
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from threading import Event, Lock, Thread, get_ident
+from time import monotonic, time
+import logging
+import sys
+import traceback
+import weakref
+
+logger = logging.getLogger("GenFilesMCP.loop_watchdog")
+
+# Lag samples kept for percentile reporting (about 5 minutes at the default interval)
+LAG_HISTORY = 3000
+# Stall reports kept for the /loop endpoint
+STALL_HISTORY = 20
+# Frames kept per captured stack
+STACK_DEPTH = 15
+
+# Project root: frames under it (outside site-packages) are used as the stall "stage"
+PROJECT_ROOT = str(Path(__file__).resolve().parent.parent)
+
+# Tool currently executed by an asyncio task (on the loop) or by a worker thread
+_tool_by_task = weakref.WeakKeyDictionary()
+_tool_by_thread = {}
+
+@contextmanager
+def tool_activity(tool: str):
+    """
+    Mark the current task or thread as running tool, so stalls can be attributed to it.
+    """
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+
+    if task is not None:
+        _tool_by_task[task] = tool
+    else:
+        thread_id = get_ident()
+        previous = _tool_by_thread.get(thread_id)
+        _tool_by_thread[thread_id] = tool
+    try:
+        yield
+    finally:
+        if task is not None:
+            _tool_by_task.pop(task, None)
+        elif previous is None:
+            _tool_by_thread.pop(thread_id, None)
+        else:
+            _tool_by_thread[thread_id] = previous
+
+def _stage(frame) -> str | None:
+    """
+    Innermost project frame of a stack as 'path:line function'.
+    """
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(PROJECT_ROOT) and "site-packages" not in filename:
+            return f"{filename[len(PROJECT_ROOT) + 1:]}:{frame.f_lineno} {frame.f_code.co_name}"
+        frame = frame.f_back
+    return None
+
+def _is_idle(frame) -> bool:
+    """
+    True when the loop thread is waiting in the selector, i.e. it is starved
+    (usually by a worker thread holding the GIL) rather than blocked itself.
+    """
+    return frame is not None and frame.f_code.co_filename.endswith("selectors.py")
+
+def _format_stack(frame) -> list[str]:
+    return [line.rstrip() for line in traceback.format_stack(frame)[-STACK_DEPTH:]]
+
+def _percentile(samples: list[float], percentile: float) -> float:
+    return samples[min(len(samples) - 1, int(len(samples) * percentile / 100))] if samples else 0.0
+
+class LoopWatchdog:
+    """
+    Event-loop lag watchdog.
+
+    A heartbeat task sleeps for interval seconds on the event loop and records
+    how late it wakes up (the scheduling lag). A monitor thread checks the last
+    heartbeat; when the loop has not run for longer than threshold it captures
+    the stack of the loop thread, attributes it to the running tool and project
+    frame (the stage), and logs it once the loop recovers. When the loop thread
+    is only waiting in the selector, the stacks of busy tool threads are
+    captured instead, since they are starving the loop of the GIL.
+    """
+    def __init__(self, threshold: float = 0.25, interval: float = 0.1):
+        self.threshold = threshold
+        self.interval = interval
+        self.lags = deque(maxlen=LAG_HISTORY)
+        self.stalls = deque(maxlen=STALL_HISTORY)
+        self.stall_count = 0
+        self.max_lag = 0.0
+        self._loop = None
+        self._loop_thread_id = None
+        self._last_beat = monotonic()
+        self._pending = None
+        self._lock = Lock()
+        self._stop = Event()
+
+    def start(self) -> None:
+        """
+        Start the heartbeat on the running event loop and the monitor thread.
+        Must be called from a coroutine running on the loop to watch.
+        """
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = get_ident()
+        self._last_beat = monotonic()
+        self._heartbeat_task = self._loop.create_task(self._heartbeat(), name="loop-watchdog")
+        Thread(target=self._monitor, name="loop-watchdog", daemon=True).start()
+        logger.info("Loop watchdog started (interval=%.3fs, threshold=%.3fs)", self.interval, self.threshold)
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    async def _heartbeat(self) -> None:
+        while not self._stop.is_set():
+            start = monotonic()
+            await asyncio.sleep(self.interval)
+            self._last_beat = monotonic()
+            self._record(max(0.0, self._last_beat - start - self.interval))
+
+    def _record(self, lag: float) -> None:
+        with self._lock:
+            self.lags.append(lag)
+            self.max_lag = max(self.max_lag, lag)
+            if lag < self.threshold:
+                return
+            stall = self._pending or {"tool": None, "stage": None, "stack": [], "threads": []}
+            self._pending = None
+            stall["lag_ms"] = round(lag * 1000, 1)
+            stall["at"] = time()
+            self.stalls.append(stall)
+            self.stall_count += 1
+
+        logger.warning(
+            "Event loop stalled for %.0f ms (tool=%s, stage=%s)\n%s",
+            lag * 1000, stall["tool"], stall["stage"],
+            "\n".join(stall["stack"] or [line for thread in stall["threads"] for line in thread["stack"]])
+        )
+
+    def _monitor(self) -> None:
+        while not self._stop.wait(self.interval):
+            if monotonic() - self._last_beat - self.interval < self.threshold:
+                continue
+            with self._lock:
+                if self._pending is None:
+                    self._pending = self._capture()
+
+    def _capture(self) -> dict:
+        """
+        Capture who is holding up the loop. Runs on the monitor thread.
+        """
+        frames = sys._current_frames()
+        loop_frame = frames.get(self._loop_thread_id)
+        if not _is_idle(loop_frame):
+            task = asyncio.current_task(self._loop)
+            return {
+                "tool": _tool_by_task.get(task) if task is not None else None,
+                "stage": _stage(loop_frame),
+                "stack": _format_stack(loop_frame) if loop_frame is not None else [],
+                "threads": []
+            }
+
+        threads = [
+            {"tool": tool, "stage": _stage(frames[thread_id]), "stack": _format_stack(frames[thread_id])}
+            for thread_id, tool in list(_tool_by_thread.items())
+            if thread_id in frames
+        ]
+        return {
+            "tool": ", ".join(sorted({thread["tool"] for thread in threads})) or None,
+            "stage": "gil-starved",
+            "stack": [],
+            "threads": threads
+        }
+
+    def stats(self) -> dict:
+        with self._lock:
+            lags = sorted(self.lags)
+            stalls = list(self.stalls)
+        return {
+            "running": self._loop is not None and not self._stop.is_set(),
+            "interval_ms": round(self.interval * 1000, 1),
+            "threshold_ms": round(self.threshold * 1000, 1),
+            "samples": len(lags),
+            "p50_lag_ms": round(_percentile(lags, 50) * 1000, 1),
+            "p90_lag_ms": round(_percentile(lags, 90) * 1000, 1),
+            "p99_lag_ms": round(_percentile(lags, 99) * 1000, 1),
+            "max_lag_ms": round(self.max_lag * 1000, 1),
+            "stalls_total": self.stall_count,
+            "recent_stalls": stalls
+        }
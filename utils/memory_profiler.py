@@ -0,0 +1,228 @@
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from threading import Event, Lock, Thread
+from time import time
+import logging
+import resource
+import sysconfig
+import tracemalloc
+
+logger = logging.getLogger("GenFilesMCP.memory")
+
+# Project root and standard library folder, used to shorten file names in the reports
+PROJECT_ROOT = str(Path(__file__).resolve().parent.parent)
+STDLIB = sysconfig.get_paths()["stdlib"]
+
+# Allocations made by the profiler and the import machinery are noise in growth reports
+SNAPSHOT_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>")
+]
+
+MB = 1024 * 1024
+
+class _ToolMemory:
+    """
+    Peak and retained traced memory of the calls of one tool.
+    """
+    def __init__(self):
+        self.calls = 0
+        self.max_peak = 0
+        self.total_peak = 0
+        self.total_retained = 0
+        self.last_retained = 0
+
+    def record(self, peak: int, retained: int) -> None:
+        self.calls += 1
+        self.max_peak = max(self.max_peak, peak)
+        self.total_peak += peak
+        self.total_retained += retained
+        self.last_retained = retained
+
+    def summary(self) -> dict:
+        return {
+            "calls": self.calls,
+            "max_peak_mb": round(self.max_peak / MB, 2),
+            "avg_peak_mb": round(self.total_peak / self.calls / MB, 2) if self.calls else 0.0,
+            "retained_mb": round(self.total_retained / MB, 2),
+            "last_retained_mb": round(self.last_retained / MB, 2)
+        }
+
+_tool_stats = defaultdict(_ToolMemory)
+_tool_lock = Lock()
+_active_calls = 0
+
+@contextmanager
+def tool_memory(tool: str):
+    """
+    Record the traced peak and retained memory of a tool call. No-op unless tracemalloc is tracing.
+
+    tracemalloc counters are process wide, so calls overlapping with other tool
+    calls report an upper bound: the peak is only reset when no other call is running.
+    """
+    global _active_calls
+    if not tracemalloc.is_tracing():
+        yield
+        return
+
+    with _tool_lock:
+        if _active_calls == 0:
+            tracemalloc.reset_peak()
+        _active_calls += 1
+        start, _ = tracemalloc.get_traced_memory()
+    try:
+        yield
+    finally:
+        current, peak = tracemalloc.get_traced_memory()
+        with _tool_lock:
+            _active_calls -= 1
+            # Tracing may have been stopped during the call
+            if current or peak:
+                _tool_stats[tool].record(max(0, peak - start), current - start)
+
+def _rss_mb() -> float:
+    """
+    Current resident set size, falling back to the peak RSS outside Linux.
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            return round(int(statm.read().split()[1]) * resource.getpagesize() / MB, 1)
+    except OSError:
+        return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+def _site(stat) -> str:
+    frame = stat.traceback[0]
+    filename = frame.filename
+    if filename.startswith(PROJECT_ROOT):
+        filename = filename[len(PROJECT_ROOT) + 1:]
+    elif "site-packages/" in filename:
+        filename = filename.split("site-packages/", 1)[1]
+    elif filename.startswith(STDLIB):
+        filename = f"stdlib{filename[len(STDLIB):]}"
+    return f"{filename}:{frame.lineno}"
+
+def _growth(stats, limit: int) -> list[dict]:
+    return [
+        {
+            "site": _site(stat),
+            "size_diff_kb": round(stat.size_diff / 1024, 1),
+            "size_kb": round(stat.size / 1024, 1),
+            "count_diff": stat.count_diff
+        }
+        for stat in stats[:limit]
+        if stat.size_diff > 0
+    ]
+
+class MemoryTracker:
+    """
+    tracemalloc based memory-growth tracker.
+
+    start() begins tracing and records a baseline snapshot; a background thread
+    then takes a snapshot every interval seconds and diffs it by file and line
+    against the previous one, logging the top growth sites. report() returns
+    RSS, traced memory, the per-tool counters of tool_memory() and the growth
+    sites since the baseline and over the last interval. Tracing can be
+    started and stopped at runtime.
+    """
+    def __init__(self, interval: float = 300.0, frames: int = 1, top_n: int = 20):
+        self.interval = interval
+        self.frames = frames
+        self.top_n = top_n
+        self.started_at = None
+        self.snapshots = 0
+        self._baseline = None
+        self._previous = None
+        self._last_growth = []
+        self._lock = Lock()
+        self._stop = Event()
+        self._thread = None
+
+    def _take(self):
+        return tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+
+    def start(self) -> None:
+        with self._lock:
+            if tracemalloc.is_tracing() and self._baseline is not None:
+                return
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(self.frames)
+            self._baseline = self._previous = self._take()
+            self._last_growth = []
+            self.started_at = time()
+            self.snapshots = 0
+
+        if self.interval > 0 and (self._thread is None or not self._thread.is_alive()):
+            self._stop.clear()
+            self._thread = Thread(target=self._run, name="memory-tracker", daemon=True)
+            self._thread.start()
+        logger.info("Memory tracing started (frames=%d, interval=%.0fs)", self.frames, self.interval)
+
+    def stop(self) -> None:
+        self._stop.set()
+        with self._lock:
+            tracemalloc.stop()
+            self._baseline = self._previous = None
+            self.started_at = None
+        logger.info("Memory tracing stopped")
+
+    def snapshot(self) -> list[dict]:
+        """
+        Take a snapshot and return the top growth sites since the previous one.
+        """
+        with self._lock:
+            if not tracemalloc.is_tracing() or self._previous is None:
+                return []
+            current = self._take()
+            self._last_growth = _growth(current.compare_to(self._previous, "lineno"), self.top_n)
+            self._previous = current
+            self.snapshots += 1
+            growth = self._last_growth
+
+        if growth:
+            logger.info(
+                "Memory growth over the last interval (RSS %.1f MB): %s",
+                _rss_mb(), ", ".join(f"{site['site']} +{site['size_diff_kb']} KB" for site in growth[:5])
+            )
+        return growth
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.snapshot()
+            except Exception as e:
+                logger.error("Memory snapshot failed: %s", e)
+
+    def report(self, limit: int | None = None, fresh: bool = False) -> dict:
+        """
+        Args:
+            limit (int | None): Number of growth sites to return (default top_n).
+            fresh (bool): Take a new snapshot first instead of using the last periodic one.
+        """
+        limit = limit or self.top_n
+        if fresh:
+            self.snapshot()
+
+        tracing = tracemalloc.is_tracing()
+        current, peak = tracemalloc.get_traced_memory() if tracing else (0, 0)
+        with _tool_lock:
+            tools = {tool: stats.summary() for tool, stats in _tool_stats.items()}
+        with self._lock:
+            since_start = []
+            if self._baseline is not None and self._previous is not None:
+                since_start = _growth(self._previous.compare_to(self._baseline, "lineno"), limit)
+            last_interval = self._last_growth[:limit]
+
+        return {
+            "tracing": tracing,
+            "started_at": self.started_at,
+            "snapshots": self.snapshots,
+            "rss_mb": _rss_mb(),
+            "traced_current_mb": round(current / MB, 2),
+            "traced_peak_mb": round(peak / MB, 2),
+            "tools": tools,
+            "growth_since_start": since_start,
+            "growth_last_interval": last_interval
+        }
@@ -0,0 +1,229 @@
+from io import BytesIO
+from hashlib import sha256
+from posixpath import dirname, basename, join, normpath
+from urllib.parse import quote, unquote
+from zipfile import ZipFile, ZIP_DEFLATED
+import logging
+from lxml import etree
+
+logger = logging.getLogger("GenFilesMCP.optimize_ooxml")
+
+# Namespaces used by the OPC package parts
+RELS_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+CT_NS = "http://schemas.openxmlformats.org/package/2006/content-types"
+
+# Image formats that can be safely re-encoded with Pillow
+RESIZABLE_FORMATS = {".png": "PNG", ".jpg": "JPEG", ".jpeg": "JPEG"}
+
+def _rels_source_dir(rels_name: str) -> str:
+    """
+    Return the folder of the part a .rels file belongs to.
+    Example: 'ppt/slides/_rels/slide1.xml.rels' -> 'ppt/slides'
+    """
+    return dirname(dirname(rels_name))
+
+def _rels_name(part_name: str) -> str:
+    """
+    Return the .rels file name of a part.
+    Example: 'ppt/slides/slide1.xml' -> 'ppt/slides/_rels/slide1.xml.rels'
+    """
+    return join(dirname(part_name), "_rels", f"{basename(part_name)}.rels")
+
+def _resolve_target(rels_name: str, target: str) -> str:
+    """
+    Resolve a relationship target to an absolute part name inside the zip.
+    Targets are URIs, so percent-encoded characters are decoded first.
+    """
+    target = unquote(target)
+    if target.startswith("/"):
+        return normpath(target.lstrip("/"))
+    return normpath(join(_rels_source_dir(rels_name), target))
+
+def _relative_target(rels_name: str, part_name: str) -> str:
+    """
+    Build a relationship target for part_name relative to the source of rels_name.
+    """
+    source_parts = [p for p in _rels_source_dir(rels_name).split("/") if p]
+    target_parts = part_name.split("/")
+    common = 0
+    while common < min(len(source_parts), len(target_parts) - 1) and source_parts[common] == target_parts[common]:
+        common += 1
+    return quote("/".join([".."] * (len(source_parts) - common) + target_parts[common:]))
+
+def _internal_relationships(rels_root):
+    """
+    Yield the relationships of a .rels tree that point inside the package.
+    """
+    for rel in rels_root.iter(f"{{{RELS_NS}}}Relationship"):
+        if rel.get("TargetMode") == "External":
+            continue
+        yield rel
+
+def _downscale_image(data: bytes, extension: str, max_px: int, jpeg_quality: int) -> bytes:
+    """
+    Downscale an image so its longest side is at most max_px pixels.
+    Returns the original bytes when the image is small enough, cannot be
+    decoded, or the re-encoded image is not smaller.
+    """
+    from PIL import Image
+
+    try:
+        with Image.open(BytesIO(data)) as image:
+            if max(image.size) <= max_px:
+                return data
+            image_format = RESIZABLE_FORMATS[extension]
+            image.thumbnail((max_px, max_px), Image.LANCZOS)
+            if image_format == "JPEG" and image.mode not in ("RGB", "L"):
+                image = image.convert("RGB")
+            output = BytesIO()
+            if image_format == "JPEG":
+                image.save(output, format=image_format, quality=jpeg_quality, optimize=True)
+            else:
+                image.save(output, format=image_format, optimize=True)
+    except Exception as e:
+        logger.warning("Skipping image downscale: %s", e)
+        return data
+
+    resized = output.getvalue()
+    return resized if len(resized) < len(data) else data
+
+def optimize_ooxml(
+    file_data: BytesIO,
+    max_image_px: int = 1920,
+    jpeg_quality: int = 85,
+    compress_level: int = 9
+) -> tuple[BytesIO, dict]:
+    """
+    Shrink an OOXML package (.pptx, .docx, .xlsx) before it is uploaded.
+
+    The pass deduplicates identical media parts, downscales images larger than
+    max_image_px, drops parts that are no longer reachable from the package
+    relationships and rewrites the zip with the given deflate level.
+
+    Args:
+        file_data (BytesIO): The generated package, with .name attribute set.
+        max_image_px (int): Longest image side in pixels. 0 disables downscaling.
+        jpeg_quality (int): Quality used when re-encoding JPEG images.
+        compress_level (int): Deflate level (0-9) for the rewritten zip.
+    Returns:
+        tuple[BytesIO, dict]: The optimised package and a report with the
+        'bytes_before', 'bytes_after', 'media_deduplicated', 'images_downscaled'
+        and 'parts_dropped' counters. On failure the original buffer is
+        returned unchanged with an 'error' entry in the report.
+    """
+    name = getattr(file_data, "name", None)
+    original = file_data.getvalue()
+    report = {
+        "file_name": name,
+        "bytes_before": len(original),
+        "bytes_after": len(original),
+        "media_deduplicated": 0,
+        "images_downscaled": 0,
+        "parts_dropped": 0
+    }
+
+    try:
+        with ZipFile(BytesIO(original)) as source:
+            order = [info.filename for info in source.infolist() if not info.is_dir()]
+            parts = {part_name: source.read(part_name) for part_name in order}
+
+        # [1] Downscale large images inside the media folders
+        for part_name in order:
+            extension = part_name[part_name.rfind("."):].lower()
+            if max_image_px and "/media/" in part_name and extension in RESIZABLE_FORMATS:
+                resized = _downscale_image(parts[part_name], extension, max_image_px, jpeg_quality)
+                if resized is not parts[part_name]:
+                    parts[part_name] = resized
+                    report["images_downscaled"] += 1
+
+        # [2] Map duplicate media parts to the first part with the same content
+        canonical = {}
+        duplicates = {}
+        for part_name in order:
+            if "/media/" not in part_name:
+                continue
+            digest = sha256(parts[part_name]).digest()
+            if digest in canonical:
+                duplicates[part_name] = canonical[digest]
+            else:
+                canonical[digest] = part_name
+
+        # [3] Point relationships at the canonical media parts
+        rels_trees = {}
+        for part_name in order:
+            if not part_name.endswith(".rels"):
+                continue
+            root = etree.fromstring(parts[part_name])
+            changed = False
+            for rel in _internal_relationships(root):
+                resolved = _resolve_target(part_name, rel.get("Target"))
+                if resolved in duplicates:
+                    rel.set("Target", _relative_target(part_name, duplicates[resolved]))
+                    changed = True
+            rels_trees[part_name] = root
+            if changed:
+                parts[part_name] = etree.tostring(root, xml_declaration=True, encoding="UTF-8", standalone=True)
+        report["media_deduplicated"] = len(duplicates)
+
+        # [4] Walk the relationship graph from the package root and keep only reachable parts
+        dropped = set(duplicates)
+        if "_rels/.rels" in rels_trees:
+            reachable = set()
+            pending = ["_rels/.rels"]
+            while pending:
+                rels_name = pending.pop()
+                for rel in _internal_relationships(rels_trees[rels_name]):
+                    target = _resolve_target(rels_name, rel.get("Target"))
+                    if target in reachable:
+                        continue
+                    reachable.add(target)
+                    if _rels_name(target) in rels_trees:
+                        pending.append(_rels_name(target))
+            for part_name in order:
+                if part_name == "[Content_Types].xml" or part_name.endswith(".rels"):
+                    continue
+                if part_name not in reachable:
+                    dropped.add(part_name)
+            # .rels files belonging to dropped parts go with them
+            dropped.update(
+                rels_name for rels_name in rels_trees
+                if rels_name != "_rels/.rels" and normpath(join(_rels_source_dir(rels_name), basename(rels_name)[:-5])) in dropped
+            )
+        report["parts_dropped"] = len(dropped)
+
+        # [5] Remove content type overrides of the dropped parts
+        if dropped and "[Content_Types].xml" in parts:
+            root = etree.fromstring(parts["[Content_Types].xml"])
+            for override in list(root.iter(f"{{{CT_NS}}}Override")):
+                if unquote(override.get("PartName", "")).lstrip("/") in dropped:
+                    root.remove(override)
+            parts["[Content_Types].xml"] = etree.tostring(root, xml_declaration=True, encoding="UTF-8", standalone=True)
+
+        # [6] Rewrite the zip keeping the original part order ([Content_Types].xml first)
+        output = BytesIO()
+        with ZipFile(output, "w", compression=ZIP_DEFLATED, compresslevel=compress_level) as target:
+            for part_name in order:
+                if part_name not in dropped:
+                    target.writestr(part_name, parts[part_name])
+
+    except Exception as e:
+        logger.error("OOXML optimisation failed for %s: %s", name, e)
+        file_data.seek(0)
+        report["error"] = str(e)
+        return file_data, report
+
+    # Keep the original buffer if the rewritten package is not smaller
+    if output.tell() < len(original):
+        output.name = name
+        report["bytes_after"] = output.tell()
+        output.seek(0)
+    else:
+        file_data.seek(0)
+        output = file_data
+
+    logger.info(
+        "OOXML optimised %s: %d -> %d bytes (dedup=%d, downscaled=%d, dropped=%d)",
+        name, report["bytes_before"], report["bytes_after"],
+        report["media_deduplicated"], report["images_downscaled"], report["parts_dropped"]
+    )
+    return output, report
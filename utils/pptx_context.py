@@ -0,0 +1,86 @@
+from io import BytesIO
+from pptx import Presentation
+from pptx.enum.shapes import MSO_SHAPE_TYPE
+
+def _shape_style(shape) -> str:
+    """
+    Return a readable style for a shape: the placeholder type or the shape type.
+    """
+    if shape.is_placeholder:
+        return shape.placeholder_format.type.name.title()
+    try:
+        return shape.shape_type.name.title() if shape.shape_type else "Shape"
+    except NotImplementedError:
+        return "Shape"
+
+def _is_group(shape) -> bool:
+    """
+    Return True for group shapes. Some shapes (e.g. connectors, graphic frames
+    python-pptx does not know) raise NotImplementedError for shape_type.
+    """
+    try:
+        return shape.shape_type == MSO_SHAPE_TYPE.GROUP
+    except NotImplementedError:
+        return False
+
+def _shape_texts(shape):
+    """
+    Yield (style, text) for every text carrying element of a shape,
+    recursing into groups and walking table cells.
+    """
+    if _is_group(shape):
+        for child in shape.shapes:
+            yield from _shape_texts(child)
+        return
+
+    if shape.has_table:
+        for row_idx, row in enumerate(shape.table.rows):
+            for col_idx, cell in enumerate(row.cells):
+                yield f"Table Cell ({row_idx}, {col_idx})", cell.text
+        return
+
+    if shape.has_text_frame:
+        yield _shape_style(shape), shape.text_frame.text
+
+def extract_pptx(pptx_file: BytesIO) -> list[dict]:
+    """
+    Return the index, slide, style and text of each text element of a presentation.
+    The whole presentation is loaded with python-pptx; speaker notes are returned as 'Notes' records.
+
+    Args:
+        pptx_file (BytesIO): The presentation to inspect.
+    Returns:
+        list[dict]: Records with 'index', 'slide', 'shape', 'style' and 'text' keys.
+    """
+    prs = Presentation(pptx_file)
+    body = []
+    index = 0
+
+    for slide_number, slide in enumerate(prs.slides, start=1):
+        for shape in slide.shapes:
+            for style, text in _shape_texts(shape):
+                text = text.strip()
+                if text:
+                    body.append({
+                        "index": index,
+                        "slide": slide_number,
+                        "shape": shape.name,
+                        "style": style,
+                        "text": text
+                    })
+                index += 1
+
+        if slide.has_notes_slide:
+            notes = slide.notes_slide.notes_text_frame
+            text = notes.text.strip() if notes is not None else ""
+            if text:
+                body.append({
+                    "index": index,
+                    "slide": slide_number,
+                    "shape": "Notes",
+                    "style": "Notes",
+                    "text": text
+                })
+            index += 1
+
+    return body
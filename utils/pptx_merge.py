@@ -0,0 +1,218 @@
+from copy import deepcopy
+from io import BytesIO
+import re
+from lxml import etree
+from pptx import Presentation
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.opc.package import Part
+
+# Namespace of r:id / r:embed / r:link attributes in slide XML
+R_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+
+# Markdown heading or numbered section title such as '1.', 'Ⅱ.' or '가.'
+SECTION_HEADING = re.compile(r"^\s*(#{1,6}\s|\d+\.\s|[ⅠⅡⅢⅣⅤⅥⅦⅧⅨⅩ]+\.\s|[가-하]\.\s)")
+
+def split_content(content: str, n_chunks: int) -> list[str]:
+    """
+    Split deck content into at most n_chunks contiguous sections of similar length.
+    Blocks are cut at headings when the content has them, otherwise at blank lines.
+    """
+    lines = content.splitlines()
+    if any(SECTION_HEADING.match(line) for line in lines):
+        blocks = []
+        for line in lines:
+            if SECTION_HEADING.match(line) or not blocks:
+                blocks.append([line])
+            else:
+                blocks[-1].append(line)
+        blocks = ["\n".join(block).strip() for block in blocks]
+    else:
+        blocks = [block.strip() for block in re.split(r"\n\s*\n", content)]
+    blocks = [block for block in blocks if block]
+
+    n_chunks = max(1, min(n_chunks, len(blocks)))
+    if n_chunks == 1:
+        return [content]
+
+    # Greedy contiguous grouping towards an even share of characters per chunk
+    target = sum(len(block) for block in blocks) / n_chunks
+    chunks, current, size = [], [], 0
+    for idx, block in enumerate(blocks):
+        current.append(block)
+        size += len(block)
+        remaining_blocks = len(blocks) - idx - 1
+        remaining_chunks = n_chunks - len(chunks) - 1
+        if remaining_chunks and (size >= target or remaining_blocks == remaining_chunks):
+            chunks.append("\n\n".join(current))
+            current, size = [], 0
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+def allocate_slides(sections: list[str], n_slides: int) -> list[int]:
+    """
+    Share n_slides between sections in proportion to their length (at least one each).
+    """
+    total = sum(len(section) for section in sections) or 1
+    counts = [max(1, round(n_slides * len(section) / total)) for section in sections]
+    # Fix rounding so the counts add up to n_slides
+    while sum(counts) > n_slides and max(counts) > 1:
+        counts[counts.index(max(counts))] -= 1
+    while sum(counts) < n_slides:
+        counts[counts.index(min(counts))] += 1
+    return counts
+
+def _partname_template(partname: str) -> str:
+    """
+    '/ppt/charts/chart3.xml' -> '/ppt/charts/chart%d.xml'
+    """
+    return re.sub(r"\d*(\.\w+)$", r"%d\1", partname)
+
+def _remap_rids(element, mapping: dict) -> None:
+    """
+    Rewrite r:id / r:embed / r:link attributes of an element tree using mapping.
+    """
+    for node in element.iter():
+        for attribute, value in node.attrib.items():
+            if attribute.startswith(f"{{{R_NS}}}") and value in mapping:
+                node.set(attribute, mapping[value])
+
+def _clone_part(part, package, cache: dict):
+    """
+    Copy a part (chart, embedded workbook, media...) and the parts it relates to into package.
+    """
+    if part in cache:
+        return cache[part]
+
+    clone = Part(package.next_partname(_partname_template(part.partname)), part.content_type, package, part.blob)
+    cache[part] = clone
+
+    mapping = {}
+    for rId, rel in part.rels.items():
+        if rel.is_external:
+            mapping[rId] = clone.relate_to(rel.target_ref, rel.reltype, is_external=True)
+        else:
+            mapping[rId] = clone.relate_to(_clone_part(rel.target_part, package, cache), rel.reltype)
+
+    if mapping and part.content_type.endswith("xml"):
+        root = etree.fromstring(part.blob)
+        _remap_rids(root, mapping)
+        clone._blob = etree.tostring(root, xml_declaration=True, encoding="UTF-8", standalone=True)
+    return clone
+
+def _matching_layout(target, source_slide):
+    """
+    Return the layout of target with the same name as the source slide layout,
+    falling back to the same position and finally to the last layout.
+    """
+    source_layout = source_slide.slide_layout
+    layouts = target.slide_layouts
+    for layout in layouts:
+        if layout.name == source_layout.name:
+            return layout
+    index = list(source_layout.slide_master.slide_layouts).index(source_layout)
+    return layouts[index] if index < len(layouts) else layouts[len(layouts) - 1]
+
+def append_slide(target, source_slide, cache: dict) -> None:
+    """
+    Append a copy of source_slide (from another presentation) to target.
+    Shapes, background, images, charts, media and hyperlinks are copied;
+    the slide uses the matching layout of the target theme.
+    """
+    slide = target.slides.add_slide(_matching_layout(target, source_slide))
+
+    # Relationships of the source slide, except its layout and notes
+    mapping = {}
+    for rId, rel in source_slide.part.rels.items():
+        if rel.reltype in (RT.SLIDE_LAYOUT, RT.NOTES_SLIDE):
+            continue
+        if rel.is_external:
+            mapping[rId] = slide.part.relate_to(rel.target_ref, rel.reltype, is_external=True)
+        elif rel.reltype == RT.IMAGE:
+            # Identical images are stored once in the merged package
+            _, mapping[rId] = slide.part.get_or_add_image_part(BytesIO(rel.target_part.blob))
+        else:
+            mapping[rId] = slide.part.relate_to(_clone_part(rel.target_part, target.part.package, cache), rel.reltype)
+
+    # Replace the layout placeholders with the source shapes
+    target_tree = slide.shapes._spTree
+    for shape in list(target_tree)[2:]:
+        target_tree.remove(shape)
+    for shape in list(source_slide.shapes._spTree)[2:]:
+        target_tree.append(deepcopy(shape))
+
+    source_bg = source_slide._element.cSld.bg
+    if source_bg is not None:
+        slide._element.cSld.insert(0, deepcopy(source_bg))
+
+    _remap_rids(slide._element, mapping)
+
+    if source_slide.has_notes_slide:
+        notes = source_slide.notes_slide.notes_text_frame
+        if notes is not None and notes.text:
+            slide.notes_slide.notes_text_frame.text = notes.text
+
+def merge_presentations(decks: list[bytes]) -> bytes:
+    """
+    Merge several .pptx files into one, keeping the theme of the first deck
+    and the order of the decks and of their slides.
+    """
+    target = Presentation(BytesIO(decks[0]))
+    cache = {}
+    for deck in decks[1:]:
+        source = Presentation(BytesIO(deck))
+        for source_slide in source.slides:
+            append_slide(target, source_slide, cache)
+
+    buffer = BytesIO()
+    target.save(buffer)
+    return buffer.getvalue()
+
+def check_slide_numbers(deck: bytes, numbers: list[int]) -> None:
+    """
+    Validate 1-based slide numbers against a presentation before their replacements are generated.
+    Raises ValueError for repeated numbers and slides that do not exist.
+    """
+    if len(set(numbers)) != len(numbers):
+        raise ValueError("Each slide can only be revised once per call")
+    count = len(Presentation(BytesIO(deck)).slides._sldIdLst)
+    for number in numbers:
+        if not 1 <= number <= count:
+            raise ValueError(f"Slide {number} does not exist, the presentation has {count} slides")
+
+def replace_slides(deck: bytes, replacements: dict[int, bytes]) -> bytes:
+    """
+    Patch a .pptx in place of a full regeneration: the slides of each replacement
+    deck take the position of one slide of deck, the other slides are kept as-is.
+
+    Args:
+        deck (bytes): The original presentation.
+        replacements (dict[int, bytes]): 1-based slide number -> replacement .pptx.
+    Returns:
+        bytes: The patched presentation.
+    """
+    target = Presentation(BytesIO(deck))
+    slide_ids = target.slides._sldIdLst
+    originals = list(slide_ids)
+    for number in replacements:
+        if not 1 <= number <= len(originals):
+            raise ValueError(f"Slide {number} does not exist, the presentation has {len(originals)} slides")
+
+    cache = {}
+    for number, replacement in sorted(replacements.items()):
+        original = originals[number - 1]
+        for source_slide in Presentation(BytesIO(replacement)).slides:
+            append_slide(target, source_slide, cache)
+            # append_slide adds the slide at the end; move it in front of the slide it replaces
+            original.addprevious(slide_ids[-1])
+
+    # Slides are removed only now: new slide partnames are numbered after the slide count
+    for number in replacements:
+        original = originals[number - 1]
+        target.part.drop_rel(original.rId)
+        slide_ids.remove(original)
+    target.part.rename_slide_parts([slide_id.rId for slide_id in slide_ids])
+
+    buffer = BytesIO()
+    target.save(buffer)
+    return buffer.getvalue()
@@ -0,0 +1,163 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from contextlib import contextmanager
+from contextvars import copy_context
+from threading import Lock
+from time import monotonic
+import logging
+
+logger = logging.getLogger("GenFilesMCP.replicas")
+
+# Latency samples kept per replica for percentile estimation
+LATENCY_HISTORY = 200
+# Smoothing factor of the latency moving average
+EWMA_ALPHA = 0.2
+
+def parse_replicas(value: str) -> list[str]:
+    """
+    Split a comma separated list of URLs from an environment variable.
+    """
+    return [url.strip() for url in (value or "").split(",") if url.strip()]
+
+class Replica:
+    """
+    One renderer instance with its URLs and observed load.
+    """
+    def __init__(self, index: int, urls: dict):
+        self.index = index
+        self.urls = urls
+        self.outstanding = 0
+        self.ewma = None
+        self.latencies = deque(maxlen=LATENCY_HISTORY)
+
+    def __getitem__(self, key: str) -> str:
+        return self.urls[key]
+
+    def __repr__(self) -> str:
+        return f"Replica({self.index}, {self.urls})"
+
+class ReplicaPool:
+    """
+    Load balancer over several replicas of the same backend.
+
+    Requests go to the replica with the lowest (outstanding + 1) * latency score,
+    so idle and fast replicas are preferred. call() returns the replica that
+    answered, and callers send follow-up requests such as export and download to
+    that same instance. Long running calls can optionally be hedged to a second
+    replica once they exceed the observed latency percentile.
+    """
+    def __init__(
+        self,
+        name: str,
+        replicas: list[dict],
+        hedge: bool = False,
+        hedge_percentile: float = 95.0,
+        hedge_min_samples: int = 20
+    ):
+        if not replicas:
+            raise ValueError(f"At least one {name} replica is required")
+        self.name = name
+        self.replicas = [Replica(idx, urls) for idx, urls in enumerate(replicas)]
+        self.hedge = hedge and len(self.replicas) > 1
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self._lock = Lock()
+        self._executor = ThreadPoolExecutor(thread_name_prefix=f"{name}-hedge") if self.hedge else None
+
+    def _score(self, replica: Replica) -> float:
+        # Unmeasured replicas score as the fastest one so they get traffic and samples
+        known = [r.ewma for r in self.replicas if r.ewma is not None]
+        latency = replica.ewma if replica.ewma is not None else min(known, default=1.0)
+        return (replica.outstanding + 1) * latency
+
+    def pick(self, exclude: tuple = ()) -> Replica:
+        """
+        Return the least loaded replica, skipping the excluded ones when possible.
+        """
+        with self._lock:
+            candidates = [r for r in self.replicas if r not in exclude] or self.replicas
+            # On equal scores prefer replicas that have no latency samples yet
+            return min(candidates, key=lambda r: (self._score(r), r.ewma is not None))
+
+    @contextmanager
+    def track(self, replica: Replica, record_latency: bool = True):
+        """
+        Count a request as outstanding on a replica and record its latency on success.
+        Requests other than the hedged call (e.g. export) pass record_latency=False
+        so they add load without skewing the latency percentile and average.
+        """
+        with self._lock:
+            replica.outstanding += 1
+        start = monotonic()
+        try:
+            yield replica
+        except Exception:
+            with self._lock:
+                replica.outstanding -= 1
+            raise
+        elapsed = monotonic() - start
+        with self._lock:
+            replica.outstanding -= 1
+            if not record_latency:
+                return
+            replica.latencies.append(elapsed)
+            replica.ewma = elapsed if replica.ewma is None else EWMA_ALPHA * elapsed + (1 - EWMA_ALPHA) * replica.ewma
+
+    def hedge_delay(self) -> float | None:
+        """
+        Latency percentile across replicas after which a call is hedged,
+        or None while there are not enough samples.
+        """
+        with self._lock:
+            samples = sorted(latency for r in self.replicas for latency in r.latencies)
+        if len(samples) < self.hedge_min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * self.hedge_percentile / 100))]
+
+    def _tracked_call(self, replica: Replica, call):
+        with self.track(replica):
+            return call(replica)
+
+    def call(self, call):
+        """
+        Run call(replica) on the least loaded replica, hedging it to a second
+        replica when hedging is enabled and the call runs past the latency percentile.
+
+        Returns:
+            tuple: (replica that answered first, return value of call)
+        """
+        primary = self.pick()
+        delay = self.hedge_delay() if self.hedge else None
+        if delay is None:
+            return primary, self._tracked_call(primary, call)
+
+        # Hedged calls run in copied contexts so their log records keep the request ID
+        futures = {self._executor.submit(copy_context().run, self._tracked_call, primary, call): primary}
+        done, _ = wait(futures, timeout=delay)
+        if not done:
+            secondary = self.pick(exclude=(primary,))
+            logger.info("[%s] Hedging after %.1fs: replica %d -> %d", self.name, delay, primary.index, secondary.index)
+            futures[self._executor.submit(copy_context().run, self._tracked_call, secondary, call)] = secondary
+
+        errors = []
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    # The slower request keeps running in the background and is ignored
+                    return futures[future], future.result()
+                errors.append(future.exception())
+        raise errors[0]
+
+    def stats(self) -> list[dict]:
+        with self._lock:
+            return [
+                {
+                    "replica": r.index,
+                    "urls": r.urls,
+                    "outstanding": r.outstanding,
+                    "ewma_latency_s": round(r.ewma, 3) if r.ewma is not None else None
+                }
+                for r in self.replicas
+            ]
@@ -0,0 +1,251 @@
+import asyncio
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar, copy_context
+from functools import partial, wraps
+from time import monotonic
+import logging
+from utils.logging_setup import bind_request_id, request_id_var
+from utils.loop_watchdog import tool_activity
+from utils.memory_profiler import tool_memory
+from utils.traffic_recorder import record_tool, describe_result
+
+logger = logging.getLogger("GenFilesMCP.scheduler")
+
+# Number of recent queue times kept per user for percentile reporting
+WAIT_HISTORY = 200
+
+# Number of lane slots held by the running job, for sizing its own worker pool
+granted_slots_var = ContextVar("granted_slots", default=1)
+
+def _run_as_tool(tool: str, func, *args, **kwargs):
+    """
+    Run a tool body in a worker thread, marked for the loop watchdog and the memory tracker.
+    """
+    with tool_activity(tool), tool_memory(tool):
+        return func(*args, **kwargs)
+
+def parallel_map(func, *iterables, max_workers: int, name: str) -> list:
+    """
+    Run func over the iterables on a temporary thread pool and return the results in order.
+
+    Every call runs in its own copy of the caller's context, so the request ID and
+    the watchdog and memory markers of the tool follow it. When a call fails, the
+    calls that have not started yet are cancelled and the error is raised.
+    Args:
+        max_workers (int): Pool size, e.g. granted_slots_var.get() for backend calls.
+        name (str): Thread name prefix.
+    Returns:
+        list: The return values of func.
+    """
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix=name) as executor:
+        futures = [executor.submit(copy_context().run, func, *args) for args in zip(*iterables)]
+        try:
+            return [future.result() for future in futures]
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+class _UserStats:
+    """
+    Queue time counters of one user in one lane.
+    """
+    def __init__(self):
+        self.jobs = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.recent = deque(maxlen=WAIT_HISTORY)
+
+    def record(self, wait: float) -> None:
+        self.jobs += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        self.recent.append(wait)
+
+    def summary(self) -> dict:
+        recent = sorted(self.recent)
+        return {
+            "jobs": self.jobs,
+            "avg_wait_s": round(self.total_wait / self.jobs, 3) if self.jobs else 0.0,
+            "p95_wait_s": round(recent[int(0.95 * (len(recent) - 1))], 3) if recent else 0.0,
+            "max_wait_s": round(self.max_wait, 3)
+        }
+
+class FairQueue:
+    """
+    Weighted fair queue in front of a pool of slots (e.g. Presenton renderers).
+
+    Jobs are tagged with start-time fair queueing: a job of cost c from user u
+    starts at max(virtual_time, last_finish[u]) and finishes c / weight[u] later.
+    Free slots go to the waiting job with the smallest start tag whose user has
+    fewer than per_user_limit running jobs, so a user submitting many jobs is
+    interleaved with everyone else instead of occupying every slot.
+    A job may hold several slots at once (width), capped at the lane slots; it
+    waits until all of them are free. per_user_limit counts jobs, not slots, so
+    one wide job of a user is not narrowed by it.
+    Each lane runs its jobs on its own thread pool sized to its slots, so a
+    busy lane never takes threads from another one.
+    """
+    def __init__(self, name: str, slots: int, per_user_limit: int, weights: dict | None = None):
+        self.name = name
+        self.slots = slots
+        self.per_user_limit = per_user_limit
+        self.weights = weights or {}
+        self._virtual_time = 0.0
+        self._last_finish = defaultdict(float)
+        self._pending = defaultdict(deque)
+        self._running = defaultdict(int)
+        self._active = 0
+        self._stats = defaultdict(_UserStats)
+        self._executor = ThreadPoolExecutor(max_workers=slots, thread_name_prefix=f"lane-{name}")
+
+    def _dispatch(self) -> None:
+        """
+        Grant free slots to the eligible waiting jobs with the smallest start tags.
+        A wide job that does not fit yet blocks the jobs behind it, so it is not starved.
+        """
+        while self._active < self.slots:
+            candidates = [
+                (queue[0][0], user_id)
+                for user_id, queue in self._pending.items()
+                if queue and self._running.get(user_id, 0) < self.per_user_limit
+            ]
+            if not candidates:
+                return
+            start_tag, user_id = min(candidates)
+            _, width, future = self._pending[user_id][0]
+            if not future.done() and self._active + width > self.slots:
+                return
+            self._pending[user_id].popleft()
+            if not self._pending[user_id]:
+                del self._pending[user_id]
+            if future.done():
+                # Cancelled while waiting
+                continue
+            self._virtual_time = max(self._virtual_time, start_tag)
+            self._active += width
+            self._running[user_id] += 1
+            future.set_result(None)
+
+    def _release(self, user_id: str, width: int) -> None:
+        self._active -= width
+        self._running[user_id] -= 1
+        if not self._running[user_id]:
+            del self._running[user_id]
+        self._dispatch()
+
+    async def run(self, user_id: str | None, func, *args, cost: float = 1.0, width: int = 1, **kwargs):
+        """
+        Wait for a fair slot, then run a blocking callable in a worker thread.
+
+        Args:
+            user_id (str | None): The user the job is accounted to.
+            func: Blocking callable to run.
+            cost (float): Relative cost of the job (e.g. number of slides).
+            width (int): Slots the job uses at once (e.g. sections rendered in parallel).
+                The granted number is available to func as granted_slots_var.
+        Returns:
+            The return value of func.
+        """
+        user_id = user_id or "anonymous"
+        width = max(1, min(int(width), self.slots))
+        weight = float(self.weights.get(user_id, 1.0))
+        start_tag = max(self._virtual_time, self._last_finish[user_id])
+        share = cost / weight
+        self._last_finish[user_id] = start_tag + share
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[user_id].append((start_tag, width, future))
+        enqueued = monotonic()
+        self._dispatch()
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            # The job never ran: give its share back so the user's next jobs are not pushed back
+            self._last_finish[user_id] -= share
+            if future.done() and not future.cancelled():
+                # The slot was granted just before cancellation
+                self._release(user_id, width)
+            raise
+
+        wait = monotonic() - enqueued
+        self._stats[user_id].record(wait)
+        logger.info("[scheduler:%s] user=%s queued %.3fs (width=%d, running=%d/%d)", self.name, user_id, wait, width, self._active, self.slots)
+
+        # The copied context carries the request ID and tool markers into the worker thread
+        context = copy_context()
+        context.run(granted_slots_var.set, width)
+        loop = asyncio.get_running_loop()
+        try:
+            job = self._executor.submit(context.run, func, *args, **kwargs)
+        except BaseException:
+            self._release(user_id, width)
+            raise
+        # Release when the thread is done, not when the await ends: a cancelled
+        # caller must not free the slots while its job is still running
+        job.add_done_callback(lambda _: loop.call_soon_threadsafe(self._release, user_id, width))
+        return await asyncio.wrap_future(job)
+
+    def stats(self) -> dict:
+        """
+        Return lane occupancy and per-user queue time statistics.
+        """
+        return {
+            "slots": self.slots,
+            "per_user_limit": self.per_user_limit,
+            "running": self._active,
+            "waiting": sum(len(queue) for queue in self._pending.values()),
+            "users": {user_id: stats.summary() for user_id, stats in self._stats.items()}
+        }
+
+class Scheduler:
+    """
+    Set of named FairQueue lanes, one per backend or kind of work.
+    """
+    def __init__(self, lanes: dict[str, FairQueue]):
+        self.lanes = lanes
+
+    async def run(self, lane: str, user_id: str | None, func, *args, cost: float = 1.0, width: int = 1, **kwargs):
+        """
+        Run a blocking callable in the given lane. See FairQueue.run.
+        """
+        return await self.lanes[lane].run(user_id, func, *args, cost=cost, width=width, **kwargs)
+
+    def wrap(self, lane: str, cost=None, width=None):
+        """
+        Decorator turning a blocking tool function into an async tool that runs
+        in the given lane, accounted to its user_id argument.
+        cost is an optional callable receiving the tool kwargs and returning the
+        relative cost of the call (e.g. the number of slides it renders).
+        width is an optional callable of the same kind returning the number of
+        slots the call uses at once (e.g. sections rendered in parallel).
+        The wrapped signature is preserved so FastMCP builds the same tool schema.
+        """
+        def decorator(func):
+            @wraps(func)
+            async def wrapper(*args, **kwargs):
+                # Tag every log record of this tool call with the MCP request ID
+                try:
+                    request_id = str(kwargs["ctx"].request_id)
+                except Exception:
+                    request_id = None
+                token = bind_request_id(request_id)
+                try:
+                    job_cost = cost(kwargs) if cost else 1.0
+                    job_width = width(kwargs) if width else 1
+                    # Bind the tool arguments first: they include user_id, which would clash with run()
+                    job = partial(_run_as_tool, func.__name__, func, *args, **kwargs)
+                    with tool_activity(func.__name__), record_tool(func.__name__, kwargs) as outcome:
+                        result = await self.run(lane, kwargs.get("user_id"), job, cost=job_cost, width=job_width)
+                        if outcome is not None:
+                            outcome.update(describe_result(result))
+                        return result
+                finally:
+                    request_id_var.reset(token)
+            return wrapper
+        return decorator
+
+    def stats(self) -> dict:
+        return {name: lane.stats() for name, lane in self.lanes.items()}
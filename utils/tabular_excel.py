@@ -0,0 +1,376 @@
+from codecs import getincrementaldecoder
+from itertools import chain, islice
+from typing import Iterable, Iterator
+import csv
+import logging
+import re
+import numpy as np
+from openpyxl.worksheet.filters import AutoFilter
+from openpyxl.utils import get_column_letter
+
+from utils import xlsx_bulk
+
+logger = logging.getLogger("GenFilesMCP.tabular")
+
+# Data rows per sheet: Excel's row limit minus the header row
+MAX_SHEET_ROWS = 1_048_575
+# Rows parsed, typed and written at a time; memory depends on this, not on the file size
+BATCH_ROWS = 20_000
+# Bytes per download chunk
+CHUNK_SIZE = 1 << 20
+# Columns wider than this are capped
+MAX_COLUMN_WIDTH = 50
+# Generated workbooks larger than this are spooled to disk before upload
+SPOOL_SIZE = 32 << 20
+
+NUMBER_FORMATS = {
+    "integer": "#,##0",
+    "number": "#,##0.00",
+    "date": "yyyy-mm-dd",
+    "datetime": "yyyy-mm-dd hh:mm:ss"
+}
+
+# Plain numbers, optionally with thousands separators ('1,234,567.8')
+NUMBER = re.compile(r"^[+-]?(\d+|\d{1,3}(,\d{3})+)(\.\d+)?([eE][+-]?\d+)?$")
+# ISO dates and times after '/' and '.' separators are normalised to '-'
+DATE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+DATETIME = re.compile(r"^\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}(:\d{2}(\.\d+)?)?$")
+
+def _open_text(chunks: Iterable[bytes], encoding: str | None) -> tuple[str, str, Iterator[str]]:
+    """
+    Decode a byte stream into lines (with their line endings) for csv.reader.
+
+    The encoding is detected on the first chunk: UTF-8 (with or without BOM),
+    otherwise CP949, the usual encoding of Korean CSV exports.
+    Returns:
+        tuple: (encoding, sample text of the first chunk, line iterator)
+    """
+    chunks = iter(chunks)
+    first = next(chunks, b"")
+    if first.startswith(b"PK\x03\x04"):
+        raise ValueError("The file is a zip package (xlsx, docx, ...), not a delimited text file")
+
+    if encoding is None:
+        try:
+            # final=False: a multibyte character cut at the end of the chunk is not an error
+            getincrementaldecoder("utf-8-sig")().decode(first)
+            encoding = "utf-8-sig"
+        except UnicodeDecodeError:
+            encoding = "cp949"
+    sample = getincrementaldecoder(encoding)(errors="replace").decode(first)
+
+    def lines() -> Iterator[str]:
+        decoder = getincrementaldecoder(encoding)(errors="replace")
+        pending = ""
+        for chunk in chain([first], chunks):
+            *complete, pending = (pending + decoder.decode(chunk)).split("\n")
+            for line in complete:
+                yield line + "\n"
+        pending += decoder.decode(b"", final=True)
+        if pending:
+            yield pending
+
+    return encoding, sample, lines()
+
+def _delimiter(sample: str, file_name: str) -> str:
+    if file_name.lower().endswith(".tsv"):
+        return "\t"
+    try:
+        return csv.Sniffer().sniff(sample[:65536], delimiters=",\t;|").delimiter
+    except csv.Error:
+        return ","
+
+def _unique_names(header: list[str], width: int) -> list[str]:
+    """
+    Column names for the header row: blanks get a position name, duplicates a suffix.
+    """
+    names, seen = [], {}
+    for idx in range(width):
+        name = header[idx].strip() if idx < len(header) else ""
+        name = name or f"Column {idx + 1}"
+        seen[name] = seen.get(name, 0) + 1
+        names.append(name if seen[name] == 1 else f"{name} ({seen[name]})")
+    return names
+
+def _objects(values: list) -> np.ndarray:
+    """
+    Object array of the values. np.asarray(list of str) would build a fixed-width
+    unicode array sized by the longest value.
+    """
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array
+
+def _normalize_date(value: str) -> str:
+    return value.replace("/", "-").replace(".", "-", 2) if value[:4].isdigit() else value
+
+def _is_code(value: str) -> bool:
+    """
+    Numeric-looking values that would not survive as numbers: codes with leading
+    zeros and identifiers beyond Excel's 15 significant digits.
+    """
+    digits = value.lstrip("+-").replace(",", "")
+    return (len(digits) > 1 and digits[0] == "0" and digits[1] != ".") or len(digits) > 15
+
+def infer_type(values: list[str]) -> str:
+    """
+    Infer the type of a column from its non-empty values.
+    Returns:
+        str: 'integer', 'number', 'date', 'datetime' or 'text'.
+    """
+    if not values:
+        return "text"
+
+    if all(NUMBER.match(value) for value in values):
+        if not any(_is_code(value) for value in values):
+            if any("." in value or "e" in value.lower() for value in values):
+                return "number"
+            return "integer"
+        return "text"
+
+    normalized = [_normalize_date(value) for value in values]
+    if all(DATE.match(value) for value in normalized):
+        kind = "date"
+    elif all(DATE.match(value) or DATETIME.match(value) for value in normalized):
+        kind = "datetime"
+    else:
+        return "text"
+    try:
+        _objects(normalized).astype("datetime64[s]")
+    except ValueError:
+        return "text"
+    return kind
+
+def widen_type(kind: str, values: list[str]) -> str:
+    """
+    Widen a column type inferred from earlier batches to fit the values of a later batch:
+    'integer' and 'number' become 'text' when a value is a code that would not round-trip
+    as a number ('007'), 'integer' becomes 'number' when a value has decimals or an exponent,
+    'date' becomes 'datetime' when a value has a time. Other mismatching values are kept as
+    text cell by cell.
+    """
+    if kind in ("integer", "number") and any(NUMBER.match(value) and _is_code(value) for value in values):
+        return "text"
+    if kind == "integer" and any(("." in value or "e" in value.lower()) and NUMBER.match(value) for value in values):
+        return "number"
+    if kind == "date" and any(len(value) > 10 and DATETIME.match(_normalize_date(value)) for value in values):
+        return "datetime"
+    return kind
+
+def _convert_value(value: str, kind: str):
+    """
+    Scalar conversion used when a batch contains values that do not match the column type.
+    """
+    try:
+        if kind in ("integer", "number") and NUMBER.match(value):
+            return float(value.replace(",", ""))
+        if kind in ("date", "datetime"):
+            return np.datetime64(_normalize_date(value), "s").astype("datetime64[us]").item()
+    except ValueError:
+        pass
+    return value
+
+def convert_column(values: list[str], kind: str) -> np.ndarray:
+    """
+    Convert the raw strings of one batch to the column type in one vectorised step.
+    Empty strings become empty cells; values that do not match the type are kept as text.
+    """
+    raw = _objects(values)
+    empty = raw == ""
+    if kind == "text":
+        raw[empty] = None
+        return raw
+
+    present = raw[~empty]
+    try:
+        if kind in ("integer", "number"):
+            if not all(NUMBER.match(value) for value in present):
+                raise ValueError
+            converted = np.full(len(raw), np.nan)
+            converted[~empty] = _objects([value.replace(",", "") for value in present]).astype(np.float64)
+            numbers = converted[~empty]
+            if kind == "integer" and np.abs(numbers).max(initial=0) < 2 ** 53 and (numbers == np.trunc(numbers)).all():
+                if not empty.any():
+                    return converted.astype(np.int64)
+                # Blanks stay empty cells without turning the column into floats
+                integers = np.empty(len(raw), dtype=object)
+                integers[~empty] = numbers.astype(np.int64).tolist()
+                return integers
+            return converted
+        converted = np.full(len(raw), np.datetime64("NaT"), dtype="datetime64[s]")
+        converted[~empty] = _objects([_normalize_date(value) for value in present]).astype("datetime64[s]")
+        return converted
+    except ValueError:
+        # Mixed batch: convert what matches, keep the rest as text
+        return _objects([_convert_value(value, kind) if value else None for value in values])
+
+def _display_width(value: str) -> int:
+    # Hangul and other wide characters take about two columns
+    return sum(2 if ord(char) > 0x2E80 else 1 for char in value)
+
+def _column_widths(names: list[str], rows: list[list[str]], widths: dict | None = None) -> dict:
+    """
+    Column widths fitting the header and the first 1000 rows, never narrower than the given widths.
+    """
+    widths = dict(widths or {})
+    sample = rows[:1000]
+    for idx, name in enumerate(names):
+        longest = max([_display_width(name)] + [_display_width(row[idx]) for row in sample])
+        widths[idx] = max(widths.get(idx, 0), min(MAX_COLUMN_WIDTH, max(8, longest + 2)))
+    return widths
+
+class _SheetWriter:
+    """
+    Appends typed batches to write-only sheets, starting a new sheet at Excel's row limit.
+    Every sheet gets the styled header row, frozen panes and an autofilter.
+    Column types and widths can be updated between batches; widths only apply to
+    sheets started afterwards, because a write-only sheet takes them before its first row.
+    """
+    def __init__(self, wb, sheet_name: str, names: list[str], kinds: list[str], widths: dict, max_rows: int):
+        self.wb = wb
+        self.sheet_name = sheet_name[:31]
+        self.names = names
+        self.set_kinds(kinds)
+        self.widths = widths
+        self.max_rows = max_rows
+        self.sheets = []
+        self.ws = None
+        self.rows = 0
+
+    def set_kinds(self, kinds: list[str]) -> None:
+        self.number_formats = {idx: NUMBER_FORMATS[kind] for idx, kind in enumerate(kinds) if kind in NUMBER_FORMATS}
+
+    def _new_sheet(self) -> None:
+        self._close_sheet()
+        number = len(self.sheets) + 1
+        title = self.sheet_name if number == 1 else f"{self.sheet_name[:26]} ({number})"
+        self.ws = self.wb.create_sheet(title)
+        self.ws.freeze_panes = "A2"
+        self.rows = 0
+        self.sheets.append({"name": title, "rows": 0})
+
+    def _close_sheet(self) -> None:
+        if self.ws is not None:
+            # The autofilter is written when the sheet is closed, so the final range can be set last
+            self.ws.auto_filter = AutoFilter(ref=f"A1:{get_column_letter(len(self.names))}{self.rows + 1}")
+            self.sheets[-1]["rows"] = self.rows
+
+    def write(self, columns: list[np.ndarray]) -> None:
+        start, total = 0, len(columns[0]) if columns else 0
+        while start < total:
+            if self.ws is None or self.rows == self.max_rows:
+                self._new_sheet()
+                first = True
+            else:
+                first = False
+            stop = min(total, start + self.max_rows - self.rows)
+            xlsx_bulk.write_columns(
+                self.ws,
+                {name: values[start:stop] for name, values in zip(self.names, columns)},
+                number_formats=self.number_formats,
+                # Widths must be set before the first row of a write-only sheet
+                column_widths=self.widths if first else None,
+                header=first
+            )
+            self.rows += stop - start
+            start = stop
+
+    def close(self) -> list[dict]:
+        if self.ws is None:
+            self._new_sheet()
+            xlsx_bulk.write_columns(self.ws, {name: [] for name in self.names}, column_widths=self.widths)
+        self._close_sheet()
+        return self.sheets
+
+def csv_to_workbook(
+    chunks: Iterable[bytes],
+    output,
+    file_name: str = "",
+    sheet_name: str = "Data",
+    delimiter: str | None = None,
+    encoding: str | None = None,
+    has_header: bool = True,
+    batch_rows: int = BATCH_ROWS,
+    max_sheet_rows: int = MAX_SHEET_ROWS
+) -> dict:
+    """
+    Stream a delimited text file into a formatted Excel workbook.
+
+    Rows are read in batches of batch_rows; each batch is converted column by column
+    with numpy and streamed into openpyxl write-only sheets, so memory stays bounded
+    for files with millions of rows.
+
+    Column types are inferred from the first batch and widened by later batches
+    (integer to number, numbers to text for codes such as '007', date to datetime);
+    rows already written keep their values, and other values that do not fit the type
+    are written as text. Column widths are sampled from the first 1000 rows of each batch
+    and, since a write-only sheet fixes its widths before its first row, only the
+    first batch sizes the first sheet; later sheets use the widths seen so far.
+
+    Args:
+        chunks (Iterable[bytes]): The source file as byte chunks.
+        output: Binary file object receiving the .xlsx file.
+        file_name (str): Source file name, used to recognise .tsv files.
+        sheet_name (str): Name of the first sheet; rows beyond Excel's limit continue on numbered sheets.
+        delimiter (str | None): Field delimiter (detected when None).
+        encoding (str | None): Text encoding (UTF-8 or CP949 detected when None).
+        has_header (bool): The first row holds the column names.
+    Returns:
+        dict: 'rows', 'sheets', 'columns' (name and inferred type), 'encoding', 'delimiter' and 'malformed_rows'.
+    """
+    encoding, sample, lines = _open_text(chunks, encoding)
+    delimiter = delimiter or _delimiter(sample, file_name)
+    # Blank lines and rows without any value are skipped
+    reader = filter(any, csv.reader(lines, delimiter=delimiter))
+
+    header = next(reader, []) if has_header else []
+    batch = list(islice(reader, batch_rows))
+    width = max([len(header)] + [len(row) for row in batch]) or 1
+    if not has_header:
+        header = []
+    names = _unique_names(header, width)
+
+    malformed = 0
+    def normalize(rows: list[list[str]]) -> list[list[str]]:
+        # Short rows are padded; values beyond the header width are dropped
+        nonlocal malformed
+        for idx, row in enumerate(rows):
+            if len(row) != width:
+                if len(row) > width:
+                    malformed += 1
+                rows[idx] = (row + [""] * width)[:width]
+        return rows
+
+    batch = normalize(batch)
+    kinds = [infer_type([value for row in batch if (value := row[idx].strip())]) for idx in range(width)]
+    logger.info("Tabular conversion: %d columns, delimiter %r, encoding %s, types %s", width, delimiter, encoding, kinds)
+
+    wb = xlsx_bulk.bulk_workbook()
+    writer = _SheetWriter(wb, sheet_name, names, kinds, _column_widths(names, batch), max_sheet_rows)
+    total = 0
+    while batch:
+        values = [[row[idx].strip() for row in batch] for idx in range(width)]
+        if total:
+            widened = [widen_type(kind, column) for kind, column in zip(kinds, values)]
+            if widened != kinds:
+                logger.info("Tabular conversion: types widened at row %d to %s", total + 1, widened)
+                kinds = widened
+                writer.set_kinds(kinds)
+            writer.widths = _column_widths(names, batch, writer.widths)
+        writer.write([convert_column(column, kind) for column, kind in zip(values, kinds)])
+        total += len(batch)
+        batch = normalize(list(islice(reader, batch_rows)))
+
+    sheets = writer.close()
+    wb.save(output)
+
+    if malformed:
+        logger.warning("Tabular conversion: %d rows had more fields than the header", malformed)
+    return {
+        "rows": total,
+        "sheets": sheets,
+        "columns": [{"name": name, "type": kind} for name, kind in zip(names, kinds)],
+        "encoding": encoding,
+        "delimiter": delimiter,
+        "malformed_rows": malformed
+    }
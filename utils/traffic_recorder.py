@@ -0,0 +1,233 @@
+from contextlib import contextmanager
+from hashlib import sha256
+from json import dumps
+from pathlib import Path
+from threading import Lock
+from time import monotonic, strftime, time
+from urllib.parse import urlsplit
+import logging
+import re
+
+from utils.http_session import SESSION
+from utils.logging_setup import request_id_var
+
+logger = logging.getLogger("GenFilesMCP.recorder")
+
+# Personal data and credentials masked in recorded arguments and text responses
+DEFAULT_REDACT_PATTERNS = [
+    r"Bearer\s+[A-Za-z0-9._~+/=-]+",                      # bearer tokens
+    r"\bsk-[A-Za-z0-9_-]{16,}",                            # API keys
+    r"[\w.+-]+@[\w-]+\.[\w.-]+",                           # e-mail addresses
+    r"\b\d{6}-?[1-4]\d{6}\b",                              # resident registration numbers
+    r"\b01[016789]-?\d{3,4}-?\d{4}\b"                      # mobile phone numbers
+]
+# Tool arguments replaced by a stable pseudonym (keeps per-user fairness in replays)
+DEFAULT_PSEUDONYM_FIELDS = ("user_id",)
+
+REDACTED = "[REDACTED]"
+
+_recorder = None
+
+def _pseudonym(value) -> str:
+    return f"anon-{sha256(str(value).encode()).hexdigest()[:12]}"
+
+class TrafficRecorder:
+    """
+    Opt-in recorder of tool calls and backend HTTP exchanges for offline replay.
+
+    Events are appended as JSON lines to traffic-<timestamp>.jsonl in the target
+    directory:
+      - 'meta': start time and backend base URLs,
+      - 'tool': tool name, redacted arguments, arrival offset, duration and outcome,
+      - 'http': method, URL, status, content type, response time and response body.
+    Response bodies are stored once per content hash under bodies/. Text bodies
+    and string arguments are redacted with the given patterns; binary bodies
+    (generated documents) are stored as-is, so recordings must be handled as
+    production data.
+    """
+    def __init__(
+        self,
+        directory: str,
+        backends: dict[str, str],
+        redact_patterns: list[str] | None = None,
+        pseudonym_fields: tuple = DEFAULT_PSEUDONYM_FIELDS
+    ):
+        self.directory = Path(directory)
+        self.backends = backends
+        self.redact = re.compile("|".join(f"(?:{pattern})" for pattern in DEFAULT_REDACT_PATTERNS + (redact_patterns or [])))
+        self.pseudonym_fields = set(pseudonym_fields)
+        self.path = None
+        self._started = None
+        self._lock = Lock()
+
+    def start(self) -> None:
+        """
+        Open a new recording and hook the shared HTTP session.
+        """
+        global _recorder
+        (self.directory / "bodies").mkdir(parents=True, exist_ok=True)
+        self.path = self.directory / f"traffic-{strftime('%Y%m%d-%H%M%S')}.jsonl"
+        self._started = monotonic()
+        self._write({"type": "meta", "started_at": time(), "backends": self.backends})
+        SESSION.hooks["response"].append(self._on_response)
+        _recorder = self
+        logger.info("Recording traffic to %s", self.path)
+
+    def stop(self) -> None:
+        global _recorder
+        if self._on_response in SESSION.hooks["response"]:
+            SESSION.hooks["response"].remove(self._on_response)
+        _recorder = None
+
+    def _write(self, event: dict) -> None:
+        line = dumps(event, ensure_ascii=False)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as file:
+                file.write(line + "\n")
+
+    def _offset(self) -> float:
+        return round(monotonic() - self._started, 4)
+
+    def _redact_value(self, key, value):
+        if key in self.pseudonym_fields and value is not None:
+            return _pseudonym(value)
+        if isinstance(value, str):
+            return self.redact.sub(REDACTED, value)
+        if isinstance(value, dict):
+            return {k: self._redact_value(k, v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [self._redact_value(None, v) for v in value]
+        if hasattr(value, "model_dump"):
+            return self._redact_value(key, value.model_dump())
+        return value
+
+    def _store_body(self, body: bytes) -> str:
+        digest = sha256(body).hexdigest()
+        path = self.directory / "bodies" / digest
+        if not path.exists():
+            path.write_bytes(body)
+        return digest
+
+    def _is_text(self, content_type: str) -> bool:
+        return content_type.startswith(("application/json", "text/"))
+
+    def _exchange(self, response, content_type: str, digest: str) -> dict:
+        url = urlsplit(response.request.url)
+        return {
+            "type": "http",
+            "t": self._offset(),
+            "request_id": request_id_var.get(),
+            "method": response.request.method,
+            "origin": f"{url.scheme}://{url.netloc}",
+            "path": self.redact.sub(REDACTED, url.path + (f"?{url.query}" if url.query else "")),
+            "status": response.status_code,
+            "content_type": content_type,
+            "elapsed_s": round(response.elapsed.total_seconds(), 4),
+            "body": digest
+        }
+
+    def _on_response(self, response, *args, **kwargs):
+        """
+        requests response hook: runs in the calling thread once the body has been read,
+        or as soon as the headers arrive for streamed requests.
+        """
+        try:
+            content_type = response.headers.get("Content-Type", "")
+            if kwargs.get("stream"):
+                self._tee(response, content_type)
+                return response
+            body = response.content
+            if self._is_text(content_type):
+                body = self.redact.sub(REDACTED, body.decode(response.encoding or "utf-8", errors="replace")).encode("utf-8")
+            self._write(self._exchange(response, content_type, self._store_body(body)))
+        except Exception as e:
+            logger.error("Could not record %s: %s", getattr(response, "url", "?"), e)
+        return response
+
+    def _tee(self, response, content_type: str) -> None:
+        """
+        Record a streamed body while the caller consumes it, without holding it in memory.
+        Text is redacted line by line; the event is written once the stream ends.
+        """
+        iter_content = response.iter_content
+        text = self._is_text(content_type)
+        encoding = response.encoding or "utf-8"
+
+        def recorded(*args, **kwargs):
+            digest = sha256()
+            temp = self.directory / "bodies" / f".partial-{id(response)}"
+            file = open(temp, "wb")
+            pending = b""
+
+            def store(data: bytes) -> None:
+                if text:
+                    # Re-encoded with the same codec: replayed CSV files keep their original encoding
+                    data = self.redact.sub(REDACTED, data.decode(encoding, errors="replace")).encode(encoding, errors="replace")
+                digest.update(data)
+                file.write(data)
+
+            try:
+                for chunk in iter_content(*args, **kwargs):
+                    if text:
+                        # Redact whole lines only, so a pattern is never split across chunks
+                        head, newline, pending = (pending + chunk).rpartition(b"\n")
+                        store(head + newline)
+                    else:
+                        store(chunk)
+                    yield chunk
+            finally:
+                # Also runs when the consumer stops early: the partial body is recorded
+                try:
+                    store(pending)
+                    file.close()
+                    path = self.directory / "bodies" / digest.hexdigest()
+                    if path.exists():
+                        temp.unlink()
+                    else:
+                        temp.replace(path)
+                    self._write(self._exchange(response, content_type, digest.hexdigest()))
+                except Exception as e:
+                    logger.error("Could not record %s: %s", response.url, e)
+
+        response.iter_content = recorded
+
+    @contextmanager
+    def tool(self, tool: str, arguments: dict):
+        """
+        Record one tool call: arguments on arrival, duration and outcome on completion.
+        """
+        offset = self._offset()
+        arguments = {key: self._redact_value(key, value) for key, value in arguments.items() if key != "ctx"}
+        outcome = {"ok": False, "result_bytes": 0}
+        try:
+            yield outcome
+        finally:
+            self._write({
+                "type": "tool",
+                "t": offset,
+                "request_id": request_id_var.get(),
+                "tool": tool,
+                "arguments": arguments,
+                "duration_s": round(self._offset() - offset, 4),
+                **outcome
+            })
+
+@contextmanager
+def record_tool(tool: str, arguments: dict):
+    """
+    Record a tool call when a recorder is active; yields a dict to fill with the
+    outcome ('ok', 'result_bytes'), or None when recording is off.
+    """
+    recorder = _recorder
+    if recorder is None:
+        yield None
+        return
+    with recorder.tool(tool, arguments) as outcome:
+        yield outcome
+
+def describe_result(result) -> dict:
+    """
+    Outcome fields of a tool result for record_tool: tools report errors as an 'error' object.
+    """
+    text = result if isinstance(result, str) else dumps(result, ensure_ascii=False, default=str)
+    return {"ok": '"error"' not in text[:200], "result_bytes": len(text)}
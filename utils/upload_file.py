@@ -1,4 +1,4 @@
-from requests import post
+from utils.http_session import post
 from json import dumps
 from io import BytesIO
 
@@ -0,0 +1,140 @@
+from io import BytesIO
+from threading import Event, Lock, Thread
+from time import monotonic, time
+import logging
+
+from utils.http_session import get
+
+logger = logging.getLogger("GenFilesMCP.warmup")
+
+def _docx_round_trip() -> None:
+    """
+    Build, save and reload a tiny Word document.
+    """
+    from docx import Document
+
+    doc = Document()
+    doc.add_heading("warm-up", level=1)
+    doc.add_paragraph("warm-up")
+    buffer = BytesIO()
+    doc.save(buffer)
+    buffer.seek(0)
+    Document(buffer)
+
+def _xlsx_round_trip() -> None:
+    """
+    Write a tiny workbook in write-only mode and stream it back in read-only mode.
+    """
+    import numpy as np
+    from openpyxl import load_workbook
+    from utils import xlsx_bulk
+
+    wb = xlsx_bulk.bulk_workbook()
+    xlsx_bulk.write_array(wb.create_sheet("warm-up"), np.arange(6).reshape(3, 2), headers=["a", "b"])
+    buffer = BytesIO()
+    wb.save(buffer)
+    buffer.seek(0)
+    load_workbook(buffer, read_only=True).close()
+
+def _pptx_round_trip() -> None:
+    """
+    Build, save and reload a one-slide presentation.
+    """
+    from pptx import Presentation
+
+    prs = Presentation()
+    prs.slides.add_slide(prs.slide_layouts[6])
+    buffer = BytesIO()
+    prs.save(buffer)
+    buffer.seek(0)
+    Presentation(buffer)
+
+LIBRARY_CHECKS = {
+    "docx": _docx_round_trip,
+    "xlsx": _xlsx_round_trip,
+    "pptx": _pptx_round_trip
+}
+
+class Readiness:
+    """
+    Startup warm-up and readiness state served by /healthz and /readyz.
+
+    On start() a background thread runs the document library round trips once,
+    then probes every backend URL (OWUI, Presenton and HWP replicas) and repeats
+    the probes every probe_interval seconds. Probes go through the shared HTTP
+    session, so they also open its keep-alive connections. Any HTTP response
+    counts as reachable; only connection errors and timeouts mark a backend down.
+    """
+    def __init__(self, backends: dict[str, str], require_backends: bool = True, probe_interval: float = 30.0, probe_timeout: float = 5.0):
+        self.backends = backends
+        self.require_backends = require_backends
+        self.probe_interval = probe_interval
+        self.probe_timeout = probe_timeout
+        self.started_at = time()
+        self.warmed_up = False
+        self._checks = {}
+        self._lock = Lock()
+        self._stop = Event()
+
+    def _record(self, name: str, ok: bool, elapsed: float, error: str | None = None) -> None:
+        with self._lock:
+            self._checks[name] = {
+                "ok": ok,
+                "latency_ms": round(elapsed * 1000, 1),
+                "error": error,
+                "checked_at": time()
+            }
+
+    def _run_check(self, name: str, check) -> None:
+        start = monotonic()
+        try:
+            check()
+        except Exception as e:
+            logger.error("Warm-up check %s failed: %s", name, e)
+            self._record(name, False, monotonic() - start, str(e))
+        else:
+            self._record(name, True, monotonic() - start)
+
+    def _probe(self, url: str) -> None:
+        get(url, timeout=self.probe_timeout, allow_redirects=False)
+
+    def probe_backends(self) -> None:
+        for name, url in self.backends.items():
+            self._run_check(f"backend:{name}", lambda url=url: self._probe(url))
+
+    def _run(self) -> None:
+        warmup_start = monotonic()
+        for name, check in LIBRARY_CHECKS.items():
+            self._run_check(f"library:{name}", check)
+        self.probe_backends()
+        self.warmed_up = True
+        logger.info("Warm-up finished in %.2fs, ready=%s", monotonic() - warmup_start, self.is_ready())
+
+        while not self._stop.wait(self.probe_interval):
+            self.probe_backends()
+
+    def start(self) -> None:
+        Thread(target=self._run, name="warmup", daemon=True).start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def is_ready(self) -> bool:
+        if not self.warmed_up:
+            return False
+        with self._lock:
+            return all(
+                check["ok"]
+                for name, check in self._checks.items()
+                if self.require_backends or not name.startswith("backend:")
+            )
+
+    def report(self) -> dict:
+        with self._lock:
+            checks = dict(self._checks)
+        return {
+            "ready": self.is_ready(),
+            "warmed_up": self.warmed_up,
+            "uptime_s": round(time() - self.started_at, 1),
+            "checks": checks
+        }
@@ -0,0 +1,265 @@
+from typing import Mapping, Sequence
+import numpy as np
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Font, PatternFill
+from openpyxl.utils import get_column_letter
+
+# Default look of the header row written by the bulk helpers
+HEADER_FONT = Font(bold=True)
+HEADER_FILL = PatternFill(start_color="DDEBF7", end_color="DDEBF7", fill_type="solid")
+HEADER_ALIGNMENT = Alignment(horizontal="center", vertical="center")
+
+def bulk_workbook() -> Workbook:
+    """
+    Create a Workbook in openpyxl write-only (streaming) mode.
+    Rows are serialised as soon as they are appended, so memory stays flat
+    regardless of the number of rows. Sheets must be created with
+    wb.create_sheet() and filled with write_array() / write_columns().
+    """
+    return Workbook(write_only=True)
+
+def _column_values(column) -> list:
+    """
+    Convert a column to a list of Python scalars in a single vectorised step.
+    NaN and NaT values become None so they are written as empty cells.
+    """
+    values = np.asarray(column)
+
+    if values.dtype.kind == "f":
+        mask = np.isnan(values)
+        if mask.any():
+            values = values.astype(object)
+            values[mask] = None
+    elif values.dtype.kind == "M":
+        mask = np.isnat(values)
+        values = values.astype("datetime64[us]").astype(object)
+        values[mask] = None
+
+    return values.tolist()
+
+def _styled_cell(ws, value, prototype: WriteOnlyCell) -> WriteOnlyCell:
+    """
+    Create a write-only cell sharing the style of a prototype cell.
+    Reusing the prototype style avoids a style-table lookup per cell.
+    """
+    cell = WriteOnlyCell(ws, value)
+    cell._style = prototype._style
+    return cell
+
+def _column_prototypes(ws, count: int, number_formats, column_styles) -> list:
+    """
+    Build one prototype cell per column carrying its number format and style.
+    Columns without formatting get None so their values are appended as-is.
+    """
+    number_formats = number_formats or {}
+    column_styles = column_styles or {}
+    prototypes = []
+
+    for idx in range(count):
+        number_format = number_formats.get(idx)
+        style = column_styles.get(idx, {})
+        if number_format is None and not style:
+            prototypes.append(None)
+            continue
+        prototype = WriteOnlyCell(ws)
+        if number_format is not None:
+            prototype.number_format = number_format
+        for attribute, value in style.items():
+            setattr(prototype, attribute, value)
+        prototypes.append(prototype)
+
+    return prototypes
+
+def _write_header(ws, headers: Sequence[str]) -> None:
+    """
+    Append a styled header row.
+    """
+    row = []
+    for header in headers:
+        cell = WriteOnlyCell(ws, header)
+        cell.font = HEADER_FONT
+        cell.fill = HEADER_FILL
+        cell.alignment = HEADER_ALIGNMENT
+        row.append(cell)
+    ws.append(row)
+
+def _write_rows(ws, rows, prototypes: list) -> int:
+    """
+    Stream rows into the sheet, wrapping only the formatted columns in cells.
+    Returns the number of rows written.
+    """
+    styled = [(idx, prototype) for idx, prototype in enumerate(prototypes) if prototype is not None]
+    count = 0
+
+    if not styled:
+        for row in rows:
+            ws.append(row)
+            count += 1
+        return count
+
+    for row in rows:
+        row = list(row)
+        for idx, prototype in styled:
+            row[idx] = _styled_cell(ws, row[idx], prototype)
+        ws.append(row)
+        count += 1
+    return count
+
+def _resolve_keys(mapping, names: Sequence[str], count: int) -> dict:
+    """
+    Accept per-column settings keyed by column name or by 0-based index.
+    Raises ValueError for names that are not columns and indexes outside range(count).
+    """
+    if not mapping:
+        return {}
+    positions = {name: idx for idx, name in enumerate(names)}
+    resolved = {}
+    for key, value in mapping.items():
+        if isinstance(key, str):
+            if key not in positions:
+                raise ValueError(f"Unknown column name: {key!r}")
+            idx = positions[key]
+        elif isinstance(key, (int, np.integer)) and 0 <= key < count:
+            idx = int(key)
+        else:
+            raise ValueError(f"Column index out of range: {key!r} (expected 0-{count - 1})")
+        resolved[idx] = value
+    return resolved
+
+def _set_widths(ws, column_widths, names: Sequence[str], count: int) -> None:
+    """
+    Set column widths. Must run before the first row is appended.
+    """
+    for idx, width in _resolve_keys(column_widths, names, count).items():
+        ws.column_dimensions[get_column_letter(idx + 1)].width = width
+
+def write_array(
+    ws,
+    data,
+    headers: Sequence[str] | None = None,
+    number_formats: Mapping | None = None,
+    column_styles: Mapping | None = None,
+    column_widths: Mapping | None = None
+) -> int:
+    """
+    Write a 2D numpy array (or nested list) into a write-only worksheet.
+
+    Args:
+        ws: A worksheet created with bulk_workbook().create_sheet().
+        data: 2D array-like with one row per record.
+        headers (Sequence[str] | None): Optional header row.
+        number_formats (Mapping | None): Number format per column, keyed by header
+            name or 0-based index. Example: {"Amount": "#,##0", 2: "0.0%"}.
+        column_styles (Mapping | None): openpyxl style attributes per column.
+            Example: {"Amount": {"font": Font(color="FF0000")}}.
+        column_widths (Mapping | None): Column width per column.
+    Returns:
+        int: Number of data rows written.
+    """
+    values = np.asarray(data)
+    if values.ndim != 2:
+        raise ValueError("write_array expects a 2D array")
+
+    names = list(headers or [])
+    # Resolve every per-column setting before the first row is written
+    prototypes = _column_prototypes(
+        ws,
+        values.shape[1],
+        _resolve_keys(number_formats, names, values.shape[1]),
+        _resolve_keys(column_styles, names, values.shape[1])
+    )
+
+    _set_widths(ws, column_widths, names, values.shape[1])
+    if headers:
+        _write_header(ws, headers)
+
+    if values.dtype.kind in "fM":
+        # Convert column by column so NaN/NaT handling stays vectorised
+        rows = zip(*(_column_values(values[:, idx]) for idx in range(values.shape[1])))
+    else:
+        rows = values.tolist()
+
+    return _write_rows(ws, rows, prototypes)
+
+def write_rows(
+    ws,
+    rows: Sequence[Sequence],
+    headers: Sequence[str] | None = None,
+    number_formats: Mapping | None = None,
+    column_styles: Mapping | None = None,
+    column_widths: Mapping | None = None
+) -> int:
+    """
+    Write rows of mixed Python values (text, numbers, dates) into a write-only worksheet.
+    Unlike write_array, values are not converted to a common numpy dtype.
+
+    Args:
+        ws: A worksheet created with bulk_workbook().create_sheet().
+        rows (Sequence[Sequence]): One sequence of values per row.
+        headers (Sequence[str] | None): Optional header row.
+        number_formats (Mapping | None): Number format per column name or index.
+        column_styles (Mapping | None): openpyxl style attributes per column name or index.
+        column_widths (Mapping | None): Column width per column name or index.
+    Returns:
+        int: Number of data rows written.
+    """
+    names = list(headers or [])
+    width = max([len(names)] + [len(row) for row in rows])
+
+    # Resolve every per-column setting before the first row is written
+    prototypes = _column_prototypes(
+        ws,
+        width,
+        _resolve_keys(number_formats, names, width),
+        _resolve_keys(column_styles, names, width)
+    )
+
+    _set_widths(ws, column_widths, names, width)
+    if headers:
+        _write_header(ws, headers)
+
+    # Pad short rows so every formatted column exists
+    padded = (list(row) + [None] * (width - len(row)) for row in rows)
+    return _write_rows(ws, padded, prototypes)
+
+def write_columns(
+    ws,
+    columns: Mapping[str, Sequence],
+    number_formats: Mapping | None = None,
+    column_styles: Mapping | None = None,
+    column_widths: Mapping | None = None,
+    header: bool = True
+) -> int:
+    """
+    Write a dict of equally sized columns into a write-only worksheet.
+    Each column may have its own dtype (numbers, text, dates).
+
+    Args:
+        ws: A worksheet created with bulk_workbook().create_sheet().
+        columns (Mapping[str, Sequence]): Column name -> values (numpy array or list).
+        number_formats (Mapping | None): Number format per column name or index.
+        column_styles (Mapping | None): openpyxl style attributes per column name or index.
+        column_widths (Mapping | None): Column width per column name or index.
+        header (bool): Write the column names as a styled header row.
+    Returns:
+        int: Number of data rows written.
+    """
+    names = list(columns.keys())
+    converted = [_column_values(values) for values in columns.values()]
+    if len({len(values) for values in converted}) > 1:
+        raise ValueError("All columns passed to write_columns must have the same length")
+
+    # Resolve every per-column setting before the first row is written
+    prototypes = _column_prototypes(
+        ws,
+        len(names),
+        _resolve_keys(number_formats, names, len(names)),
+        _resolve_keys(column_styles, names, len(names))
+    )
+
+    _set_widths(ws, column_widths, names, len(names))
+    if header:
+        _write_header(ws, names)
+
+    return _write_rows(ws, zip(*converted), prototypes)
@@ -0,0 +1,197 @@
+from datetime import date, datetime, time
+from io import BytesIO
+import numpy as np
+from openpyxl import load_workbook
+from openpyxl.utils import get_column_letter
+
+# Rows converted to a numpy block at once while streaming a sheet
+CHUNK_ROWS = 5000
+
+def _to_json(value):
+    """
+    Make a cell value JSON friendly.
+    """
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, float) and not np.isfinite(value):
+        return None
+    return value
+
+class _ColumnStats:
+    """
+    Running per-column statistics accumulated chunk by chunk.
+    """
+    def __init__(self):
+        self.rows = 0
+        self.nulls = 0
+        self.numbers = 0
+        self.texts = 0
+        self.dates = 0
+        self.bools = 0
+        self.total = 0.0
+        self.minimum = None
+        self.maximum = None
+        self.date_min = None
+        self.date_max = None
+
+    def update(self, column: np.ndarray, kinds: np.ndarray) -> None:
+        """
+        Fold one chunk of a column into the running statistics.
+        kinds holds the Python type of each value of the column.
+        """
+        self.rows += len(column)
+        null_mask = kinds == type(None)
+        bool_mask = kinds == bool
+        number_mask = (kinds == int) | (kinds == float)
+        date_mask = (kinds == datetime) | (kinds == date)
+        self.nulls += int(null_mask.sum())
+        self.bools += int(bool_mask.sum())
+        self.dates += int(date_mask.sum())
+        self.texts += int((kinds == str).sum())
+
+        if number_mask.any():
+            numbers = column[number_mask].astype(np.float64)
+            numbers = numbers[np.isfinite(numbers)]
+            if numbers.size:
+                self.numbers += numbers.size
+                self.total += float(numbers.sum())
+                low, high = float(numbers.min()), float(numbers.max())
+                self.minimum = low if self.minimum is None else min(self.minimum, low)
+                self.maximum = high if self.maximum is None else max(self.maximum, high)
+
+        if date_mask.any():
+            dates = np.array(column[date_mask].tolist(), dtype="datetime64[us]")
+            low, high = dates.min(), dates.max()
+            self.date_min = low if self.date_min is None else min(self.date_min, low)
+            self.date_max = high if self.date_max is None else max(self.date_max, high)
+
+    def summary(self) -> dict:
+        """
+        Return the statistics of the column as a JSON friendly dict.
+        """
+        counts = {
+            "number": self.numbers,
+            "text": self.texts,
+            "datetime": self.dates,
+            "bool": self.bools
+        }
+        present = {kind: count for kind, count in counts.items() if count}
+        if not present:
+            dtype = "empty"
+        elif len(present) == 1:
+            dtype = next(iter(present))
+        else:
+            dtype = "mixed"
+
+        result = {
+            "dtype": dtype,
+            "count": self.rows - self.nulls,
+            "null_count": self.nulls
+        }
+        if self.numbers:
+            result.update({
+                "min": self.minimum,
+                "max": self.maximum,
+                "mean": self.total / self.numbers
+            })
+        elif self.dates:
+            result.update({
+                "min": str(self.date_min),
+                "max": str(self.date_max)
+            })
+        return result
+
+def _summarize_sheet(ws, header_row: int, sample_rows: int) -> dict:
+    """
+    Stream one worksheet and summarise its header, a sample and per-column statistics.
+    """
+    header = []
+    sample = []
+    stats = []
+    chunk = []
+    width = 0
+    last_row = 0
+    data_rows = 0
+
+    def flush():
+        nonlocal chunk, data_rows
+        if not chunk:
+            return
+        block = np.empty((len(chunk), width), dtype=object)
+        for idx, row in enumerate(chunk):
+            block[idx, :len(row)] = row
+        kinds = np.frompyfunc(type, 1, 1)(block)
+        while len(stats) < width:
+            # Columns that appear late were empty in the rows already streamed
+            column_stats = _ColumnStats()
+            column_stats.rows = column_stats.nulls = data_rows
+            stats.append(column_stats)
+        for col_idx in range(width):
+            stats[col_idx].update(block[:, col_idx], kinds[:, col_idx])
+        data_rows += len(chunk)
+        chunk = []
+
+    for row_idx, row in enumerate(ws.iter_rows(values_only=True), start=1):
+        last_row = row_idx
+        if row_idx < header_row:
+            continue
+        if row_idx == header_row:
+            header = [_to_json(value) for value in row]
+            width = max(width, len(row))
+            continue
+        if len(sample) < sample_rows:
+            sample.append([_to_json(value) for value in row])
+        width = max(width, len(row))
+        chunk.append(row)
+        if len(chunk) >= CHUNK_ROWS:
+            flush()
+    flush()
+
+    columns = []
+    for col_idx in range(width):
+        column = {
+            "index": col_idx,
+            "letter": get_column_letter(col_idx + 1),
+            "header": header[col_idx] if col_idx < len(header) else None
+        }
+        if col_idx < len(stats):
+            column.update(stats[col_idx].summary())
+        columns.append(column)
+
+    return {
+        "name": ws.title,
+        "dimensions": f"A1:{get_column_letter(width)}{last_row}" if width else None,
+        "rows": data_rows,
+        "header_row": header_row,
+        "header": header,
+        "sample": sample,
+        "columns": columns
+    }
+
+def summarize_workbook(xlsx_file: BytesIO, header_row: int = 1, sample_rows: int = 10) -> dict:
+    """
+    Summarise an Excel workbook without loading full sheets into memory.
+
+    The workbook is opened in openpyxl read-only mode and every sheet is streamed
+    row by row. Rows are grouped into numpy blocks of CHUNK_ROWS rows to compute
+    dtype, min, max, mean and null count per column.
+
+    Args:
+        xlsx_file (BytesIO): The workbook to inspect.
+        header_row (int): 1-based row holding the column headers.
+        sample_rows (int): Number of data rows returned per sheet.
+    Returns:
+        dict: {"sheets": [...]} with the structure, header, sample rows and
+        column statistics of each worksheet.
+    """
+    wb = load_workbook(xlsx_file, read_only=True, data_only=True)
+    try:
+        sheets = []
+        for ws in wb.worksheets:
+            if not hasattr(ws, "iter_rows"):
+                # Chartsheets have no cells
+                continue
+            sheets.append(_summarize_sheet(ws, header_row, sample_rows))
+        return {"sheets": sheets}
+    finally:
+        wb.close()